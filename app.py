@@ -1,50 +1,196 @@
 # app.py
 
 import os
+import click
 from flask import Flask, render_template, send_from_directory, make_response
-from datetime import datetime
-# Import Blueprints yang baru dibuat
-from blueprints.ocr import ocr_bp
-from blueprints.combine import combine_bp
-from blueprints.imagetopdf import imagetopdf_bp
-from blueprints.sharpen import sharpen_bp
-from blueprints.upscale import upscale_bp
-from blueprints.compresspdf import compresspdf_bp
-from blueprints.pdftoimage import pdftoimage_bp
-from blueprints.pdftodocx import pdftodocx_bp
-from blueprints.pdf_to_xlsx import pdf_to_xlsx_bp
-from blueprints.docxtopdf import docxtopdf_bp
-from blueprints.xlsxtopdf import xlsxtopdf_bp
-from blueprints.summarizer import summ_bp
-from blueprints.convertimage import convert_bp
-from blueprints.paraphraser import para_bp
+from utils import uploads, lazy, pools, metrics, profiling, results, assets, pagecache, singleflight
 
 app = Flask(__name__)
 
 # --- Konfigurasi Global ---
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Maks 16 MB untuk semua upload
+MB = 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = 16 * MB  # Batas default upload (blueprint tanpa entri di UPLOAD_LIMITS)
+
+# Batas upload per blueprint. Upload di-stream ke disk (utils/uploads.py),
+# jadi batas besar tidak menaikkan RAM worker sebesar ukuran file.
+app.config['UPLOAD_LIMITS'] = {
+    'ocr_bp': 200 * MB,
+    'combine_bp': 200 * MB,
+    'imagetopdf_bp': 200 * MB,
+    'compresspdf_bp': 200 * MB,
+    'pdftoimage_bp': 200 * MB,
+    'pdftodocx_bp': 200 * MB,
+    'pdf_to_xlsx_bp': 200 * MB,
+    'docxtopdf_bp': 100 * MB,
+    'xlsxtopdf_bp': 100 * MB,
+    'summ_bp': 50 * MB,
+    'convert_bp': 32 * MB,
+    'convert_bp.batch': 200 * MB,  # batas total satu batch konversi gambar
+    # upscale / sharpen tetap 16 MB: hasil decode + model AI yang jadi batas memori
+}
+
+# --- Spooling upload ke disk (lihat utils/uploads.py) ---
+app.config['UPLOAD_SPOOL_THRESHOLD'] = 512 * 1024  # upload > 512 KB langsung ditulis ke file
+app.config['UPLOAD_SPOOL_DIR'] = os.environ.get('UPLOAD_SPOOL_DIR')  # mis. /dev/shm/webtoolkit untuk tmpfs
+uploads.init_app(app)
 
 # --- TAMBAHKAN KONFIGURASI MODEL AI ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app.config['UPSCALE_MODEL_DIR'] = os.path.join(BASE_DIR, 'models')
 app.config['AI_CPU_MAX_SIDE'] = 2500
 
+# --- Batch konversi gambar ---
+app.config['CONVERT_BATCH_MAX_FILES'] = 100
+app.config['CONVERT_BATCH_WORKERS'] = None  # None = jumlah core
+
+# --- Gambar ke PDF ---
+app.config['IMAGETOPDF_WORKERS'] = None  # None = jumlah core
+
+# --- PDF ke XLSX ---
+app.config['PDF_TABLES_WORKERS'] = None  # rentang halaman paralel per job, maks PROCESS_POOL_WORKERS; None = ukuran process pool
+
+# --- OCR ---
+app.config['OCR_TEXT_MIN_CHARS'] = 20  # halaman dengan text layer >= ini tidak di-OCR
+app.config['OCR_PREPROCESS'] = True  # grayscale + DPI adaptif + biner + deskew + crop sebelum Tesseract
+app.config['OCR_TARGET_LINE_PX'] = 30  # tinggi baris teks yang dituju saat memilih DPI
+app.config['OCR_MIN_DPI'] = 100
+app.config['OCR_MAX_DPI'] = 300
+app.config['OCR_WORKERS'] = None  # halaman scan yang di-OCR paralel (thread; tesseract/poppler = subprocess); None = jumlah core
+
+# --- PDF ke DOCX ---
+app.config['PDFTODOCX_WORKERS'] = None  # maks PROCESS_POOL_WORKERS; None = ukuran process pool
+app.config['PDFTODOCX_CHUNK_PAGES'] = 10  # halaman per rentang yang di-parse satu proses
+
+# --- Status job (progres) ---
+app.config['JOBS_DIR'] = os.environ.get('JOBS_DIR')  # None = <tmp>/webtoolkit_jobs
+app.config['JOB_TTL'] = 3600
+
+# --- Startup & import lazy (lihat utils/lazy.py) ---
+# Library berat (torch, cv2, pandas, pdfplumber, pdf2docx, sumy, ...) baru di-import saat
+# pertama dipakai. LAZY_WARMUP: kosong = tidak ada warmup, 'all' = semua, atau daftar
+# modul dipisah koma (mis. 'pandas,pdfplumber'); dijalankan di thread latar setelah request pertama.
+app.config['LAZY_WARMUP'] = os.environ.get('LAZY_WARMUP', '')
+
+# --- Pool per tool (lihat utils/pools.py) ---
+# View POST blueprint berat jalan di pool sendiri; halaman & static tetap di thread request.
+# Batas berlaku per proses worker gunicorn. Konkurensi = min(max_workers, memory_mb // job_memory_mb).
+app.config['TOOL_POOLS'] = {
+    'paraphraser': {'blueprints': ['para_bp'], 'max_workers': 1, 'max_queue': 4,
+                    'memory_mb': 2048, 'job_memory_mb': 1536},  # model IndoT5 + torch
+    'ai_image': {'blueprints': ['upscale_bp', 'sharpen_bp'], 'max_workers': 2, 'max_queue': 4,
+                 'memory_mb': 1536, 'job_memory_mb': 600},
+    # soffice berbagi satu profil user: konversi LibreOffice dijalankan satu per satu
+    'office': {'blueprints': ['docxtopdf_bp', 'xlsxtopdf_bp'], 'max_workers': 1, 'max_queue': 8, 'retry_after': 60},
+    'pdf': {'blueprints': ['ocr_bp', 'pdftodocx_bp', 'pdf_to_xlsx_bp', 'compresspdf_bp', 'pdftoimage_bp',
+                           'combine_bp', 'imagetopdf_bp', 'summ_bp'],
+            'max_workers': 4, 'max_queue': 16, 'memory_mb': 2048, 'job_memory_mb': 400},
+    'image': {'blueprints': ['convert_bp'], 'max_workers': 4, 'max_queue': 16},
+}
+# Process pool bersama (forkserver) untuk pdfplumber / pdf2docx: semua slot pool 'pdf' di satu
+# worker memakai proses yang sama, jadi proses anak per worker = PROCESS_POOL_WORKERS, bukan
+# jumlah core x slot. None = core dibagi rata antar GUNICORN_WORKERS (minimal 1).
+app.config['PROCESS_POOL_WORKERS'] = int(os.environ.get('PROCESS_POOL_WORKERS', 0)) or None
+
+# --- Admission control memori (lihat utils/admission.py) ---
+# Anggaran global semua worker; job berat memesan perkiraan puncak memorinya sebelum mulai.
+app.config['ADMISSION_ENABLED'] = True
+app.config['ADMISSION_MEMORY_MB'] = int(os.environ.get('ADMISSION_MEMORY_MB', 0)) or None  # None = separuh RAM fisik
+app.config['ADMISSION_DIR'] = os.environ.get('ADMISSION_DIR')  # None = <tmp>/webtoolkit_admission
+app.config['ADMISSION_DOWNGRADE_AFTER'] = 5  # detik antri sebelum opsi kualitas lebih rendah diterima
+app.config['ADMISSION_QUEUE_TIMEOUT'] = 30  # detik antri sebelum 503
+app.config['ADMISSION_RETRY_AFTER'] = 30
+
+# --- Metrik Prometheus di /metrics (lihat utils/metrics.py) ---
+# Snapshot per worker ditulis ke METRICS_DIR lalu dijumlahkan saat scrape.
+app.config['METRICS_ENABLED'] = True
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')  # None = <tmp>/webtoolkit_metrics
+app.config['METRICS_FLUSH_INTERVAL'] = 5  # detik
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # jika diset, scrape wajib 'Authorization: Bearer <token>'; None = hanya dari localhost tanpa proxy
+metrics.init_app(app)
+
+# --- Profiling on-demand (lihat utils/profiling.py) ---
+# Tanpa PROFILE_TOKEN / PROFILE_SECRET dan dengan PROFILE_CONTINUOUS_HZ = 0, tidak ada yang dibungkus.
+app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')  # header X-Profile-Token
+app.config['PROFILE_SECRET'] = os.environ.get('PROFILE_SECRET')  # header X-Profile-Signature (HMAC), lihat `flask profile-sign`
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR')  # None = <tmp>/webtoolkit_profiles
+app.config['PROFILE_MAX_FILES'] = 200  # file profile lama dihapus
+app.config['PROFILE_SAMPLE_INTERVAL'] = 0.005  # detik, mode 'sample'
+app.config['PROFILE_CONTINUOUS_HZ'] = float(os.environ.get('PROFILE_CONTINUOUS_HZ', 0))  # mis. 5 = 5 sampel/detik; 0 = mati
+app.config['PROFILE_CONTINUOUS_WINDOW'] = 60  # detik per file .folded
+
+# --- Pengiriman file hasil (lihat utils/results.py) ---
+# 'sendfile' = kernel sendfile lewat gunicorn; 'x-accel' = nginx (X-Accel-Redirect) yang mengirim
+# file sehingga worker langsung bebas; 'x-sendfile' = Apache / lighttpd.
+app.config['RESULTS_DIR'] = os.environ.get('RESULTS_DIR')  # None = <tmp>/webtoolkit_results; harus bisa dibaca proxy
+app.config['RESULTS_DELIVERY'] = os.environ.get('RESULTS_DELIVERY', 'sendfile')
+app.config['RESULTS_ACCEL_PREFIX'] = '/_results/'  # location internal nginx yang alias ke RESULTS_DIR
+app.config['RESULTS_TTL'] = 900  # detik; file hasil yang belum diambil proxy dihapus setelah ini
+results.init_app(app)
+
+# --- Single-flight (lihat utils/singleflight.py) ---
+# Request identik (hash upload + opsi) yang datang selagi job sama masih jalan menunggu & memakai hasilnya.
+app.config['SINGLEFLIGHT_ENABLED'] = True
+app.config['SINGLEFLIGHT_DIR'] = os.environ.get('SINGLEFLIGHT_DIR')  # None = <tmp>/webtoolkit_singleflight; sebaiknya satu filesystem dengan RESULTS_DIR
+app.config['SINGLEFLIGHT_WAIT_TIMEOUT'] = 600  # detik menunggu job identik sebelum memproses sendiri
+
+# --- Asset static ber-hash + precompress (lihat utils/assets.py) ---
+# url_for('static', ...) otomatis menunjuk ke static/dist/<nama>.<hash>.<ext> (cache immutable, varian .gz/.br).
+app.config['ASSETS_FINGERPRINT'] = os.environ.get('ASSETS_FINGERPRINT', '1') != '0'
+assets.init_app(app)
+
 
 # --- Pendaftaran Blueprints ---
-app.register_blueprint(ocr_bp)
-app.register_blueprint(combine_bp)
-app.register_blueprint(imagetopdf_bp)
-app.register_blueprint(sharpen_bp)
-app.register_blueprint(upscale_bp)
-app.register_blueprint(compresspdf_bp)
-app.register_blueprint(pdftoimage_bp)
-app.register_blueprint(pdftodocx_bp)
-app.register_blueprint(pdf_to_xlsx_bp)
-app.register_blueprint(docxtopdf_bp)
-app.register_blueprint(xlsxtopdf_bp)
-app.register_blueprint(summ_bp)
-app.register_blueprint(convert_bp)
-app.register_blueprint(para_bp)
+# Modul blueprint hanya berisi route + import ringan; waktu import per modul dicatat untuk startup-report.
+lazy.register_blueprints(app, [
+    ('blueprints.ocr', 'ocr_bp'),
+    ('blueprints.combine', 'combine_bp'),
+    ('blueprints.imagetopdf', 'imagetopdf_bp'),
+    ('blueprints.sharpen', 'sharpen_bp'),
+    ('blueprints.upscale', 'upscale_bp'),
+    ('blueprints.compresspdf', 'compresspdf_bp'),
+    ('blueprints.pdftoimage', 'pdftoimage_bp'),
+    ('blueprints.pdftodocx', 'pdftodocx_bp'),
+    ('blueprints.pdf_to_xlsx', 'pdf_to_xlsx_bp'),
+    ('blueprints.docxtopdf', 'docxtopdf_bp'),
+    ('blueprints.xlsxtopdf', 'xlsxtopdf_bp'),
+    ('blueprints.summarizer', 'summ_bp'),
+    ('blueprints.convertimage', 'convert_bp'),
+    ('blueprints.paraphraser', 'para_bp'),
+])
+app.logger.info(f"Startup: {len(lazy.STARTUP_TIMES)} blueprint terdaftar dalam {sum(lazy.STARTUP_TIMES.values()):.3f} detik")
+profiling.init_app(app)  # sebelum pools: profiler harus jalan di thread pool tool
+pools.init_app(app)
+singleflight.init_app(app)  # setelah pools: request identik menunggu di thread request, bukan di slot pool
+
+@app.before_request
+def _start_lazy_warmup():
+    # di dalam worker (bukan master gunicorn sebelum fork); start_warmup hanya jalan sekali
+    modules = app.config.get('LAZY_WARMUP')
+    if modules:
+        lazy.start_warmup(None if modules == 'all' else modules.split(','), app.logger)
+
+@app.cli.command('startup-report')
+def startup_report():
+    """Waktu import per modul blueprint dan modul lazy (setelah warmup semua)."""
+    lazy.warmup()  # modul yang tidak terpasang tampil sebagai "-"
+    for kind, name, secs in lazy.startup_report():
+        print(f"{kind:<10} {name:<28} {'-' if secs is None else f'{secs:.3f}s':>9}")
+
+@app.cli.command('assets-build')
+@click.option('--clean', is_flag=True, help='Hapus file ber-hash lama yang tidak ada di manifest.')
+def assets_build(clean):
+    """Fingerprint & kompres file static ke static/dist (dijalankan saat deploy)."""
+    manifest = assets.build(app.static_folder, clean=clean)
+    print(f"{len(manifest)} file static ditulis ke {os.path.join(app.static_folder, assets.DIST)}")
+
+@app.cli.command('profile-sign')
+@click.argument('path')
+@click.option('--method', default='POST')
+def profile_sign(path, method):
+    """Header X-Profile-Signature untuk satu request ke PATH (butuh PROFILE_SECRET)."""
+    if not app.config.get('PROFILE_SECRET'):
+        raise click.ClickException('PROFILE_SECRET belum diset.')
+    print(f"X-Profile-Signature: {profiling.sign(app.config['PROFILE_SECRET'], method, path)}")
 
 # --- Routing Halaman Utama (Homepage) ---
 @app.route('/')
@@ -81,46 +227,20 @@ def robots_txt():
     return send_from_directory(app.static_folder, 'robots.txt')
 
 # --- Routing Sitemap.xml ---
+# URL dasar situs Anda
+app.config['SITE_URL'] = os.environ.get('SITE_URL', 'https://toolkit.jhoniarifintarigan.id')
+SITEMAP_EXCLUDE = ('sitemap', 'robots_txt')  # route GET tanpa parameter yang bukan halaman
+
 @app.route('/sitemap.xml')
 def sitemap():
-    # URL dasar situs Anda
-    BASE_URL = "https://toolkit.jhoniarifintarigan.id" 
-    today = datetime.now().strftime('%Y-%m-%d')
-
-    # Kumpulkan URL Statis
-    # Ini adalah route-route yang Anda definisikan secara manual
-    static_routes = [
-        '/',
-        '/about',
-        '/contact',
-        '/privacy',
-        '/qr-generator',
-        '/compress-image',
-        '/ocr/',
-        '/gabung-pdf/',
-        '/image-to-pdf/',
-        '/pertajam-gambar/',
-        '/peningkatan-hd/',
-        '/downscale-image',
-        '/kompres-pdf/',
-        '/pdf-ke-gambar/',
-        '/pdf-ke-docx/',
-        '/pdf-to-xlsx/',
-        '/docx-ke-pdf/',
-        '/xlsx-ke-pdf/',
-        '/password-generator',
-        '/summarizer/',
-        '/convert-image/',
-        '/paraphraser/',
-        # Tambahkan halaman statis lainnya di sini
-    ]
-
-    xml_content = render_template(
-        'sitemap.xml',
-        base_url=BASE_URL,
-        routes=static_routes,  # <-- INI PERBAIKANNYA
-        lastmod_date=today
-    )
+    # Semua halaman (route GET tanpa parameter) diambil dari url_map, jadi halaman baru
+    # otomatis masuk. lastmod = mtime template halaman, stabil sampai template berubah.
+    routes = []
+    for path, endpoint in pagecache.page_endpoints(app, exclude=SITEMAP_EXCLUDE):
+        modified = pagecache.last_modified(app, path, endpoint)
+        routes.append((path, modified.strftime('%Y-%m-%d') if modified else None))
+
+    xml_content = render_template('sitemap.xml', base_url=app.config['SITE_URL'].rstrip('/'), routes=routes)
 
     response = make_response(xml_content)
     response.headers["Content-Type"] = "application/xml"
@@ -130,4 +250,12 @@ def sitemap():
 @app.errorhandler(413)
 def request_entity_too_large(error):
     # Mengarahkan ke halaman utama dengan pesan error
-    return render_template('index.html', error_message="Ukuran file terlalu besar. Maksimum yang diizinkan adalah 16 MB."), 413
+    limit_mb = uploads.upload_limit_mb()
+    return render_template('index.html', error_message=f"Ukuran file terlalu besar. Maksimum yang diizinkan adalah {limit_mb} MB."), 413
+
+# --- Cache halaman statis (lihat utils/pagecache.py) ---
+# Route GET tanpa parameter di-render sekali per worker; ETag / Last-Modified dari template -> 304.
+# Dipanggil paling akhir supaya semua route (termasuk sitemap) sudah terdaftar.
+app.config['PAGE_CACHE_ENABLED'] = True
+app.config['PAGE_CACHE_MAX_AGE'] = 300  # detik sebelum browser merevalidasi
+pagecache.init_app(app)
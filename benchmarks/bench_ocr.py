@@ -0,0 +1,172 @@
+# benchmarks/bench_ocr.py
+"""
+Benchmark OCR: throughput (halaman/detik) dan akurasi karakter (CER).
+
+Membandingkan alur lama (render 150 dpi berwarna, tanpa pra-proses) dengan
+pra-proses utils.ocrprep (grayscale, DPI adaptif, biner, deskew, crop).
+Butuh `tesseract` (+ bahasa 'ind') dan poppler terpasang.
+
+Korpus default dibuat sintetis di benchmarks/.fixtures/ocr: halaman teks
+dengan ukuran huruf berbeda, sedikit miring, berderau, disimpan sebagai PDF
+hasil "scan" beserta teks aslinya. Korpus sendiri bisa dipakai dengan
+--corpus DIR berisi pasangan `nama.pdf` / `nama.png` + `nama.txt`.
+
+Pemakaian (dari root repo):
+    python -m benchmarks.bench_ocr
+    python -m benchmarks.bench_ocr --corpus /data/scan-sampel --json hasil.json
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from flask import Flask
+from PIL import Image, ImageDraw, ImageFont
+
+from benchmarks.fixtures import FIXTURE_DIR
+from utils.pdfstream import ImagePdfWriter
+
+WORDS = ('laporan keuangan pemerintah daerah tahun anggaran realisasi pendapatan belanja '
+         'modal pegawai barang jasa kegiatan program dinas kabupaten provinsi nomor tanggal '
+         'sesuai ketentuan peraturan menteri dalam negeri').split()
+SCAN_DPI = 200
+FONT_SIZES_PT = (9, 11, 14)  # variasi ukuran teks antar halaman
+
+
+def _font(size_px):
+    for path in glob.glob('/usr/share/fonts/**/DejaVuSans.ttf', recursive=True):
+        return ImageFont.truetype(path, size_px)
+    return ImageFont.load_default(size_px)
+
+
+def _scan_page(rng, size_pt):
+    """Satu halaman A4 hasil 'scan': teks hitam, miring +-2 derajat, berderau."""
+    width, height = int(8.27 * SCAN_DPI), int(11.69 * SCAN_DPI)
+    size_px = int(size_pt * SCAN_DPI / 72)
+    font = _font(size_px)
+    page = Image.new('L', (width, height), 245)
+    draw = ImageDraw.Draw(page)
+    lines = []
+    y = int(0.8 * SCAN_DPI)
+    while y < height - SCAN_DPI:
+        line = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 9)))
+        draw.text((int(0.9 * SCAN_DPI), y), line, font=font, fill=20)
+        lines.append(line)
+        y += int(size_px * 1.6)
+    page = page.rotate(rng.uniform(-2, 2), fillcolor=245, resample=Image.Resampling.BILINEAR)
+    noise = np.asarray(Image.effect_noise(page.size, 18), dtype=np.int16) - 128
+    page = Image.fromarray(np.clip(np.asarray(page, dtype=np.int16) + noise // 4, 0, 255).astype(np.uint8))
+    return page, '\n'.join(lines)
+
+
+def build_corpus(directory, pages_per_size=2):
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random('ocr')
+    for size_pt in FONT_SIZES_PT:
+        name = os.path.join(directory, f'scan_{size_pt}pt')
+        if os.path.exists(name + '.pdf'):
+            continue
+        texts = []
+        with open(name + '.pdf', 'wb') as f:
+            writer = ImagePdfWriter(f, resolution=SCAN_DPI)
+            for _ in range(pages_per_size):
+                page, text = _scan_page(rng, size_pt)
+                buf = io.BytesIO()
+                page.save(buf, 'JPEG', quality=75)
+                writer.add_jpeg(buf.getvalue(), page.width, page.height, 'L')
+                texts.append(text)
+            writer.close()
+        with open(name + '.txt', 'w') as f:
+            f.write('\n'.join(texts))
+    return directory
+
+
+def levenshtein(a, b):
+    """Edit distance dengan baris DP yang divektorkan NumPy."""
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    b_codes = np.frombuffer(b.encode('utf-32-le'), dtype=np.uint32)
+    idx = np.arange(len(b) + 1)
+    prev = idx.copy()
+    for i, ch in enumerate(a, start=1):
+        cost = (b_codes != ord(ch)).astype(np.int64)
+        tmp = np.empty_like(prev)
+        tmp[0] = i
+        tmp[1:] = np.minimum(prev[1:] + 1, prev[:-1] + cost)
+        # sisipan (kiri ke kanan) diselesaikan dengan akumulasi minimum
+        prev = np.minimum.accumulate(tmp - idx) + idx
+    return int(prev[-1])
+
+
+def cer(reference, hypothesis):
+    ref = ' '.join(reference.split())
+    hyp = ' '.join(hypothesis.split())
+    return levenshtein(ref, hyp) / max(len(ref), 1)
+
+
+def _samples(directory):
+    for path in sorted(glob.glob(os.path.join(directory, '*'))):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in ('.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff') and os.path.exists(stem + '.txt'):
+            with open(stem + '.txt') as f:
+                yield path, f.read()
+
+
+def run(directory, modes):
+    from blueprints.ocr import ocr_pdf_page, ocr_image, ocr_options
+    from utils.textlayer import page_text_layers
+
+    app = Flask(__name__)
+    results = []
+    for mode in modes:
+        app.config['OCR_PREPROCESS'] = mode == 'preprocess'
+        pages = 0
+        errors = []
+        start = time.perf_counter()
+        with app.app_context():
+            opts = ocr_options()
+            for path, reference in _samples(directory):
+                if path.lower().endswith('.pdf'):
+                    count = len(page_text_layers(path))
+                    text = '\n'.join(ocr_pdf_page(path, i, opts) for i in range(1, count + 1))
+                else:
+                    count = 1
+                    text = ocr_image(Image.open(path), opts)
+                pages += count
+                errors.append(cer(reference, text))
+        elapsed = time.perf_counter() - start
+        results.append({
+            'mode': mode, 'pages': pages, 'seconds': round(elapsed, 2),
+            'pages_per_sec': round(pages / elapsed, 3) if elapsed else None,
+            'cer': round(float(np.mean(errors)), 4) if errors else None,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='direktori sampel (default: korpus sintetis)')
+    parser.add_argument('--modes', nargs='+', default=['baseline', 'preprocess'], choices=['baseline', 'preprocess'])
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    directory = args.corpus or build_corpus(os.path.join(FIXTURE_DIR, 'ocr'))
+    results = run(directory, args.modes)
+    print(f"{'mode':<11} {'hal':>5} {'detik':>8} {'hal/dtk':>8} {'CER':>7}")
+    for r in results:
+        print(f"{r['mode']:<11} {r['pages']:>5} {r['seconds']:>8.2f} {r['pages_per_sec']:>8.3f} {r['cer']:>7.2%}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/bench_pdftables.py
+"""
+Benchmark ekstraksi tabel pdf-to-xlsx (utils.pdftables).
+
+Setiap kombinasi fixture x strategi dijalankan di subprocess tersendiri supaya
+peak RSS (ru_maxrss) tidak tercampur antar run. Strategi:
+- lines    : extract_tables (prefer_stream off)
+- stream   : extract_tables (prefer_stream on)
+- fallback : extract_text_rows (parser posisi kata)
+- full     : alur /process lengkap (tabel -> fallback jika kosong -> xlsx)
+
+Pemakaian (dari root repo):
+    python -m benchmarks.bench_pdftables
+    python -m benchmarks.bench_pdftables --fixtures ruled huge --workers 1 4 --json hasil.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pdfplumber
+
+from benchmarks.fixtures import FIXTURES, fixture_path
+
+STRATEGIES = ('lines', 'stream', 'fallback', 'full')
+
+
+def _run(strategy, path, workers):
+    from utils.pdftables import extract_tables, extract_text_rows, write_tables
+    import pandas as pd
+
+    if strategy == 'lines':
+        return len(extract_tables(path, prefer_stream=False, workers=workers))
+    if strategy == 'stream':
+        return len(extract_tables(path, prefer_stream=True, workers=workers))
+    if strategy == 'fallback':
+        return len(extract_text_rows(path, workers=workers))
+
+    tables = [(f'p{p}_t{t}', pd.DataFrame(rows)) for p, t, rows in extract_tables(path, workers=workers)]
+    if not tables:
+        tables = [('extracted_text', extract_text_rows(path, workers=workers))]
+    with tempfile.TemporaryFile() as out:
+        write_tables(tables, out, merge=True)
+    return len(tables)
+
+
+def run_one(fixture, strategy, workers):
+    """Dijalankan di subprocess: ukur satu kombinasi lalu cetak hasil JSON."""
+    path = fixture_path(fixture)
+    with pdfplumber.open(path) as pdf:
+        pages = len(pdf.pages)
+    start = time.perf_counter()
+    items = _run(strategy, path, workers)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss dalam KB di Linux; anak proses (worker pool) dihitung terpisah
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({
+        'fixture': fixture, 'strategy': strategy, 'workers': workers, 'pages': pages,
+        'items': items, 'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed else None,
+        'peak_rss_mb': round(peak / 1024, 1),
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', nargs='+', default=list(FIXTURES), choices=list(FIXTURES))
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument('--workers', nargs='+', type=int, default=[os.cpu_count() or 1])
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    parser.add_argument('--one', nargs=3, metavar=('FIXTURE', 'STRATEGY', 'WORKERS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.one:
+        fixture, strategy, workers = args.one
+        run_one(fixture, strategy, int(workers))
+        return 0
+
+    results = []
+    print(f"{'fixture':<9} {'strategi':<9} {'workers':>7} {'hal':>5} {'item':>6} {'detik':>8} {'hal/dtk':>8} {'RSS MB':>8}")
+    for fixture in args.fixtures:
+        fixture_path(fixture)  # buat sekali di proses induk, bukan di setiap subprocess
+        for strategy in args.strategies:
+            for workers in args.workers:
+                proc = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_pdftables', '--one', fixture, strategy, str(workers)],
+                    capture_output=True, text=True,
+                )
+                if proc.returncode != 0:
+                    print(f"{fixture:<9} {strategy:<9} {workers:>7} GAGAL: {proc.stderr.strip().splitlines()[-1:]}")
+                    continue
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                results.append(r)
+                print(f"{r['fixture']:<9} {r['strategy']:<9} {r['workers']:>7} {r['pages']:>5} {r['items']:>6} "
+                      f"{r['seconds']:>8.2f} {r['pages_per_sec']:>8.1f} {r['peak_rss_mb']:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
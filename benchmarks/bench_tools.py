@@ -0,0 +1,406 @@
+# benchmarks/bench_tools.py
+"""
+Benchmark end-to-end & load test semua endpoint tool.
+
+Setiap skenario mengirim fixture sintetis (benchmarks/fixtures.py) ke satu
+endpoint POST dan mengukur throughput (request sukses/detik), latency
+p50/p95/p99 dan peak RSS. Dua mode:
+- client   : Flask test client di proses sendiri per skenario (peak RSS =
+             ru_maxrss proses + anak), ``--concurrency`` thread.
+- gunicorn : satu server lokal ``gunicorn -c gunicorn.conf.py`` di port bebas,
+             request HTTP paralel; peak RSS = jumlah RSS master + semua worker
+             (+ subprocess seperti soffice / tesseract) selama skenario.
+Skenario yang dependency-nya tidak ada (gs, soffice, tesseract, model AI, ...)
+dilewati dan dilaporkan.
+
+Hasil dibandingkan dengan baseline JSON (default benchmarks/baseline.json jika
+ada): p95 yang naik / throughput yang turun lebih dari ``--tolerance``, peak
+RSS yang naik lebih dari ``--rss-tolerance``, atau request yang mulai gagal
+dicetak sebagai REGRESI dan exit code 1.
+
+Pemakaian (dari root repo):
+    python -m benchmarks.bench_tools --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_tools                       # bandingkan dengan baseline
+    python -m benchmarks.bench_tools --mode gunicorn --concurrency 8 --requests 40 --scenarios ocr-text pdf_to_xlsx
+"""
+import argparse
+import importlib.util
+import io
+import json
+import mimetypes
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import docx_fixture, image_fixture, pdf_fixture, xlsx_fixture
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+PARAPHRASE_TEXT = ' '.join(['Pemerintah daerah menyusun laporan keuangan setiap tahun anggaran.'] * 12)
+
+# nama -> (path, [(field, fixture)], form, dependency)
+SCENARIOS = {
+    'ocr-text': ('/ocr/convert', [('file', lambda: pdf_fixture('text', 20))], {'output': 'txt'}, ()),
+    'ocr-scan': ('/ocr/convert', [('file', lambda: pdf_fixture('images', 3))], {'output': 'txt'},
+                 ('cmd:tesseract', 'cmd:pdftoppm')),
+    'ocr-searchable': ('/ocr/convert', [('file', lambda: pdf_fixture('images', 3))], {'output': 'pdf'},
+                       ('cmd:tesseract', 'cmd:pdftoppm')),
+    'combine': ('/gabung-pdf/combine', [('pdfs[]', lambda: pdf_fixture('text', 10)),
+                                        ('pdfs[]', lambda: pdf_fixture('tables', 10))], {}, ()),
+    'imagetopdf': ('/image-to-pdf/convert', [('images[]', lambda: image_fixture('jpeg', 1600, 1200)),
+                                             ('images[]', lambda: image_fixture('png', 2400, 1800)),
+                                             ('images[]', lambda: image_fixture('webp', 1024, 768))], {}, ()),
+    'sharpen': ('/pertajam-gambar/process', [('image', lambda: image_fixture('jpeg', 1600, 1200))],
+                {'mode': 'classic'}, ()),
+    'sharpen-ai': ('/pertajam-gambar/process', [('image', lambda: image_fixture('jpeg', 640, 480))],
+                   {'mode': 'ai'}, ('superres',)),
+    'upscale': ('/peningkatan-hd/process', [('image', lambda: image_fixture('png', 640, 480))],
+                {'scale': '2'}, ('superres',)),
+    'compresspdf': ('/kompres-pdf/process', [('file', lambda: pdf_fixture('images', 5))],
+                    {'level': 'medium'}, ('cmd:gs',)),
+    'pdftoimage': ('/pdf-ke-gambar/process', [('file', lambda: pdf_fixture('text', 5))],
+                   {'format': 'jpeg'}, ('cmd:pdftoppm',)),
+    'pdftodocx': ('/pdf-ke-docx/process', [('file', lambda: pdf_fixture('text', 10))], {}, ('module:pdf2docx',)),
+    'pdf_to_xlsx': ('/pdf-to-xlsx/process', [('file', lambda: pdf_fixture('tables', 10))], {},
+                    ('module:pdfplumber', 'module:pandas')),
+    'docxtopdf': ('/docx-ke-pdf/process', [('file', lambda: docx_fixture(50))], {}, ('cmd:soffice',)),
+    'xlsxtopdf': ('/xlsx-ke-pdf/process', [('file', lambda: xlsx_fixture(500))], {}, ('cmd:soffice',)),
+    'summarizer': ('/summarizer/process', [('file', lambda: docx_fixture(50))], {'sentences': '5'}, ('module:docx',)),
+    'convertimage': ('/convert-image/process', [('image', lambda: image_fixture('png', 1600, 1200))],
+                     {'target': 'image/webp'}, ()),
+    'convertimage-batch': ('/convert-image/batch', [('images[]', lambda: image_fixture('png', 1600, 1200)),
+                                                    ('images[]', lambda: image_fixture('jpeg', 1600, 1200)),
+                                                    ('images[]', lambda: image_fixture('webp', 1024, 768))],
+                           {'target': 'image/jpeg'}, ()),
+    'paraphraser': ('/paraphraser/process', [], {'text': PARAPHRASE_TEXT, 'mode': 'natural'},
+                    ('module:transformers', 'module:torch')),
+}
+
+
+def missing_dependencies(needs):
+    missing = []
+    for need in needs:
+        kind, _, name = need.partition(':')
+        if kind == 'cmd' and not shutil.which(name):
+            missing.append(name)
+        elif kind == 'module' and importlib.util.find_spec(name) is None:
+            missing.append(name)
+        elif kind == 'superres':
+            try:
+                import cv2
+                cv2.dnn_superres.DnnSuperResImpl_create()
+            except Exception:
+                missing.append('cv2.dnn_superres')
+            if not os.path.exists(os.path.join(ROOT, 'models', 'FSRCNN_x4.pb')):
+                missing.append('models/FSRCNN_x*.pb')
+    return missing
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile dari list yang sudah urut."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(name, mode, latencies, errors, wall, peak_rss_kb, first_error=None):
+    latencies = sorted(latencies)
+    ms = lambda v: round(v * 1000, 1) if v is not None else None
+    return {
+        'scenario': name, 'mode': mode, 'requests': len(latencies) + errors, 'errors': errors,
+        'throughput': round(len(latencies) / wall, 3) if wall and latencies else 0.0,
+        'p50_ms': ms(percentile(latencies, 50)), 'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)), 'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'first_error': first_error,
+    }
+
+
+def _drive(send, requests, concurrency, warmup):
+    """Jalankan `send()` -> (status, body) sebanyak `requests` kali dengan `concurrency` thread."""
+    for _ in range(warmup):
+        send()
+    latencies, errors, first_error = [], 0, None
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors, first_error
+        start = time.perf_counter()
+        status, body = send()
+        elapsed = time.perf_counter() - start
+        with lock:
+            if 200 <= status < 300:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+                first_error = first_error or f'{status}: {body[:200]!r}'
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return latencies, errors, time.perf_counter() - start, first_error
+
+
+# --- Mode client (Flask test client) ---
+
+def run_client(name, requests, concurrency, warmup):
+    """Dijalankan di subprocess: satu skenario lewat test client, cetak hasil JSON."""
+    from app import app
+    path, files, form, _ = SCENARIOS[name]
+    files = [(field, fixture()) for field, fixture in files]
+    local = threading.local()
+
+    def send():
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        data = dict(form)
+        for field, file_path in files:
+            with open(file_path, 'rb') as f:
+                data.setdefault(field, []).append((io.BytesIO(f.read()), os.path.basename(file_path)))
+        response = local.client.post(path, data=data, content_type='multipart/form-data')
+        body = response.get_data()  # respons streaming ikut dikonsumsi, seperti klien sungguhan
+        response.close()
+        return response.status_code, body
+
+    latencies, errors, wall, first_error = _drive(send, requests, concurrency, warmup)
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps(summarize(name, 'client', latencies, errors, wall, peak, first_error)))
+
+
+def client_scenario(name, args):
+    proc = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_tools', '--one', name,
+         '--requests', str(args.requests), '--concurrency', str(args.concurrency), '--warmup', str(args.warmup)],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError((proc.stderr.strip().splitlines() or ['?'])[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# --- Mode gunicorn (HTTP lokal) ---
+
+def _multipart(form, files):
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for key, value in form.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode())
+    for field, file_path in files:
+        filename = os.path.basename(file_path)
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                  f'Content-Type: {content_type}\r\n\r\n'.encode())
+        with open(file_path, 'rb') as f:
+            shutil.copyfileobj(f, out)
+        out.write(b'\r\n')
+    out.write(f'--{boundary}--\r\n'.encode())
+    return out.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def _tree_rss_kb(root_pid):
+    """Jumlah VmRSS (KB) proses `root_pid` dan semua turunannya, dari /proc."""
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as f:
+                fields = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue
+        children.setdefault(int(fields['PPid'].strip()), []).append(int(entry))
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0])
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class GunicornServer:
+    def __init__(self, workers, threads):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{self.port}')
+        if workers:
+            env['GUNICORN_WORKERS'] = str(workers)
+        if threads:
+            env['GUNICORN_THREADS'] = str(threads)
+        self.proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                                     cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f'{self.url}/robots.txt', timeout=2).read()
+                return
+            except (OSError, urllib.error.URLError):
+                if self.proc.poll() is not None:
+                    raise RuntimeError('gunicorn berhenti saat startup (cek `gunicorn -c gunicorn.conf.py wsgi:application`)')
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError('gunicorn tidak siap dalam 60 detik')
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def gunicorn_scenario(name, args, server):
+    path, files, form, _ = SCENARIOS[name]
+    body, content_type = _multipart(form, [(field, fixture()) for field, fixture in files])
+
+    def send():
+        req = urllib.request.Request(server.url + path, data=body, method='POST', headers={'Content-Type': content_type})
+        try:
+            with urllib.request.urlopen(req, timeout=600) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    peak = [0]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.1):
+            peak[0] = max(peak[0], _tree_rss_kb(server.proc.pid))
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        latencies, errors, wall, first_error = _drive(send, args.requests, args.concurrency, args.warmup)
+    finally:
+        done.set()
+        sampler.join()
+    return summarize(name, 'gunicorn', latencies, errors, wall, peak[0], first_error)
+
+
+# --- Baseline ---
+
+def compare(results, baseline, tolerance, rss_tolerance, min_delta_ms):
+    """List pesan regresi (kosong = aman)."""
+    regressions = []
+    for r in results:
+        base = baseline.get(f"{r['mode']}/{r['scenario']}")
+        if not base:
+            continue
+        key = f"{r['mode']}/{r['scenario']}"
+        if r['errors'] and not base.get('errors'):
+            regressions.append(f"{key}: {r['errors']} request gagal ({r['first_error']})")
+        if r['p95_ms'] and base.get('p95_ms') and r['p95_ms'] > base['p95_ms'] * (1 + tolerance) \
+                and r['p95_ms'] - base['p95_ms'] > min_delta_ms:
+            regressions.append(f"{key}: p95 {base['p95_ms']} -> {r['p95_ms']} ms")
+        if base.get('throughput') and r['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {base['throughput']} -> {r['throughput']} req/dtk")
+        if base.get('peak_rss_mb') and r['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance):
+            regressions.append(f"{key}: peak RSS {base['peak_rss_mb']} -> {r['peak_rss_mb']} MB")
+    return regressions
+
+
+def _print_row(r):
+    fmt = lambda v: '-' if v is None else f'{v:.1f}'
+    print(f"{r['mode']:<9} {r['scenario']:<19} {r['requests']:>5} {r['errors']:>5} {r['throughput']:>8.2f} "
+          f"{fmt(r['p50_ms']):>9} {fmt(r['p95_ms']):>9} {fmt(r['p99_ms']):>9} {r['peak_rss_mb']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--mode', nargs='+', default=['client'], choices=['client', 'gunicorn'])
+    parser.add_argument('--requests', type=int, default=10, help='request terukur per skenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=1, help='request awal yang tidak diukur (import lazy, model)')
+    parser.add_argument('--gunicorn-workers', type=int, help='default: GUNICORN_WORKERS / jumlah core')
+    parser.add_argument('--gunicorn-threads', type=int)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON baseline untuk dibandingkan')
+    parser.add_argument('--save-baseline', metavar='PATH', help='simpan hasil run ini sebagai baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='batas kenaikan p95 / penurunan throughput')
+    parser.add_argument('--rss-tolerance', type=float, default=0.20)
+    parser.add_argument('--min-delta-ms', type=float, default=20.0, help='kenaikan p95 lebih kecil dari ini diabaikan')
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    parser.add_argument('--one', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.one:
+        run_client(args.one, args.requests, args.concurrency, args.warmup)
+        return 0
+
+    runnable = []
+    for name in args.scenarios:
+        missing = missing_dependencies(SCENARIOS[name][3])
+        if missing:
+            print(f"lewati {name}: tidak ada {', '.join(missing)}")
+            continue
+        for _, fixture in SCENARIOS[name][1]:
+            fixture()  # buat sekali di proses induk, bukan di setiap subprocess
+        runnable.append(name)
+
+    results = []
+    print(f"{'mode':<9} {'skenario':<19} {'req':>5} {'gagal':>5} {'req/dtk':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8}")
+    for mode in args.mode:
+        server = None
+        if mode == 'gunicorn':
+            if importlib.util.find_spec('gunicorn') is None:
+                print('lewati mode gunicorn: gunicorn tidak terpasang')
+                continue
+            server = GunicornServer(args.gunicorn_workers, args.gunicorn_threads)
+        try:
+            for name in runnable:
+                try:
+                    r = client_scenario(name, args) if mode == 'client' else gunicorn_scenario(name, args, server)
+                except Exception as e:
+                    print(f"{mode:<9} {name:<19} GAGAL: {e}")
+                    continue
+                results.append(r)
+                _print_row(r)
+        finally:
+            if server:
+                server.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({f"{r['mode']}/{r['scenario']}": r for r in results}, f, indent=2, sort_keys=True)
+        print(f'baseline disimpan ke {args.save_baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'tidak ada baseline ({args.baseline}); buat dengan --save-baseline')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.rss_tolerance, args.min_delta_ms)
+    if regressions:
+        print('\n' + '!' * 70)
+        print(f'REGRESI PERFORMA dibanding {args.baseline}:')
+        for message in regressions:
+            print(f'  - {message}')
+        print('!' * 70)
+        return 1
+    print(f'tidak ada regresi dibanding {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# benchmarks/fixtures.py
+"""
+Fixture sintetis untuk benchmark, dibuat tanpa dependency tambahan.
+
+PDF (``fixture_path``):
+- ruled   : tabel bergaris (strategi 'lines' pdfplumber)
+- stream  : tabel tanpa garis, kolom hanya dari posisi teks
+- scanned : halaman berisi gambar saja (tanpa text layer)
+- huge    : ratusan halaman campuran tabel, teks biasa dan halaman kosong
+PDF dengan jumlah halaman bebas (``pdf_fixture``): 'text', 'tables', 'images'.
+File lain: ``image_fixture`` (PNG/JPEG/WEBP ukuran bebas), ``docx_fixture``
+(python-docx) dan ``xlsx_fixture`` (xlsxwriter).
+File disimpan di benchmarks/.fixtures dan dipakai ulang jika sudah ada.
+"""
+import io
+import os
+import random
+
+from PIL import Image
+
+from utils.pdfstream import ImagePdfWriter
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.fixtures')
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+
+def _write_text_pdf(path, contents):
+    """PDF minimal: satu content stream per halaman, font Helvetica standar."""
+    objects = {1: b'<< /Type /Catalog /Pages 2 0 R >>',
+               3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'}
+    kids = []
+    next_id = 4
+    for content in contents:
+        objects[next_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content)
+        objects[next_id + 1] = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (PAGE_WIDTH, PAGE_HEIGHT, next_id)
+        )
+        kids.append(next_id + 1)
+        next_id += 2
+    objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for obj_id in range(1, next_id):
+        offsets[obj_id] = len(out)
+        out += b'%d 0 obj\n%s\nendobj\n' % (obj_id, objects[obj_id])
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % next_id
+    for obj_id in range(1, next_id):
+        out += b'%010d 00000 n \n' % offsets[obj_id]
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (next_id, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def _text(x, y, s, size=9):
+    return b'BT /F1 %d Tf %d %d Td (%s) Tj ET' % (size, x, y, s.encode('latin-1'))
+
+
+def ruled_page(rng, rows=30, cols=6):
+    ops = []
+    x0, y0, w, h = 40, 750, 88, 22
+    for r in range(rows + 1):
+        ops.append(b'%d %d m %d %d l S' % (x0, y0 - r * h, x0 + cols * w, y0 - r * h))
+    for c in range(cols + 1):
+        ops.append(b'%d %d m %d %d l S' % (x0 + c * w, y0, x0 + c * w, y0 - rows * h))
+    for r in range(rows):
+        for c in range(cols):
+            cell = f'Kolom {c + 1}' if r == 0 else f'{rng.uniform(0, 99999):,.2f}'
+            ops.append(_text(x0 + c * w + 4, y0 - r * h - 15, cell))
+    return b'\n'.join(ops)
+
+
+def stream_page(rng, rows=48, cols=6):
+    ops = []
+    for r in range(rows):
+        for c in range(cols):
+            cell = f'Header{c + 1}' if r == 0 else str(rng.randint(0, 10 ** (c + 2)))
+            ops.append(_text(40 + c * 92, 750 - r * 15, cell))
+    return b'\n'.join(ops)
+
+
+def prose_page(rng, lines=50):
+    words = ['laporan', 'keuangan', 'tahun', 'anggaran', 'realisasi', 'pendapatan', 'belanja', 'daerah']
+    return b'\n'.join(
+        _text(40, 750 - i * 14, ' '.join(rng.choice(words) for _ in range(12)), size=10) for i in range(lines)
+    )
+
+
+def _scanned_pdf(path, pages, rng):
+    with open(path, 'wb') as f:
+        writer = ImagePdfWriter(f, resolution=150.0)
+        for _ in range(pages):
+            # derau abu-abu ukuran A4 150 dpi: tidak ada text layer sama sekali
+            img = Image.effect_noise((1240, 1754), rng.randint(20, 60)).convert('L')
+            buf = io.BytesIO()
+            img.save(buf, 'JPEG', quality=70)
+            writer.add_jpeg(buf.getvalue(), img.width, img.height, 'L')
+        writer.close()
+
+
+FIXTURES = {
+    'ruled': lambda path, rng: _write_text_pdf(path, [ruled_page(rng) for _ in range(40)]),
+    'stream': lambda path, rng: _write_text_pdf(path, [stream_page(rng) for _ in range(40)]),
+    'scanned': lambda path, rng: _scanned_pdf(path, 10, rng),
+    'huge': lambda path, rng: _write_text_pdf(path, [
+        (ruled_page, stream_page, prose_page, lambda _rng: b'')[i % 4](rng) for i in range(400)
+    ]),
+}
+
+
+def _cached(filename, build):
+    """Path fixture `filename`, dibuat dulu dengan ``build(path, rng)`` jika belum ada (seed tetap)."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, filename)
+    if not os.path.exists(path):
+        tmp = path + '.tmp'
+        build(tmp, random.Random(filename))
+        os.replace(tmp, path)  # run paralel tidak pernah membaca fixture setengah jadi
+    return path
+
+
+def fixture_path(name):
+    """Path fixture PDF `name` dari FIXTURES."""
+    return _cached(f'{name}.pdf', FIXTURES[name])
+
+
+PDF_KINDS = {
+    'text': lambda pages: lambda path, rng: _write_text_pdf(path, [prose_page(rng) for _ in range(pages)]),
+    'tables': lambda pages: lambda path, rng: _write_text_pdf(path, [ruled_page(rng) for _ in range(pages)]),
+    'images': lambda pages: lambda path, rng: _scanned_pdf(path, pages, rng),
+}
+
+
+def pdf_fixture(kind, pages):
+    """PDF `pages` halaman berisi teks ('text'), tabel bergaris ('tables') atau gambar scan ('images')."""
+    return _cached(f'{kind}-{pages}.pdf', PDF_KINDS[kind](pages))
+
+
+def _photo(rng, width, height):
+    # gradasi + derau: tidak terlalu mudah dikompres, mirip foto
+    base = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), rng.randint(30, 60))
+    return Image.merge('RGB', (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def image_fixture(fmt, width, height):
+    """Gambar `fmt` ('png', 'jpeg', 'webp') berukuran `width` x `height`."""
+    def build(path, rng):
+        _photo(rng, width, height).save(path, fmt.upper(), **({'quality': 85} if fmt != 'png' else {}))
+    return _cached(f'image-{width}x{height}.{fmt}', build)
+
+
+def docx_fixture(paragraphs, tables=2):
+    """DOCX berisi `paragraphs` paragraf teks dan `tables` tabel 10x5."""
+    def build(path, rng):
+        import docx
+        doc = docx.Document()
+        doc.add_heading('Laporan Sintetis', 1)
+        for i in range(paragraphs):
+            words = ['laporan', 'keuangan', 'tahun', 'anggaran', 'realisasi', 'pendapatan', 'belanja', 'daerah']
+            doc.add_paragraph(' '.join(rng.choice(words) for _ in range(40)).capitalize() + '.')
+            if tables and i % max(1, paragraphs // tables) == 0:
+                table = doc.add_table(rows=10, cols=5)
+                for row in table.rows:
+                    for cell in row.cells:
+                        cell.text = f'{rng.uniform(0, 99999):,.2f}'
+        with open(path, 'wb') as f:
+            doc.save(f)
+    return _cached(f'doc-{paragraphs}p-{tables}t.docx', build)
+
+
+def xlsx_fixture(rows, cols=8, sheets=1):
+    """XLSX `sheets` sheet berisi `rows` x `cols` angka dan teks."""
+    def build(path, rng):
+        import xlsxwriter
+        book = xlsxwriter.Workbook(path)
+        for s in range(sheets):
+            sheet = book.add_worksheet(f'Data{s + 1}')
+            sheet.write_row(0, 0, [f'Kolom {c + 1}' for c in range(cols)])
+            for r in range(1, rows + 1):
+                sheet.write_row(r, 0, [rng.uniform(0, 99999) if c else f'Baris {r}' for c in range(cols)])
+        book.close()
+    return _cached(f'sheet-{rows}x{cols}-{sheets}.xlsx', build)
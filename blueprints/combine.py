@@ -3,9 +3,12 @@
 import io
 from flask import Blueprint, request, send_file, render_template, current_app
 from PyPDF2 import PdfWriter, PdfReader
+from utils.uploads import get_uploads, upload_policy
+from utils import metrics
 
 # 1. Inisialisasi Blueprint
 combine_bp = Blueprint('combine_bp', __name__, url_prefix='/gabung-pdf')
+upload_policy(combine_bp, {'pdf'})
 
 def combine_pdfs(pdf_files):
     """Menggabungkan file PDF (Logika Inti)."""
@@ -13,10 +16,10 @@ def combine_pdfs(pdf_files):
 
     for file in pdf_files:
         try:
-            file.seek(0)
-            reader = PdfReader(file)
-            for page in reader.pages:
-                pdf_merger.add_page(page)
+            with metrics.phase('parse'):
+                reader = PdfReader(file.stream())
+                for page in reader.pages:
+                    pdf_merger.add_page(page)
 
         except Exception as e:
             # Menggunakan current_app.logger di dalam Blueprint
@@ -24,7 +27,8 @@ def combine_pdfs(pdf_files):
             raise Exception(f"Gagal memproses file '{file.filename}'. Pastikan file tidak terproteksi sandi.")
 
     output_buffer = io.BytesIO()
-    pdf_merger.write(output_buffer)
+    with metrics.phase('encode'):
+        pdf_merger.write(output_buffer)
     output_buffer.seek(0)
     return output_buffer
 
@@ -37,7 +41,7 @@ def form():
 # 3. Routing untuk Proses Penggabungan (POST)
 @combine_bp.route('/combine', methods=['POST'])
 def combine():
-    uploaded_files = request.files.getlist('pdfs[]')
+    uploaded_files = get_uploads('pdfs[]')
     valid_files = [file for file in uploaded_files if file.filename and file.mimetype == 'application/pdf']
 
     if len(valid_files) < 2:
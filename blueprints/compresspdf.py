@@ -1,12 +1,11 @@
 # blueprints/compresspdf.py
-import os
-import io
-import tempfile
 import subprocess
-from flask import Blueprint, request, send_file, render_template, current_app
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request, render_template, current_app
+from utils.uploads import get_upload, upload_policy
+from utils import metrics, results
 
 compresspdf_bp = Blueprint('compresspdf_bp', __name__, url_prefix='/kompres-pdf')
+upload_policy(compresspdf_bp, {'pdf'})
 
 
 @compresspdf_bp.route('/', methods=['GET'])
@@ -37,10 +36,10 @@ def process():
     """Menerima file PDF, mengompresnya menggunakan Ghostscript, dan mengirim kembali"""
 
     # Validasi dasar
-    if 'file' not in request.files:
+    uploaded_file = get_upload('file')
+    if uploaded_file is None:
         return "Tidak ada file yang diunggah", 400
 
-    uploaded_file = request.files['file']
     if uploaded_file.filename == '':
         return "Nama file kosong", 400
 
@@ -55,19 +54,11 @@ def process():
     level = request.form.get('level', 'medium')
     pdf_setting = _map_level_to_pdfsettings(level)
 
-    # Simpan file upload ke temp file
-    in_tmp_path = None
-    out_tmp_path = None
+    # Input langsung dibaca Ghostscript dari file spool upload (tanpa salinan di memori);
+    # output ditulis langsung ke RESULTS_DIR lalu dikirim tanpa dibaca ulang ke memori
     try:
-        with tempfile.NamedTemporaryFile(prefix="in_pdf_", suffix=".pdf", delete=False) as in_tmp:
-            in_tmp_path = in_tmp.name
-            uploaded_file.stream.seek(0)
-            in_tmp.write(uploaded_file.stream.read())
-            in_tmp.flush()
-
-        # buat temp output file path
-        fd, out_tmp_path = tempfile.mkstemp(prefix="out_pdf_", suffix=".pdf")
-        os.close(fd)
+        in_tmp_path = uploaded_file.path
+        out_path = results.new_result('.pdf')
 
         # command Ghostscript
         # -dPDFSETTINGS controls quality/size
@@ -79,30 +70,19 @@ def process():
             "-dNOPAUSE",
             "-dBATCH",
             "-dQUIET",
-            "-sOutputFile=" + out_tmp_path,
+            "-sOutputFile=" + out_path,
             in_tmp_path
         ]
 
         # Jalankan Ghostscript (timeout untuk safety)
         # sesuaikan timeout jika file besar atau server lambat
-        subprocess.run(cmd, check=True, timeout=60)
-
-        # Baca hasil ke memory buffer agar bisa safe hapus temp file setelahnya
-        with open(out_tmp_path, "rb") as f:
-            output_bytes = f.read()
-
-        output_buffer = io.BytesIO(output_bytes)
-        output_buffer.seek(0)
+        with metrics.phase('gs'):
+            subprocess.run(cmd, check=True, timeout=60)
 
         # nama file hasil
         new_filename = "kompres_pdf_web_toolkit.pdf"
 
-        return send_file(
-            output_buffer,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=new_filename
-        )
+        return results.deliver(out_path, new_filename, 'application/pdf')
 
     except subprocess.CalledProcessError as e:
         current_app.logger.error(f"Ghostscript error: {e}")
@@ -1,7 +1,14 @@
 # blueprints/convertimage.py
 import io
-from flask import Blueprint, request, send_file, current_app, jsonify
-from PIL import Image, ImageSequence, UnidentifiedImageError
+import os
+import zipfile
+import tempfile
+from flask import Blueprint, request, send_file, current_app, jsonify, Response, stream_with_context
+from PIL import Image, UnidentifiedImageError
+from utils.uploads import get_upload, get_uploads
+from utils.animated import is_animated, save_animated
+from utils.concurrency import bounded_map
+from utils import metrics, pools
 
 convert_bp = Blueprint('convert_bp', __name__, url_prefix='/convert-image')
 
@@ -13,48 +20,48 @@ def form():
 # server menerima MIME target ini
 ALLOWED = {
     'image/png', 'image/jpeg', 'image/webp',
-    'image/bmp', 'image/tiff', 'image/gif'
+    'image/bmp', 'image/tiff', 'image/gif', 'image/apng'
 }
 
-@convert_bp.route('/process', methods=['POST'])
-def process():
-    # proteksi dasar
-    if 'image' not in request.files:
-        return "Tidak ada file", 400
-    f = request.files['image']
-    target = request.form.get('target')
+# target yang mempertahankan animasi jika sumbernya animasi (GIF/WebP/APNG)
+ANIMATED_TARGETS = {'image/gif': 'GIF', 'image/webp': 'WEBP', 'image/apng': 'PNG'}
+
+OUT_FORMATS = {
+    'image/png':'PNG','image/jpeg':'JPEG','image/webp':'WEBP',
+    'image/bmp':'BMP','image/tiff':'TIFF','image/apng':'PNG','image/gif':'GIF'
+}
+
+
+def _parse_quality():
     try:
-        quality = int(request.form.get('quality', 90))
+        return int(request.form.get('quality', 90))
     except:
-        quality = 90
+        return 90
 
-    if not target or target not in ALLOWED:
-        return "Target format tidak didukung di server.", 415
 
-    try:
-        img = Image.open(f.stream)
-    except UnidentifiedImageError:
-        return "File bukan gambar yang valid.", 400
-    except Exception as e:
-        current_app.logger.exception("Open image error")
-        return f"Gagal membuka gambar: {e}", 500
+def convert_image(img, target, quality):
+    """
+    Konversi satu gambar (sudah dibuka) ke `target`.
+    Return (file-like hasil, mimetype, ekstensi). Exception dilempar ke pemanggil.
+    """
+    out_format = OUT_FORMATS.get(target, 'PNG')
+    mimetype = 'image/png' if target == 'image/apng' else target
+    ext = 'png' if out_format == 'PNG' else out_format.lower()
+
+    # animasi dikonversi frame demi frame (memori O(1 frame)), hasil di-spool ke disk jika besar
+    if target in ANIMATED_TARGETS and is_animated(img):
+        out = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        save_animated(img, out, ANIMATED_TARGETS[target], quality=max(10, min(100, quality)))
+        out.seek(0)
+        return out, target, ext
 
     buf = io.BytesIO()
 
-    # handle animated GIF specially
+    # GIF satu frame
     if target == 'image/gif':
-        try:
-            frames = [frame.convert('RGBA').copy() for frame in ImageSequence.Iterator(img)]
-            # jika hanya 1 frame, simpan single GIF
-            if len(frames) == 1:
-                frames[0].save(buf, format='GIF')
-            else:
-                frames[0].save(buf, format='GIF', save_all=True, append_images=frames[1:], loop=0)
-            buf.seek(0)
-            return send_file(buf, mimetype='image/gif', as_attachment=True, download_name='converted.gif')
-        except Exception as e:
-            current_app.logger.exception("GIF save error")
-            return f"Error saat menyimpan GIF: {e}", 500
+        img.convert('RGBA').save(buf, format='GIF')
+        buf.seek(0)
+        return buf, mimetype, ext
 
     # persiapkan save kwargs
     save_kwargs = {}
@@ -77,16 +84,136 @@ def process():
     except Exception:
         out_img = img.convert('RGBA')
 
-    out_format = {
-        'image/png':'PNG','image/jpeg':'JPEG','image/webp':'WEBP',
-        'image/bmp':'BMP','image/tiff':'TIFF'
-    }.get(target, 'PNG')
+    out_img.save(buf, format=out_format, **save_kwargs)
+    buf.seek(0)
+    return buf, mimetype, out_format.lower()
+
+
+@convert_bp.route('/process', methods=['POST'])
+def process():
+    # proteksi dasar
+    f = get_upload('image')
+    if f is None:
+        return "Tidak ada file", 400
+    target = request.form.get('target')
+    quality = _parse_quality()
+
+    if not target or target not in ALLOWED:
+        return "Target format tidak didukung di server.", 415
 
     try:
-        out_img.save(buf, format=out_format, **save_kwargs)
-        buf.seek(0)
-        ext = out_format.lower()
-        return send_file(buf, mimetype=target, as_attachment=True, download_name=f'converted.{ext}')
+        img = Image.open(f.stream())
+    except UnidentifiedImageError:
+        return "File bukan gambar yang valid.", 400
+    except Exception as e:
+        current_app.logger.exception("Open image error")
+        return f"Gagal membuka gambar: {e}", 500
+
+    try:
+        with metrics.phase('convert'):
+            out, mimetype, ext = convert_image(img, target, quality)
+        return send_file(out, mimetype=mimetype, as_attachment=True, download_name=f'converted.{ext}')
     except Exception as e:
         current_app.logger.exception("Save converted image error")
         return f"Gagal menyimpan hasil: {e}", 500
+
+
+# ---- Batch: banyak gambar sekaligus -> ZIP yang di-stream ----
+class _ZipSink:
+    """Tujuan tulis ZipFile yang tidak seekable; isinya dikuras per entry untuk di-stream."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _convert_one(job):
+    """Dijalankan di thread pool. Codec Pillow melepas GIL, jadi thread cukup untuk paralel."""
+    index, filename, source, target, quality = job
+    base = os.path.splitext(os.path.basename(filename or ''))[0] or f'gambar_{index}'
+    try:
+        with metrics.phase('convert', 'convert'):
+            img = Image.open(source)
+            out, _, ext = convert_image(img, target, quality)
+        data = out.read()
+        out.close()
+        return f'{index:03d}_{base}.{ext}', data, None
+    except Exception as e:
+        # detail exception (berisi path spool server) hanya untuk log, bukan untuk user
+        return None, None, (filename or f'gambar_{index}', e)
+    finally:
+        source.close()
+
+
+@convert_bp.route('/batch', methods=['POST'])
+def batch():
+    """
+    Konversi banyak gambar ('images[]') ke satu `target`, hasil berupa ZIP yang di-stream.
+    Batas ukuran total mengikuti UPLOAD_LIMITS['convert_bp.batch'].
+    """
+    uploads = [u for u in get_uploads('images[]') if u.filename]
+    if not uploads:
+        return "Tidak ada file", 400
+
+    max_files = current_app.config.get('CONVERT_BATCH_MAX_FILES', 100)
+    if len(uploads) > max_files:
+        return f"Maksimal {max_files} gambar per batch.", 413
+
+    target = request.form.get('target')
+    quality = _parse_quality()
+    if not target or target not in ALLOWED:
+        return "Target format tidak didukung di server.", 415
+
+    workers = current_app.config.get('CONVERT_BATCH_WORKERS') or os.cpu_count() or 2
+    # stream_with_context menjaga request context (dan file spool) tetap hidup selama
+    # generator jalan; tiap job tetap memakai handle sendiri supaya thread pool tidak
+    # berbagi posisi baca dengan objek Upload
+    jobs = [(i, u.filename, u.reopen(), target, quality) for i, u in enumerate(uploads, start=1)]
+    logger = current_app.logger
+
+    def close_sources():
+        # job menutup handle-nya sendiri; ini untuk job yang tidak sempat jalan
+        # (klien putus, atau generator tidak pernah dimulai)
+        for job in jobs:
+            job[2].close()
+
+    def generate():
+        sink = _ZipSink()
+        errors = []
+        try:
+            # job konversi jalan di executor pool tool (pools.stream_jobs): ikut batas konkurensi pool 'image'
+            with pools.stream_jobs(workers) as (pool, pool_workers):
+                # ZIP_STORED: format gambar sudah terkompresi, deflate hanya membuang CPU
+                with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zf:
+                    for name, data, error in bounded_map(_convert_one, jobs, pool, max_in_flight=pool_workers * 2):
+                        if error:
+                            filename, exc = error
+                            logger.warning(f"Batch convert gagal: {filename}: {exc}")
+                            errors.append(f"{filename}: gagal dikonversi (bukan gambar valid atau format tidak didukung)")
+                            continue
+                        zf.writestr(name, data)
+                        yield sink.drain()
+                    if errors:
+                        zf.writestr('gagal.txt', "\n".join(errors))
+            yield sink.drain()
+        finally:
+            close_sources()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=konversi_gambar_web_toolkit.zip'}
+    )
+    response.call_on_close(close_sources)
+    return response
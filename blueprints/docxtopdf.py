@@ -6,11 +6,14 @@ import tempfile
 import shutil
 import subprocess
 from pathlib import Path
-from flask import Blueprint, request, send_file, render_template, current_app, abort
+from flask import Blueprint, request, render_template, current_app, abort
 from werkzeug.utils import secure_filename
+from utils.uploads import get_upload, upload_policy
+from utils import metrics, results, singleflight
 
 # blueprint
 docxtopdf_bp = Blueprint('docxtopdf_bp', __name__, url_prefix='/docx-ke-pdf')
+upload_policy(docxtopdf_bp, {'zip', 'ole'})
 
 # allowed extensions
 ALLOWED_EXT = {'.docx', '.doc'}
@@ -98,11 +101,12 @@ def form():
         """, 200
 
 @docxtopdf_bp.route('/process', methods=['POST'])
+@singleflight.dedupe  # double-click / retry: request identik memakai hasil konversi yang sedang jalan
 def process():
-    if 'file' not in request.files:
+    uploaded = get_upload('file')
+    if uploaded is None:
         return "Tidak ada file yang diunggah", 400
 
-    uploaded = request.files['file']
     if uploaded.filename == '':
         return "Nama file kosong", 400
 
@@ -122,10 +126,8 @@ def process():
     installed_font_dir = None
 
     try:
-        # simpan input ke temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tf:
-            uploaded.save(tf.name)
-            tmp_input = tf.name
+        # input dibaca soffice langsung dari file spool upload (ekstensi ikut dipertahankan)
+        tmp_input = uploaded.path
 
         # prepare out dir
         tmp_out_dir = tempfile.mkdtemp(prefix='docxtopdf_out_')
@@ -133,15 +135,16 @@ def process():
         # 1) ekstrak font embedded (hanya untuk .docx)
         if ext == '.docx':
             temp_font_extract_dir = tempfile.mkdtemp(prefix='docx_fonts_')
-            extracted = extract_embedded_fonts_from_docx(tmp_input, temp_font_extract_dir)
-            if extracted:
-                # install ke user-level fonts
-                installed_font_dir = install_fonts_user_level(extracted)
-                current_app.logger.info(f"Embedded fonts installed to: {installed_font_dir}")
-            else:
-                # no embedded fonts
-                shutil.rmtree(temp_font_extract_dir, ignore_errors=True)
-                temp_font_extract_dir = None
+            with metrics.phase('fonts'):
+                extracted = extract_embedded_fonts_from_docx(tmp_input, temp_font_extract_dir)
+                if extracted:
+                    # install ke user-level fonts
+                    installed_font_dir = install_fonts_user_level(extracted)
+                    current_app.logger.info(f"Embedded fonts installed to: {installed_font_dir}")
+                else:
+                    # no embedded fonts
+                    shutil.rmtree(temp_font_extract_dir, ignore_errors=True)
+                    temp_font_extract_dir = None
 
         # 2) jalankan soffice untuk convert
         cmd = [
@@ -152,7 +155,8 @@ def process():
             tmp_input
         ]
         current_app.logger.info(f"Running soffice convert: {' '.join(cmd)}")
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=600)
+        with metrics.phase('soffice'):
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=600)
 
         if proc.returncode != 0:
             current_app.logger.error(f"soffice error stdout:{proc.stdout[:200]} stderr:{proc.stderr[:200]}")
@@ -171,13 +175,10 @@ def process():
                 return "Gagal: file PDF hasil konversi tidak ditemukan.", 500
             out_pdf_path = os.path.join(tmp_out_dir, pdfs[0])
 
-        # kirim file ke client
-        return send_file(
-            out_pdf_path,
-            as_attachment=True,
-            download_name=f"docx_pdf_web_toolkit.pdf",
-            mimetype='application/pdf'
-        )
+        # kirim file ke client (dipindah ke RESULTS_DIR dulu; tmp_out_dir dihapus di finally)
+        result_path = results.store(out_pdf_path)
+        singleflight.publish(result_path, "docx_pdf_web_toolkit.pdf", 'application/pdf')
+        return results.deliver(result_path, "docx_pdf_web_toolkit.pdf", 'application/pdf')
 
     except subprocess.TimeoutExpired:
         current_app.logger.error("Konversi soffice timeout")
@@ -186,13 +187,6 @@ def process():
         current_app.logger.exception("Error saat konversi DOCX->PDF")
         return f"Terjadi kesalahan saat konversi: {e}", 500
     finally:
-        # cleanup temp input
-        try:
-            if tmp_input and os.path.exists(tmp_input):
-                os.remove(tmp_input)
-        except Exception:
-            pass
-
         # cleanup output dir
         try:
             if tmp_out_dir and os.path.exists(tmp_out_dir):
@@ -1,62 +1,94 @@
 # blueprints/imagetopdf.py
 
 import io
-from flask import Blueprint, request, render_template, send_file, current_app
-from PIL import Image # Import library Pillow
+import os
+from flask import Blueprint, render_template, current_app, Response, stream_with_context
+from PIL import Image, ImageOps, ExifTags # Import library Pillow
+from utils.uploads import get_uploads, upload_policy
+from utils.imageload import open_reduced
+from utils.pdfstream import ImagePdfWriter
+from utils.concurrency import bounded_map
+from utils import metrics, pools
 
 # 1. Inisialisasi Blueprint
 imagetopdf_bp = Blueprint('imagetopdf_bp', __name__, url_prefix='/image-to-pdf')
+upload_policy(imagetopdf_bp, {'jpeg', 'png', 'webp'})
 
 # Daftar mimetype gambar yang diizinkan
 ALLOWED_MIMETYPES = {'image/jpeg', 'image/png', 'image/webp'}
 
-def create_pdf_from_images(image_files):
-    pil_images = []
-    MAX_WIDTH = 1600 # Batasi lebar gambar (hemat RAM!)
-    
-    for file in image_files:
-        try:
-            # Buka gambar dari stream file
-            img = Image.open(file.stream)
-
-            # --- TAMBAHAN OPTIMASI ---
-            if img.width > MAX_WIDTH:
-                scale = MAX_WIDTH / img.width
-                new_height = int(img.height * scale)
-                img = img.resize((MAX_WIDTH, new_height), Image.Resampling.LANCZOS)
-            # --- AKHIR OPTIMASI ---
-            
-            # Konversi ke RGB. 
+MAX_WIDTH = 1600 # Batasi lebar gambar (hemat RAM!)
+
+
+def prepare_page(job):
+    """
+    Siapkan satu gambar untuk halaman PDF (jalan di worker pool).
+    JPEG RGB / grayscale tanpa rotasi EXIF yang lebarnya sudah <= MAX_WIDTH
+    disalin apa adanya (DCT tidak di-decode ulang); selain itu diputar sesuai
+    EXIF, dikecilkan lalu di-encode ke JPEG.
+    Return ((src, width, height, mode, length), error).
+    """
+    handle, filename = job
+    try:
+        img = Image.open(handle)
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+        if img.format == 'JPEG' and img.mode in ('RGB', 'L') and img.width <= MAX_WIDTH and orientation == 1:
+            length = handle.seek(0, io.SEEK_END)
+            handle.seek(0)
+            return (handle, img.width, img.height, img.mode, length), None
+
+        handle.seek(0)
+        # jalan di thread pool tanpa request context: label tool diberikan sendiri
+        with metrics.phase('decode', 'imagetopdf'):
+            # JPEG: draft mode 1/2..1/8 lalu LANCZOS ke lebar MAX_WIDTH
+            img = ImageOps.exif_transpose(open_reduced(handle, max_width=MAX_WIDTH))
+
+            # Konversi ke RGB (alpha dibuang, seperti sebelumnya)
             if img.mode != 'RGB':
                 img = img.convert('RGB')
-                
-            pil_images.append(img)
-            
-        except Exception as e:
-            current_app.logger.error(f"Gagal memproses gambar: {file.filename}. Error: {e}")
-            raise Exception(f"Gagal memproses file '{file.filename}'. Pastikan file gambar valid.")
 
-    if not pil_images:
-        raise Exception("Tidak ada gambar valid yang ditemukan.")
+        encoded = io.BytesIO()
+        with metrics.phase('encode', 'imagetopdf'):
+            img.save(encoded, 'JPEG')
+        return (encoded.getbuffer(), img.width, img.height, 'RGB', None), None
+    except Exception as e:
+        return None, f"Gagal memproses gambar: {filename}. Error: {e}"
 
-    # Ambil gambar pertama dan sisa gambar
-    first_image = pil_images[0]
-    other_images = pil_images[1:]
 
-    # Buat PDF di memori
-    output_buffer = io.BytesIO()
-    
-    # Simpan gambar pertama, dan tambahkan gambar lainnya
-    first_image.save(
-        output_buffer,
-        "PDF",
-        resolution=100.0,
-        save_all=True,
-        append_images=other_images # Tambahkan sisa gambar
-    )
-    
-    output_buffer.seek(0)
-    return output_buffer
+def create_pdf_from_images(first_page, handles, filenames, workers, logger):
+    """
+    Generator: `first_page` (hasil ``prepare_page`` gambar pertama, sudah
+    disiapkan sebelum streaming) ditulis dulu, sisanya disiapkan paralel di
+    thread pool (resize & encode Pillow melepas GIL), lalu ditulis dan di-yield
+    per halaman sesuai urutan upload. Halaman yang gagal menghentikan stream
+    dengan RuntimeError (trailer tidak ditulis). `handles` ditutup di sini.
+    """
+    sink = io.BytesIO()
+    writer = ImagePdfWriter(sink, resolution=100.0)
+    jobs = list(zip(handles, filenames))[1:]
+    try:
+        writer.add_jpeg(*first_page)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        # job halaman jalan di executor pool tool (pools.stream_jobs): ikut batas konkurensi pool 'pdf'
+        with pools.stream_jobs(workers) as (pool, pool_workers):
+            for page, error in bounded_map(prepare_page, jobs, pool, max_in_flight=pool_workers * 2):
+                if error:
+                    # header sudah dicek sebelum streaming; di sini hanya file yang rusak di tengah.
+                    # Status 200 sudah terkirim: putuskan stream tanpa trailer supaya klien
+                    # menerima download gagal, bukan PDF yang diam-diam kurang halaman
+                    logger.error(error)
+                    raise RuntimeError(error)
+                writer.add_jpeg(*page)
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        writer.close()
+        yield sink.getvalue()
+    finally:
+        for handle in handles:
+            handle.close()
 
 # 2. Routing untuk Halaman Form (GET)
 @imagetopdf_bp.route('/', methods=['GET'])
@@ -67,7 +99,7 @@ def form():
 # 3. Routing untuk Proses Konversi (POST)
 @imagetopdf_bp.route('/convert', methods=['POST'])
 def convert():
-    uploaded_files = request.files.getlist('images[]')
+    uploaded_files = get_uploads('images[]')
     
     # Filter hanya file yang valid (ada nama & mimetype diizinkan)
     valid_files = [
@@ -78,15 +110,35 @@ def convert():
     if not valid_files:
         return "Harap unggah minimal satu file gambar (JPG, PNG, WebP)", 400
 
-    try:
-        pdf_output = create_pdf_from_images(valid_files)
+    # cek header semua gambar dulu, supaya file tidak valid masih bisa dijawab dengan error
+    for file in valid_files:
+        try:
+            Image.open(file.stream())
+        except Exception as e:
+            current_app.logger.error(f"Gagal memproses gambar: {file.filename}. Error: {e}")
+            return f"Gagal memproses file '{file.filename}'. Pastikan file gambar valid.", 500
 
-        return send_file(
-            pdf_output,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name='gambar_ke_pdf_toolkit.pdf'
-        )
+    # tiap halaman dibaca lewat handle sendiri (dibaca paralel di thread pool)
+    handles = [file.reopen() for file in valid_files]
+    filenames = [file.filename for file in valid_files]
 
-    except Exception as e:
-        return str(e), 500
\ No newline at end of file
+    # gambar pertama disiapkan sebelum streaming: PDF yang dikirim minimal punya satu
+    # halaman, dan gambar rusak yang lolos cek header masih dijawab dengan error
+    first_page, error = prepare_page((handles[0], filenames[0]))
+    if error:
+        for handle in handles:
+            handle.close()
+        current_app.logger.error(error)
+        return f"Gagal memproses file '{filenames[0]}'. Pastikan file gambar valid.", 500
+
+    workers = current_app.config.get('IMAGETOPDF_WORKERS') or os.cpu_count() or 2
+    pdf_stream = create_pdf_from_images(first_page, handles, filenames, workers, current_app.logger)
+
+    response = Response(
+        stream_with_context(pdf_stream),
+        mimetype='application/pdf',
+        headers={'Content-Disposition': 'attachment; filename=gambar_ke_pdf_toolkit.pdf'}
+    )
+    # jika generator tidak pernah dimulai, handle tetap ditutup
+    response.call_on_close(lambda: [handle.close() for handle in handles])
+    return response
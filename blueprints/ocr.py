@@ -1,61 +1,235 @@
 # blueprints/ocr.py
 
 from flask import Blueprint, request, render_template, send_file, current_app
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+from werkzeug.exceptions import HTTPException
+from PIL import Image, ImageOps
+from pdf2image import convert_from_path
 import io
 import re
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PyPDF2 import PdfReader
+from utils.uploads import get_upload, upload_policy
+from utils.textlayer import page_text_layers
+from utils.concurrency import bounded_map
+from utils.pdfstream import ImagePdfWriter
+from utils.searchpdf import SearchablePdf
+from utils import ocrprep, admission, metrics, results
+from utils.lazy import lazy_import
 
-pytesseract.tesseract_cmd = r'/usr/bin/tesseract'
+pytesseract = lazy_import('pytesseract', on_load=lambda m: setattr(m, 'tesseract_cmd', r'/usr/bin/tesseract'))
+np = lazy_import('numpy')
 poppler_path_var = r'/usr/bin'
+IMAGE_DPI = 300  # resolusi halaman PDF dari gambar upload yang tidak menyimpan info dpi
 
 ocr_bp = Blueprint('ocr_bp', __name__, url_prefix='/ocr')
+upload_policy(ocr_bp, {'pdf', 'png', 'jpeg', 'tiff', 'webp', 'bmp', 'gif'})
 
 def sanitize_text(text):
     cleaned_text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
     return cleaned_text
 
+def ocr_options():
+    """Opsi OCR dari config, dibaca sekali di request supaya worker thread tidak butuh app context."""
+    cfg = current_app.config
+    return {
+        'preprocess': cfg.get('OCR_PREPROCESS', True),
+        'target_line_px': cfg.get('OCR_TARGET_LINE_PX', ocrprep.DEFAULT_TARGET_LINE_PX),
+        'min_dpi': cfg.get('OCR_MIN_DPI', ocrprep.DEFAULT_MIN_DPI),
+        'max_dpi': cfg.get('OCR_MAX_DPI', ocrprep.DEFAULT_MAX_DPI),
+    }
+
+def _render_options(opts):
+    return {k: opts[k] for k in ('target_line_px', 'min_dpi', 'max_dpi')}
+
+# fungsi per halaman jalan di thread pool tanpa request context: label tool metrik diberikan sendiri
+def _render_plain(pdf_path, page_no, dpi=150):
+    with metrics.phase('pdftoppm', 'ocr'):
+        page_img_list = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            poppler_path=poppler_path_var,
+            thread_count=2,
+            first_page=page_no,
+            last_page=page_no
+        )
+    return page_img_list[0] if page_img_list else None
+
+def _render_adaptive(pdf_path, page_no, opts):
+    with metrics.phase('pdftoppm', 'ocr'):
+        return ocrprep.render_pdf_page(pdf_path, page_no, poppler_path=poppler_path_var, **_render_options(opts))
+
+def _image_to_string(img):
+    with metrics.phase('tesseract', 'ocr'):
+        return pytesseract.image_to_string(img, lang='ind')
+
+def ocr_pdf_page(pdf_path, page_no, opts=None):
+    """OCR satu halaman PDF (mulai 1). Dengan OCR_PREPROCESS: grayscale, DPI adaptif, biner, deskew, crop."""
+    opts = opts or ocr_options()
+    if opts['preprocess']:
+        gray, _ = _render_adaptive(pdf_path, page_no, opts)
+        with metrics.phase('preprocess', 'ocr'):
+            page_img = ocrprep.prepare_gray(gray)
+        if page_img is None:
+            return ""  # halaman kosong, tidak perlu Tesseract
+        return _image_to_string(page_img)
+
+    page_img = _render_plain(pdf_path, page_no)
+    return _image_to_string(page_img) if page_img is not None else ""
+
+def ocr_image(img, opts=None):
+    opts = opts or ocr_options()
+    if opts['preprocess']:
+        with metrics.phase('preprocess', 'ocr'):
+            img = ocrprep.prepare_image(img, target_line_px=opts['target_line_px'])
+        if img is None:
+            return ""
+    return _image_to_string(img)
+
+def _text_layer(img, dpi):
+    """PDF satu halaman berisi teks tak terlihat saja (tanpa gambar) dari Tesseract."""
+    with metrics.phase('tesseract', 'ocr'):
+        return pytesseract.image_to_pdf_or_hocr(img, lang='ind', extension='pdf',
+                                               config=f'--dpi {int(dpi)} -c textonly_pdf=1')
+
+def _layer_from_gray(gray, dpi, opts):
+    """(layer, geometri) dari halaman yang sudah di-render; (None, None) jika halaman kosong."""
+    if opts['preprocess']:
+        # tanpa deskew: layer hanya digeser ke posisi crop, tidak perlu diputar balik
+        with metrics.phase('preprocess', 'ocr'):
+            source = ocrprep.prepare_layer_source(gray)
+        if source is None:
+            return None, None
+        img, left, top = source
+    else:
+        img, left, top = Image.fromarray(gray), 0, 0
+    return _text_layer(img, dpi), (dpi, gray.shape[1], gray.shape[0], left, top)
+
+def ocr_pdf_page_layer(pdf_path, page_no, opts):
+    """Text layer untuk satu halaman PDF (mulai 1), siap digabung oleh SearchablePdf."""
+    if opts['preprocess']:
+        gray, dpi = _render_adaptive(pdf_path, page_no, opts)
+    else:
+        dpi = 150
+        page_img = _render_plain(pdf_path, page_no, dpi)
+        if page_img is None:
+            return None, None
+        gray = np.asarray(page_img.convert('L'))
+    return _layer_from_gray(gray, dpi, opts)
+
+def ocr_image_layer(img, resolution, opts):
+    """Text layer untuk gambar upload yang dijadikan halaman PDF pada `resolution` dpi."""
+    if opts['preprocess']:
+        with metrics.phase('preprocess', 'ocr'):
+            gray, scale = ocrprep.scale_for_ocr(img, target_line_px=opts['target_line_px'])
+    else:
+        gray, scale = img.convert('L'), 1.0
+    return _layer_from_gray(np.asarray(gray), resolution * scale, opts)
+
+def _image_page(file, img, resolution):
+    """
+    Halaman PDF dari gambar upload. JPEG RGB/L tanpa rotasi EXIF disalin apa
+    adanya; format lain ditulis lossless (Flate). Return (PdfReader, gambar
+    yang orientasinya sama dengan halaman).
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    writer = ImagePdfWriter(out, resolution=resolution)
+    if img.format == 'JPEG' and img.mode in ('RGB', 'L') and img.getexif().get(0x0112, 1) == 1:
+        img.load()  # piksel tetap dibutuhkan untuk OCR; decode sebelum stream disalin
+        src = file.stream()
+        src.seek(0, os.SEEK_END)
+        length = src.tell()
+        src.seek(0)
+        writer.add_jpeg(src, img.width, img.height, img.mode, length)
+    else:
+        img = ImageOps.exif_transpose(img)
+        writer.add_image(img)
+    writer.close()
+    out.seek(0)
+    return PdfReader(out), img
+
+def _searchable_response(pdf):
+    out_path = results.new_result('.pdf')
+    with metrics.phase('encode'), open(out_path, 'wb') as out:
+        pdf.write(out)
+    return results.deliver(out_path, 'ocr_web_toolkit.pdf', 'application/pdf')
+
+def _pdf_pages(pdf_path, text_layers, page_fn, opts, workers):
+    """
+    Jalankan `page_fn(pdf_path, i, opts)` untuk halaman scan di thread pool,
+    berurutan dan dengan jumlah halaman in-flight terbatas. Tesseract dan
+    poppler berjalan sebagai subprocess, jadi thread cukup untuk paralel.
+    Yield (nomor_halaman, hasil atau None untuk halaman ber-text layer).
+    """
+    scanned = [i for i, layer in enumerate(text_layers, start=1) if layer is None]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages_iter = bounded_map(lambda i: page_fn(pdf_path, i, opts), scanned, pool, max_in_flight=workers * 2)
+        for i in range(1, len(text_layers) + 1):
+            yield i, (next(pages_iter) if text_layers[i - 1] is None else None)
+
 @ocr_bp.route('/', methods=['GET'])
 def form():
     return render_template('ocr.html')
 
 @ocr_bp.route('/convert', methods=['POST'])
 def convert_file():
-    if 'file' not in request.files:
+    file = get_upload('file')
+    if file is None:
         return "Tidak ada file yang diunggah", 400
 
-    file = request.files['file']
     if file.filename == '':
         return "Tidak ada file terpilih", 400
 
+    output = request.form.get('output', 'txt')
+    if output not in ('txt', 'pdf'):
+        return "Format hasil tidak dikenal. Pilih txt atau pdf.", 400
+
+    ticket = None
     try:
-        file_bytes = file.read()
         file_mimetype = file.mimetype
+        opts = ocr_options()
+        workers = current_app.config.get('OCR_WORKERS') or os.cpu_count() or 1
         full_text = ""
 
         if 'pdf' in file_mimetype:
-            info = pdfinfo_from_bytes(file_bytes, poppler_path=poppler_path_var)
-            total_pages = info.get('Pages', 1)
-            for i in range(1, total_pages + 1):
-                page_img_list = convert_from_bytes(
-                    file_bytes,
-                    dpi=150,
-                    poppler_path=poppler_path_var,
-                    thread_count=2,
-                    first_page=i,
-                    last_page=i
-                )
-                if page_img_list:
-                    page_img = page_img_list[0]
-                    text = pytesseract.image_to_string(page_img, lang='ind')
-                    full_text += f"\n\n--- PAGE {i} ---\n\n" + text
-                    del page_img
+            # poppler membaca langsung dari file spool, tidak perlu bytes di memori
+            pdf_path = file.path
+            # halaman yang sudah punya text layer diambil langsung, hanya halaman scan yang di-OCR
+            with metrics.phase('text_layer'):
+                text_layers = page_text_layers(pdf_path, current_app.config.get('OCR_TEXT_MIN_CHARS', 20))
+            total_pages = len(text_layers)
+            ocr_pages = text_layers.count(None)
+            current_app.logger.info(f"OCR: {total_pages - ocr_pages}/{total_pages} halaman dari text layer, {ocr_pages} di-OCR")
+            if ocr_pages:
+                # perkiraan memori render + tesseract per halaman x halaman paralel; turunkan DPI/paralel jika penuh
+                dpis = sorted({d for d in (opts['max_dpi'], 200, 150) if opts['min_dpi'] <= d <= opts['max_dpi']}, reverse=True)
+                ticket = admission.admit('ocr', admission.ocr_render_options(admission.pdf_page_sizes(pdf_path), dpis or [opts['max_dpi']], workers))
+                opts['max_dpi'], workers = ticket.value
+
+            if output == 'pdf':
+                # halaman asli disalin (stream gambar tidak di-encode ulang), layer teks ditumpuk per halaman
+                reader = PdfReader(pdf_path)
+                pdf = SearchablePdf(current_app.logger)
+                for i, result in _pdf_pages(pdf_path, text_layers, ocr_pdf_page_layer, opts, workers):
+                    layer, geometry = result or (None, None)
+                    pdf.add_page(reader.pages[i - 1], layer, geometry)
+                return _searchable_response(pdf)
+
+            for i, text in _pdf_pages(pdf_path, text_layers, ocr_pdf_page, opts, workers):
+                full_text += f"\n\n--- PAGE {i} ---\n\n" + (text_layers[i - 1] if text is None else text)
 
         elif 'image' in file_mimetype or file.filename.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.webp', '.bmp', '.gif')):
-            img = Image.open(io.BytesIO(file_bytes))
-            full_text = pytesseract.image_to_string(img, lang='ind')
+            img = Image.open(file.stream())
+            ticket = admission.admit('ocr', [(admission.image_ocr_mb(img.size), None)])
+            if output == 'pdf':
+                resolution = float((img.info.get('dpi') or (IMAGE_DPI,))[0]) or IMAGE_DPI
+                reader, img = _image_page(file, img, resolution)
+                layer, geometry = ocr_image_layer(img, resolution, opts)
+                pdf = SearchablePdf(current_app.logger)
+                pdf.add_page(reader.pages[0], layer, geometry)
+                return _searchable_response(pdf)
+            full_text = ocr_image(img, opts)
         else:
             return "Format file tidak didukung. Harap unggah PNG, JPG, atau PDF.", 415
 
@@ -73,8 +247,13 @@ def convert_file():
             mimetype='text/plain'
         )
 
+    except HTTPException:
+        raise  # 503 dari admission control, jangan jadi 500
     except Exception as e:
         current_app.logger.error(f"OCR Error: {e}")
         if "MemoryError" in str(e) or "Cannot allocate memory" in str(e):
             return "Gagal memproses (Error Memori). File terlalu berat/besar.", 500
         return f"Terjadi kesalahan dalam pemrosesan file: {e}", 500
+    finally:
+        if ticket:
+            ticket.release()
@@ -1,13 +1,12 @@
 # blueprints/paraphraser.py
 import re
 from flask import Blueprint, request, render_template, jsonify, current_app
-try:
-    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-    import torch
-except Exception:
-    AutoTokenizer = None
-    AutoModelForSeq2SeqLM = None
-    torch = None
+from utils.lazy import lazy_import, available
+from utils import admission, metrics
+
+# transformers + torch butuh beberapa detik dan ratusan MB; dimuat saat model pertama kali dipakai
+transformers = lazy_import('transformers')
+torch = lazy_import('torch')
 
 para_bp = Blueprint('para_bp', __name__, url_prefix='/paraphraser')
 
@@ -17,17 +16,18 @@ _models = None
 
 def ensure_models():
     global _models
+    metrics.cache('paraphrase_model', _models is not None)
     if _models is not None:
         return _models
 
-    if AutoTokenizer is None or AutoModelForSeq2SeqLM is None:
+    if not (available('transformers') and available('torch')):
         raise RuntimeError("Install transformers, torch, sentencepiece")
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     current_app.logger.info(f"Loading paraphrase model {MODEL_ID} on {device}")
 
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID).to(device)
+    tokenizer = transformers.AutoTokenizer.from_pretrained(MODEL_ID)
+    model = transformers.AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID).to(device)
     _models = {"device": device, "tokenizer": tokenizer, "model": model}
     return _models
 
@@ -91,7 +91,7 @@ def generate_chunk(chunk, models, params):
 
     inputs = tokenizer(prompt, return_tensors="pt", truncation=True, padding=True).to(device)
 
-    with torch.no_grad():
+    with metrics.phase('inference'), torch.no_grad():
         outs = model.generate(
             **inputs,
             max_length=params.get("max_length", 256),
@@ -204,8 +204,16 @@ def process():
     if not text:
         return "Tidak ada teks yang diberikan.", 400
 
+    # perkiraan token ~1.5 per kata; chunk & beam terbesar (GPU) dipakai karena device belum diketahui
+    estimate = admission.paraphrase_mb(int(len(text.split()) * 1.5), int(140 * 1.5), 4, _models is not None)
+    with admission.admit('paraphraser', [(estimate, None)]):
+        return _paraphrase(text, mode)
+
+
+def _paraphrase(text, mode):
     try:
-        models = ensure_models()
+        with metrics.phase('model_load'):
+            models = ensure_models()
     except Exception as e:
         current_app.logger.exception("Model load error")
         return str(e), 500
@@ -1,15 +1,14 @@
 # blueprints/pdftodocx.py
 
-import io
-import os
-import tempfile
-from flask import (Blueprint, request, send_file, render_template, current_app)
-# Import library baru
-from pdf2docx import Converter
-from werkzeug.utils import secure_filename
+from flask import (Blueprint, request, render_template, current_app, jsonify)
+from utils.uploads import get_upload, upload_policy
+from utils.pdfdocx import convert_pdf_to_docx
+from utils.jobs import JobStatus, read_status
+from utils import metrics, results
 
 # 1. Inisialisasi Blueprint
 pdftodocx_bp = Blueprint('pdftodocx_bp', __name__, url_prefix='/pdf-ke-docx')
+upload_policy(pdftodocx_bp, {'pdf'})
 
 # 2. Routing untuk Halaman Form (GET)
 @pdftodocx_bp.route('/', methods=['GET'])
@@ -23,53 +22,60 @@ def process():
     """Menerima file PDF, mengonversinya ke DOCX, dan mengirim kembali"""
     
     # 1. Validasi Input (Sama seperti compresspdf.py)
-    if 'file' not in request.files:
+    uploaded_file = get_upload('file')
+    if uploaded_file is None:
         return "Tidak ada file yang diunggah", 400
 
-    uploaded_file = request.files['file']
     if uploaded_file.filename == '':
         return "Nama file kosong", 400
         
     if not uploaded_file.filename.lower().endswith('.pdf'):
         return "Hanya file PDF yang diizinkan", 400
 
+    # job_id dibuat klien supaya progres bisa di-polling selama request ini berjalan
+    status = JobStatus(request.form.get('job_id'))
+    status.start(total=0)
+
     # Kita butuh path file fisik untuk library pdf2docx
-    # Kita gunakan tempfile untuk keamanan
-    temp_pdf_path = None
+    # File spool upload sudah berupa file di disk (dibersihkan otomatis di akhir request)
     try:
-        # Buat file temporary untuk input PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-            uploaded_file.save(temp_pdf.name)
-            temp_pdf_path = temp_pdf.name
-        
-        # Buat buffer di memori untuk output DOCX
-        output_buffer = io.BytesIO()
+        temp_pdf_path = uploaded_file.path
+
+        # Output DOCX ditulis langsung ke RESULTS_DIR
+        output_path = results.new_result('.docx')
+
+        # 2. Proses Konversi (paralel per rentang halaman)
+        with metrics.phase('convert'):
+            convert_pdf_to_docx(
+                temp_pdf_path,
+                output_path,
+                workers=current_app.config.get('PDFTODOCX_WORKERS'),
+                chunk_pages=current_app.config.get('PDFTODOCX_CHUNK_PAGES'),
+                progress=lambda done, total: status.update(done=done, total=total),
+            )
+        status.finish()
 
-        # 2. Proses Konversi
-        cv = Converter(temp_pdf_path)
-        # Konversi dan simpan hasilnya ke buffer memori
-        cv.convert(output_buffer, multi_processing=True, cpu_count=2) # Gunakan 4 thread untuk mempercepat
-        cv.close()
-        
-        output_buffer.seek(0)
-        
         # 3. Kirim File DOCX
         # (Menggunakan nama file statis seperti permintaan Anda sebelumnya)
         new_filename = "pdf_docx_web_toolkit.docx"
         
-        return send_file(
-            output_buffer,
+        return results.deliver(
+            output_path,
+            new_filename,
             # Ini adalah mimetype yang benar untuk file .docx
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            as_attachment=True,
-            download_name=new_filename
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         )
 
     except Exception as e:
         current_app.logger.error(f"Error PDF ke DOCX: {e}")
+        status.fail(str(e))
         return f"Terjadi kesalahan saat konversi: {e}", 500
-    
-    finally:
-        # 4. Selalu hapus file temporary
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
\ No newline at end of file
+
+# 4. Routing untuk Status Progres (GET)
+@pdftodocx_bp.route('/status/<job_id>', methods=['GET'])
+def status(job_id):
+    """Progres konversi: {state, done, total} (halaman yang sudah di-parse)"""
+    job = read_status(job_id)
+    if job is None:
+        return jsonify({'state': 'unknown'}), 404
+    return jsonify(job)
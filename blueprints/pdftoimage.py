@@ -1,19 +1,20 @@
 # blueprints/pdftoimage.py
 
-import io
-import os
 import zipfile # Kita akan menggunakan zip untuk mengirim banyak gambar
-from flask import (Blueprint, request, send_file, render_template, current_app)
+from flask import (Blueprint, request, render_template, current_app)
 # Library utama untuk konversi PDF ke Gambar
-from pdf2image import convert_from_bytes
-from werkzeug.utils import secure_filename
+from pdf2image import convert_from_path
+from utils.uploads import get_upload, upload_policy
+from utils import admission, metrics, results
 
 # 1. Inisialisasi Blueprint
 pdftoimage_bp = Blueprint('pdftoimage_bp', __name__, url_prefix='/pdf-ke-gambar')
+upload_policy(pdftoimage_bp, {'pdf'})
 
 # Path ke Poppler (jika diperlukan, sesuaikan dengan server Anda)
 # Biasanya tidak perlu jika sudah terinstal via apt-get
 POPPLER_PATH = None 
+RENDER_DPIS = (150, 110, 72)  # 150 normal; sisanya untuk turun kualitas saat memori server penuh
 
 # 2. Routing untuk Halaman Form (GET)
 @pdftoimage_bp.route('/', methods=['GET'])
@@ -27,10 +28,10 @@ def process():
     """Menerima file PDF, mengonversi setiap halaman, dan mengirim ZIP"""
     
     # 1. Validasi Input (Sama seperti compresspdf.py)
-    if 'file' not in request.files:
+    uploaded_file = get_upload('file')
+    if uploaded_file is None:
         return "Tidak ada file yang diunggah", 400
 
-    uploaded_file = request.files['file']
     if uploaded_file.filename == '':
         return "Nama file kosong", 400
         
@@ -43,56 +44,56 @@ def process():
          return "Format output tidak valid", 400
 
     try:
-        pdf_bytes = uploaded_file.read()
-        
+        page_sizes = admission.pdf_page_sizes(uploaded_file.path)
+    except Exception as e:
+        current_app.logger.error(f"Error PDF ke Gambar: {e}")
+        return "File PDF rusak atau tidak bisa dibaca.", 400
+
+    # semua halaman di-render ke memori sekaligus: DPI diturunkan jika anggaran memori tidak cukup
+    ticket = admission.admit('pdftoimage', admission.pdf_render_options(page_sizes, RENDER_DPIS))
+    try:
         # 2. Proses Konversi PDF ke List Gambar (PIL Image)
         # Kita set DPI 150 untuk keseimbangan kualitas/ukuran
-        images = convert_from_bytes(
-            pdf_bytes, 
-            dpi=150,
-            fmt=output_format,
-            poppler_path=POPPLER_PATH,
-            thread_count=2 # Gunakan 4 thread untuk mempercepat
-        )
+        # pdftoppm membaca langsung dari file spool upload
+        with metrics.phase('pdftoppm'):
+            images = convert_from_path(
+                uploaded_file.path,
+                dpi=ticket.value,
+                fmt=output_format,
+                poppler_path=POPPLER_PATH,
+                thread_count=2 # Gunakan 4 thread untuk mempercepat
+            )
 
         if not images:
             return "File PDF tidak mengandung halaman atau gagal diproses.", 400
 
-        # 3. Buat File ZIP dalam Memori
-        zip_buffer = io.BytesIO()
+        # 3. Buat File ZIP langsung di RESULTS_DIR (tidak ditahan di memori)
+        zip_path = results.new_result('.zip')
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with metrics.phase('encode'), zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for i, img in enumerate(images):
-                # Simpan tiap gambar ke buffer memori sementara
-                img_buffer = io.BytesIO()
-                
                 # Tentukan format simpan untuk PIL
                 pil_format = 'JPEG' if output_format == 'jpeg' else 'PNG'
-                img.save(img_buffer, format=pil_format)
-                img_buffer.seek(0)
                 
                 # --- PERUBAHAN DI SINI ---
                 # Gunakan nama file statis sesuai permintaan Anda
                 file_name = f"pdf_gambar_web_toolkit_{i+1}.{output_format}"
                 # -------------------------
                 
-                zipf.writestr(file_name, img_buffer.read())
+                # Gambar di-encode langsung ke entri zip
+                with zipf.open(file_name, 'w') as entry:
+                    img.save(entry, format=pil_format)
 
-        zip_buffer.seek(0)
-        
         # 4. Kirim File ZIP ke Pengguna
         zip_download_name = f"pdf_gambar_web_toolkit.zip"
         
-        return send_file(
-            zip_buffer,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=zip_download_name
-        )
+        return results.deliver(zip_path, zip_download_name, 'application/zip')
 
     except Exception as e:
         current_app.logger.error(f"Error PDF ke Gambar: {e}")
         # Tangani error spesifik jika poppler tidak ditemukan
         if "Poppler" in str(e):
              return "Error Server: Dependensi Poppler tidak ditemukan.", 500
-        return f"Terjadi kesalahan saat konversi: {e}", 500
\ No newline at end of file
+        return f"Terjadi kesalahan saat konversi: {e}", 500
+    finally:
+        ticket.release()
\ No newline at end of file
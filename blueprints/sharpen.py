@@ -4,88 +4,87 @@ import os
 import traceback
 from flask import Blueprint, request, render_template, send_file, current_app
 from PIL import Image, ImageFilter
+from utils.uploads import get_upload, upload_policy
+from utils.imageload import cv2_imdecode_reduced, peek_size
+from utils.lazy import lazy_import, available
+from utils import admission, metrics
 
-# optional deps
-try:
-    import numpy as np
-    NP_AVAILABLE = True
-except Exception:
-    NP_AVAILABLE = False
+# optional deps (di-import saat mode AI pertama kali dipakai)
+np = lazy_import('numpy')
+NP_AVAILABLE = available('numpy')
 
-try:
-    import cv2
-    from cv2 import dnn_superres
-    CV2_AVAILABLE = True
-except Exception:
-    CV2_AVAILABLE = False
+cv2 = lazy_import('cv2')
+CV2_AVAILABLE = available('cv2')
 
 sharpen_bp = Blueprint('sharpen_bp', __name__, url_prefix='/pertajam-gambar')
+upload_policy(sharpen_bp, {'jpeg', 'png', 'webp'})
 
 ALLOWED_MIMETYPES = {'image/jpeg', 'image/png', 'image/webp'}
 SCALE = 4  # fixed ×4 for AI mode
 
 # ---- Classic UnsharpMask pipeline (fast) ----
 def sharpen_classic_pil(image_file_stream):
-    img = Image.open(image_file_stream)
-    output_format = img.format if img.format in ['JPEG', 'PNG', 'WEBP'] else 'PNG'
+    with metrics.phase('decode'):
+        img = Image.open(image_file_stream)
+        output_format = img.format if img.format in ['JPEG', 'PNG', 'WEBP'] else 'PNG'
 
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
-        output_format = 'JPEG'
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+            output_format = 'JPEG'
+        img.load()
 
-    img_sharpened = img.filter(ImageFilter.UnsharpMask(radius=1, percent=130, threshold=3))
+    with metrics.phase('filter'):
+        img_sharpened = img.filter(ImageFilter.UnsharpMask(radius=1, percent=130, threshold=3))
 
     out_buf = io.BytesIO()
-    if output_format == 'JPEG':
-        img_sharpened.save(out_buf, format='JPEG', quality=95)
-        mimetype = 'image/jpeg'; ext = 'jpg'
-    elif output_format == 'WEBP':
-        img_sharpened.save(out_buf, format='WEBP', quality=90)
-        mimetype = 'image/webp'; ext = 'webp'
-    else:
-        img_sharpened.save(out_buf, format='PNG')
-        mimetype = 'image/png'; ext = 'png'
+    with metrics.phase('encode'):
+        if output_format == 'JPEG':
+            img_sharpened.save(out_buf, format='JPEG', quality=95)
+            mimetype = 'image/jpeg'; ext = 'jpg'
+        elif output_format == 'WEBP':
+            img_sharpened.save(out_buf, format='WEBP', quality=90)
+            mimetype = 'image/webp'; ext = 'webp'
+        else:
+            img_sharpened.save(out_buf, format='PNG')
+            mimetype = 'image/png'; ext = 'png'
 
     out_buf.seek(0)
     return out_buf, mimetype, ext
 
 # ---- AI FSRCNN ×4 pipeline (slower) ----
-def enhance_fscrnn_return_pil(image_bytes, model_dir):
-    if not CV2_AVAILABLE:
+def enhance_fscrnn_return_pil(image_buffer, image_size, model_dir, max_side=None):
+    if not CV2_AVAILABLE or not hasattr(cv2, 'dnn_superres'):
         raise RuntimeError('OpenCV (opencv-contrib-python) tidak tersedia di server.')
     if not NP_AVAILABLE:
         raise RuntimeError('numpy tidak tersedia.')
 
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    # gambar di atas AI_CPU_MAX_SIDE langsung di-decode mengecil (IMREAD_REDUCED_*)
+    max_side = max_side or current_app.config.get('AI_CPU_MAX_SIDE', 2048)
+    with metrics.phase('decode'):
+        img = cv2_imdecode_reduced(image_buffer, image_size, max_side)
     if img is None:
         raise RuntimeError('Gagal membaca input gambar (cv2).')
 
-    sr = dnn_superres.DnnSuperResImpl_create()
     model_file = os.path.join(model_dir, f'FSRCNN_x{SCALE}.pb')
     if not os.path.exists(model_file):
         raise FileNotFoundError(f'Model FSRCNN tidak ditemukan: {model_file}')
 
-    sr.readModel(model_file)
-    sr.setModel('fsrcnn', SCALE)
-
-    max_side = current_app.config.get('AI_CPU_MAX_SIDE', 2048)
-    h, w = img.shape[:2]
-    if max(h, w) > max_side:
-        factor = max_side / max(h, w)
-        img = cv2.resize(img, (int(w * factor), int(h * factor)), interpolation=cv2.INTER_AREA)
+    with metrics.phase('model_load'):
+        sr = cv2.dnn_superres.DnnSuperResImpl_create()
+        sr.readModel(model_file)
+        sr.setModel('fsrcnn', SCALE)
 
-    result = sr.upsample(img)
+    with metrics.phase('inference'):
+        result = sr.upsample(img)
     result_rgb = cv2.cvtColor(result, cv2.COLOR_BGR2RGB)
     pil_img = Image.fromarray(result_rgb)
     return pil_img
 
-def post_process_downscale_to_original(orig_bytes, processed_pil):
-    orig = Image.open(io.BytesIO(orig_bytes))
-    orig_size = orig.size
-    resized = processed_pil.resize(orig_size, Image.LANCZOS)
-    out_buf = io.BytesIO()
-    resized.save(out_buf, format='PNG')
+def post_process_downscale_to_original(orig_size, processed_pil):
+    with metrics.phase('encode'):
+        resized = processed_pil.resize(orig_size, Image.LANCZOS)
+        out_buf = io.BytesIO()
+        resized.save(out_buf, format='PNG')
     out_buf.seek(0)
     return out_buf, 'image/png', 'png'
 
@@ -97,30 +96,37 @@ def form():
 
 @sharpen_bp.route('/process', methods=['POST'])
 def process():
-    if 'image' not in request.files:
+    file = get_upload('image')
+    if file is None:
         return "Tidak ada file yang diunggah", 400
 
-    file = request.files['image']
     if not file.filename or file.mimetype not in ALLOWED_MIMETYPES:
         return "Format file tidak didukung. Harap unggah JPG, PNG, atau WebP", 415
 
     mode = request.form.get('mode', 'classic')  # 'classic' or 'ai'
     model_dir = current_app.config.get('AI_MODEL_DIR') or './models'
 
+    ticket = None
+    if mode == 'ai':
+        try:
+            orig_size = peek_size(file.stream())
+        except Exception:
+            return "Gagal membaca file gambar. File mungkin rusak.", 400
+        # perkiraan memori FSRCNN x4; jika tidak muat, input di-decode lebih kecil (hasil tetap ukuran asli)
+        max_side = current_app.config.get('AI_CPU_MAX_SIDE', 2048)
+        ticket = admission.admit('sharpen', admission.superres_options(orig_size, SCALE, max_side))
+
     try:
         if mode == 'classic':
-            out_buf, mimetype, ext = sharpen_classic_pil(file.stream)
+            out_buf, mimetype, ext = sharpen_classic_pil(file.stream())
             return send_file(out_buf, mimetype=mimetype, as_attachment=True, download_name=f'pertajam_web_toolkit.{ext}')
 
         elif mode == 'ai':
-            # read bytes first (we need original bytes for resizing back)
-            img_bytes = file.read()
-
-            # run FSRCNN x4 -> returns PIL.Image
-            processed_pil = enhance_fscrnn_return_pil(img_bytes, model_dir)
+            # run FSRCNN x4 -> returns PIL.Image (decode langsung dari mmap upload)
+            processed_pil = enhance_fscrnn_return_pil(file.mmap(), orig_size, model_dir, max_side=ticket.value)
 
             # downscale back to original resolution and return PNG
-            out_buf, mimetype, ext = post_process_downscale_to_original(img_bytes, processed_pil)
+            out_buf, mimetype, ext = post_process_downscale_to_original(orig_size, processed_pil)
             return send_file(out_buf, mimetype=mimetype, as_attachment=True, download_name=f'pertajam_web_toolkit.{ext}')
 
         else:
@@ -129,3 +135,6 @@ def process():
     except Exception as e:
         current_app.logger.error('Sharpen error: %s', traceback.format_exc())
         return str(e), 500
+    finally:
+        if ticket:
+            ticket.release()
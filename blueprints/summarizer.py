@@ -5,25 +5,32 @@ import sys
 import re
 from flask import Blueprint, request, render_template, send_file, current_app, jsonify
 
-# Sumy imports
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lex_rank import LexRankSummarizer
+from utils.uploads import get_upload
+from utils.lazy import lazy_import
+from utils import metrics
+
+
+def _add_venv_nltk_data(_module):
+    # try to make sure nltk data from venv/share/nltk_data is visible
+    try:
+        import nltk
+        # typical venv share path relative to python executable
+        venv_share = os.path.normpath(os.path.join(os.path.dirname(sys.executable), '..', 'share', 'nltk_data'))
+        if os.path.isdir(venv_share) and venv_share not in nltk.data.path:
+            nltk.data.path.append(venv_share)
+    except Exception:
+        # silent fallback; we don't want this to break import if nltk not present here
+        pass
+
+
+# Sumy imports (lazy: sumy + nltk baru dimuat saat ringkasan pertama)
+plaintext = lazy_import('sumy.parsers.plaintext')
+tokenizers = lazy_import('sumy.nlp.tokenizers', on_load=_add_venv_nltk_data)
+lex_rank = lazy_import('sumy.summarizers.lex_rank')
 
 # other parsers
-import pdfplumber
-import docx
-
-# try to make sure nltk data from venv/share/nltk_data is visible
-try:
-    import nltk
-    # typical venv share path relative to python executable
-    venv_share = os.path.normpath(os.path.join(os.path.dirname(sys.executable), '..', 'share', 'nltk_data'))
-    if os.path.isdir(venv_share) and venv_share not in nltk.data.path:
-        nltk.data.path.append(venv_share)
-except Exception:
-    # silent fallback; we don't want this to break import if nltk not present here
-    pass
+pdfplumber = lazy_import('pdfplumber')
+docx = lazy_import('docx')
 
 summ_bp = Blueprint('summ_bp', __name__, url_prefix='/summarizer')
 
@@ -107,7 +114,7 @@ def summarize_text(text, sentence_count=5):
 
     # Attempt 1: Indonesian tokenizer (may not exist)
     try:
-        parser = PlaintextParser.from_string(text, Tokenizer("indonesian"))
+        parser = plaintext.PlaintextParser.from_string(text, tokenizers.Tokenizer("indonesian"))
         use_sumy = True
     except Exception:
         current_app.logger.debug("Tokenizer('indonesian') failed, trying english tokenizer...")
@@ -115,7 +122,7 @@ def summarize_text(text, sentence_count=5):
     # Attempt 2: English tokenizer as fallback for sentence splitting
     if not use_sumy:
         try:
-            parser = PlaintextParser.from_string(text, Tokenizer("english"))
+            parser = plaintext.PlaintextParser.from_string(text, tokenizers.Tokenizer("english"))
             use_sumy = True
             current_app.logger.debug("Tokenizer('english') succeeded. Using english tokenizer as fallback.")
         except Exception:
@@ -124,7 +131,7 @@ def summarize_text(text, sentence_count=5):
     # If we can use sumy, run LexRank
     if use_sumy and parser is not None:
         try:
-            summarizer = LexRankSummarizer()
+            summarizer = lex_rank.LexRankSummarizer()
             summary_sentences = summarizer(parser.document, sentence_count)
             summary = " ".join([str(s) for s in summary_sentences])
             return summary
@@ -164,23 +171,21 @@ def process():
         sentences = 5
 
     # if file uploaded, prefer file
-    if 'file' in request.files and request.files['file'].filename:
-        f = request.files['file']
+    f = get_upload('file')
+    if f is not None and f.filename:
         filename = f.filename.lower()
         ext = filename.rsplit('.', 1)[-1] if '.' in filename else ''
         try:
-            if ext == 'pdf':
-                f.stream.seek(0)
-                extracted = extract_text_from_pdf(f.stream)
-            elif ext == 'docx':
-                f.stream.seek(0)
-                extracted = extract_text_from_docx(f.stream)
-            elif ext == 'txt':
-                f.stream.seek(0)
-                # bytes -> decode
-                extracted = f.stream.read().decode('utf-8', errors='ignore')
-            else:
-                return "Format file tidak didukung.", 415
+            with metrics.phase('extract'):
+                if ext == 'pdf':
+                    extracted = extract_text_from_pdf(f.stream())
+                elif ext == 'docx':
+                    extracted = extract_text_from_docx(f.stream())
+                elif ext == 'txt':
+                    # bytes -> decode
+                    extracted = f.stream().read().decode('utf-8', errors='ignore')
+                else:
+                    return "Format file tidak didukung.", 415
         except Exception as e:
             current_app.logger.error(f"Error saat ekstrak file: {e}")
             return str(e), 500
@@ -191,7 +196,8 @@ def process():
         return "Tidak ada teks untuk diringkas.", 400
 
     try:
-        summary = summarize_text(text_input, sentence_count=sentences)
+        with metrics.phase('summarize'):
+            summary = summarize_text(text_input, sentence_count=sentences)
         return jsonify({
             "summary": summary,
             "sentences_requested": sentences
@@ -1,18 +1,24 @@
 # blueprints/upscale.py
 
 import io
-import cv2 # Membutuhkan opencv-python-headless
-import numpy as np # Membutuhkan numpy
-from flask import Blueprint, request, render_template, send_file, current_app
+from flask import Blueprint, request, render_template, current_app
 import os
+from utils.uploads import get_upload, upload_policy
+from utils.imageload import cv2_imdecode_reduced, peek_size
+from utils.lazy import lazy_import
+from utils import admission, metrics, results, singleflight
+
+cv2 = lazy_import('cv2')  # Membutuhkan opencv-python-headless
+np = lazy_import('numpy')  # Membutuhkan numpy
 
 # 1. Inisialisasi Blueprint
 upscale_bp = Blueprint('upscale_bp', __name__, url_prefix='/peningkatan-hd')
+upload_policy(upscale_bp, {'jpeg', 'png', 'webp'})
 
 # Daftar mimetype gambar yang diizinkan
 ALLOWED_MIMETYPES = {'image/jpeg', 'image/png', 'image/webp'}
 
-def upscale_image_cv2(image_file_bytes, scale_factor_str):
+def upscale_image_cv2(image_buffer, scale_factor_str, image_size, max_side=None):
     try:
         # --- 1. Dapatkan Path MODEL DIREKTORI dari Konfigurasi Flask ---
         model_dir = current_app.config.get('UPSCALE_MODEL_DIR')
@@ -35,41 +41,40 @@ def upscale_image_cv2(image_file_bytes, scale_factor_str):
             raise Exception(f"Konfigurasi server error: File model {model_filename} tidak ditemukan.")
 
         # --- 3. Baca Gambar menggunakan OpenCV ---
-        nparr = np.frombuffer(image_file_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # image_buffer boleh bytes atau mmap upload; gambar yang melebihi max_side
+        # langsung di-decode pada skala 1/2..1/8 (IMREAD_REDUCED_*) lalu di-resize
+        max_side = max_side or current_app.config.get('AI_CPU_MAX_SIDE', 2048)
+        with metrics.phase('decode'):
+            img = cv2_imdecode_reduced(image_buffer, image_size, max_side)
 
         if img is None:
             raise Exception("Gagal membaca file gambar. File mungkin rusak.")
-        
-        # --- 3.5. Resize jika melebihi batas max_side ---
-        max_side = current_app.config.get('AI_CPU_MAX_SIDE', 2048)
-        h, w = img.shape[:2]
 
+        w, h = image_size
         if max(h, w) > max_side:
-            scale = max_side / max(h, w)
-            new_w = int(w * scale)
-            new_h = int(h * scale)
-            img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
             current_app.logger.info(
-                f"Resize dulu: {w}x{h} → {new_w}x{new_h} (max_side={max_side})"
+                f"Resize dulu: {w}x{h} → {img.shape[1]}x{img.shape[0]} (max_side={max_side})"
             )
 
         # --- 4. Inisialisasi Model Super Resolution ---
-        sr = cv2.dnn_superres.DnnSuperResImpl_create()
-        
-        # Baca model dari file
-        sr.readModel(model_path)
-        
-        # Atur model dan skala (SEKARANG DINAMIS)
-        sr.setModel("fsrcnn", scale_factor_int) 
+        with metrics.phase('model_load'):
+            sr = cv2.dnn_superres.DnnSuperResImpl_create()
+
+            # Baca model dari file
+            sr.readModel(model_path)
+
+            # Atur model dan skala (SEKARANG DINAMIS)
+            sr.setModel("fsrcnn", scale_factor_int)
 
         # --- 5. Jalankan Upscale (PROSES BERAT DI SINI) ---
         current_app.logger.info(f"Memulai proses upscale {scale_factor_str}x CV2...")
-        result = sr.upsample(img)
+        with metrics.phase('inference'):
+            result = sr.upsample(img)
         current_app.logger.info(f"Proses upscale {scale_factor_str}x CV2 selesai.")
 
         # --- 6. Encode Hasil kembali ke format PNG ---
-        is_success, buffer = cv2.imencode(".png", result)
+        with metrics.phase('encode'):
+            is_success, buffer = cv2.imencode(".png", result)
         if not is_success:
             raise Exception("Gagal meng-encode gambar hasil upscale.")
 
@@ -91,11 +96,11 @@ def form():
     return render_template('upscale.html')
 
 @upscale_bp.route('/process', methods=['POST'])
+@singleflight.dedupe  # double-click / retry: request identik memakai hasil job yang sedang jalan
 def process():
-    if 'image' not in request.files:
+    file = get_upload('image')
+    if file is None:
         return "Tidak ada file yang diunggah", 400
-        
-    file = request.files['image']
 
     # Ambil nilai 'scale' dari form, default ke '4' jika tidak ada
     scale_factor = request.form.get('scale', '4')
@@ -108,20 +113,31 @@ def process():
         return "Skala pembesaran tidak valid.", 400
 
     try:
-        image_bytes = file.read()
-        
+        image_size = peek_size(file.stream())
+    except Exception:
+        return "Gagal membaca file gambar. File mungkin rusak.", 400
+
+    # perkiraan memori dari dimensi x skala^2; jika tidak muat, gambar di-decode lebih kecil
+    max_side = current_app.config.get('AI_CPU_MAX_SIDE', 2048)
+    ticket = admission.admit('upscale', admission.superres_options(image_size, int(scale_factor), max_side))
+    try:
         # Kirim skala yang dipilih ke fungsi logika
-        image_output, mimetype, ext = upscale_image_cv2(image_bytes, scale_factor)
+        image_output, mimetype, ext = upscale_image_cv2(file.mmap(), scale_factor, image_size, max_side=ticket.value)
 
         # Ubah nama file output dinamis
         download_name = f'perbesar_{scale_factor}x_web_toolkit.{ext}'
 
-        return send_file(
-            image_output,
-            mimetype=mimetype,
-            as_attachment=True,
-            download_name=download_name
-        )
+        # hasil ditulis ke RESULTS_DIR supaya bisa dibagikan ke request identik yang menunggu
+        out_path = results.new_result(f'.{ext}')
+        with open(out_path, 'wb') as f:
+            f.write(image_output.getbuffer())
+        # hasil yang diturunkan admission (max_side lebih kecil) tidak dibagikan: follower
+        # menjalankan admission sendiri dan bisa saja mendapat kualitas penuh
+        if not ticket.downgraded:
+            singleflight.publish(out_path, download_name, mimetype)
+        return results.deliver(out_path, download_name, mimetype)
 
     except Exception as e:
-        return str(e), 500
\ No newline at end of file
+        return str(e), 500
+    finally:
+        ticket.release()
@@ -5,10 +5,13 @@ import shutil
 import tempfile
 import subprocess
 from pathlib import Path
-from flask import Blueprint, request, send_file, render_template, current_app
+from flask import Blueprint, request, render_template, current_app
 from werkzeug.utils import secure_filename
+from utils.uploads import get_upload, upload_policy
+from utils import metrics, results
 
 xlsxtopdf_bp = Blueprint('xlsxtopdf_bp', __name__, url_prefix='/xlsx-ke-pdf')
+upload_policy(xlsxtopdf_bp, {'zip', 'ole'})
 
 ALLOWED_EXT = {'.xlsx', '.xls', '.ods'}
 
@@ -34,10 +37,10 @@ def form():
 
 @xlsxtopdf_bp.route('/process', methods=['POST'])
 def process():
-    if 'file' not in request.files:
+    uploaded = get_upload('file')
+    if uploaded is None:
         return "Tidak ada file yang diunggah", 400
 
-    uploaded = request.files['file']
     if uploaded.filename == '':
         return "Nama file kosong", 400
 
@@ -54,10 +57,8 @@ def process():
     tmp_input = None
     tmp_out_dir = None
     try:
-        # simpan input ke temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tf:
-            uploaded.save(tf.name)
-            tmp_input = tf.name
+        # input dibaca soffice langsung dari file spool upload (ekstensi ikut dipertahankan)
+        tmp_input = uploaded.path
 
         tmp_out_dir = tempfile.mkdtemp(prefix='xlsxtopdf_out_')
 
@@ -70,7 +71,8 @@ def process():
             tmp_input
         ]
         current_app.logger.info(f"Running soffice convert: {' '.join(cmd)}")
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=600)
+        with metrics.phase('soffice'):
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=600)
 
         if proc.returncode != 0:
             current_app.logger.error(f"soffice error stdout:{proc.stdout[:200]} stderr:{proc.stderr[:200]}")
@@ -86,12 +88,8 @@ def process():
                 return "Gagal: file PDF hasil konversi tidak ditemukan.", 500
             out_pdf_path = os.path.join(tmp_out_dir, pdfs[0])
 
-        return send_file(
-            out_pdf_path,
-            as_attachment=True,
-            download_name=f"xlsx_pdf_web_toolkit.pdf",
-            mimetype='application/pdf'
-        )
+        # dipindah ke RESULTS_DIR dulu; tmp_out_dir dihapus di finally
+        return results.deliver(results.store(out_pdf_path), "xlsx_pdf_web_toolkit.pdf", 'application/pdf')
 
     except subprocess.TimeoutExpired:
         current_app.logger.error("Konversi soffice timeout")
@@ -100,12 +98,7 @@ def process():
         current_app.logger.exception("Error saat konversi XLSX->PDF")
         return f"Terjadi kesalahan saat konversi: {e}", 500
     finally:
-        # cleanup
-        try:
-            if tmp_input and os.path.exists(tmp_input):
-                os.remove(tmp_input)
-        except Exception:
-            pass
+        # cleanup (file input dibersihkan oleh utils.uploads di akhir request)
         try:
             if tmp_out_dir and os.path.exists(tmp_out_dir):
                 shutil.rmtree(tmp_out_dir, ignore_errors=True)
@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+# Pemakaian: gunicorn -c gunicorn.conf.py wsgi:application
+#
+# gthread: setiap worker punya banyak thread. Page view & static dilayani
+# langsung oleh thread request, sedangkan route berat antri di pool per tool
+# (TOOL_POOLS di app.py), jadi lonjakan upload tidak memblokir halaman.
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+# thread >= total slot pool (jalan + antri) + cadangan untuk page view
+threads = int(os.environ.get('GUNICORN_THREADS', 64))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 300))  # konversi berat (upscale, OCR) bisa lama
+graceful_timeout = 30
+keepalive = 5
+# worker di-restart berkala supaya memori library berat yang terfragmentasi dikembalikan
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 500))
+max_requests_jitter = 50
@@ -1,8 +1,9 @@
 // static/js/app.js
 
 /* --- Global Upload Constants --- */
-const GLOBAL_MAX_FILE_SIZE_MB = 16;
-const GLOBAL_MAX_TOTAL_SIZE_MB = 100; // Untuk fungsi upload banyak file
+// Batas per tool dikirim server lewat base.html (UPLOAD_LIMITS di app.py)
+const GLOBAL_MAX_FILE_SIZE_MB = window.UPLOAD_LIMIT_MB || 16;
+const GLOBAL_MAX_TOTAL_SIZE_MB = window.UPLOAD_LIMIT_MB || 100; // Untuk fungsi upload banyak file (batas total request)
 // Otomatis menghitung byte
 const GLOBAL_MAX_FILE_SIZE_BYTES = GLOBAL_MAX_FILE_SIZE_MB * 1024 * 1024;
 const GLOBAL_MAX_TOTAL_SIZE_BYTES = GLOBAL_MAX_TOTAL_SIZE_MB * 1024 * 1024;
@@ -50,6 +51,15 @@ function hideLoadingOverlay() {
     if (overlay) {
         overlay.classList.remove('show');
     }
+    setLoadingText('Sedang diproses...');
+}
+
+// Ganti teks overlay (mis. progres "Halaman 3 dari 40")
+function setLoadingText(text) {
+    const el = document.getElementById('loadingText');
+    if (el) {
+        el.textContent = text;
+    }
 }
 
 
@@ -44,7 +44,7 @@ document.addEventListener('alpine:init', () => {
     },
 
     _makeName(orig, mime) {
-      const extMap = {'image/png':'png','image/jpeg':'jpg','image/webp':'webp','image/bmp':'bmp','image/tiff':'tiff','image/gif':'gif'};
+      const extMap = {'image/png':'png','image/jpeg':'jpg','image/webp':'webp','image/bmp':'bmp','image/tiff':'tiff','image/gif':'gif','image/apng':'png'};
       const ext = extMap[mime] || 'img';
       return `konversi_gambar_web_toolkit.${ext}`;
     },
@@ -85,6 +85,8 @@ document.addEventListener('alpine:init', () => {
 
     // apakah browser bisa encode langsung?
     _clientCanEncode(mime) {
+      // canvas hanya mengambil frame pertama: GIF -> WebP dikirim ke server agar animasinya tetap
+      if (this.file && this.file.type === 'image/gif' && mime === 'image/webp') return false;
       return ['image/png','image/jpeg','image/webp'].includes(mime);
     },
 
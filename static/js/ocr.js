@@ -14,6 +14,7 @@ document.addEventListener('alpine:init', () => {
         resultText: '',
         downloadUrl: '',
         downloadFileName: '',
+        outputFormat: 'txt',
         uploadUrl: uploadUrl,
 
         // --- PRIVATE HELPERS ---
@@ -91,7 +92,7 @@ document.addEventListener('alpine:init', () => {
 
             const formData = new FormData();
             formData.append('file', this.file);
-            // server selalu mengembalikan text/plain .txt
+            formData.append('output', this.outputFormat);
 
             try {
                 const response = await fetch(this.uploadUrl, {
@@ -104,6 +105,18 @@ document.addEventListener('alpine:init', () => {
                     throw new Error(errText.trim() || "Terjadi kesalahan.");
                 }
 
+                if (this.outputFormat === 'pdf') {
+                    // PDF searchable: langsung jadi file unduhan, tidak ditampilkan
+                    const blob = await response.blob();
+                    if (this.downloadUrl) URL.revokeObjectURL(this.downloadUrl);
+                    this.downloadUrl = URL.createObjectURL(blob);
+                    this.downloadFileName = `ocr_web_toolkit.pdf`;
+                    this.showResultArea = true;
+                    this.statusText = `Selesai memproses: ${this.fileName}. PDF searchable siap diunduh.`;
+                    this.isDone = true;
+                    return;
+                }
+
                 // server mengembalikan text/plain (txt). Kita baca sebagai text.
                 const text = await response.text();
                 const safeText = text.trim() || "⚠️ Tidak ada teks yang terdeteksi.";
@@ -1,13 +1,15 @@
 // static/js/pdftodocx.js
 
 document.addEventListener('alpine:init', () => {
-    Alpine.data('pdfToDocxComponent', (uploadUrl) => ({
+    Alpine.data('pdfToDocxComponent', (uploadUrl, statusUrl) => ({
         // --- STATE (Data) ---
         file: null,
         statusText: 'Pilih file PDF untuk memulai konversi.', // Teks diubah
         isDragOver: false,
         isDone: false,
         uploadUrl: uploadUrl,
+        statusUrl: statusUrl,
+        pollTimer: null,
         // Hapus 'compressionLevel'
         
         // State Hasil
@@ -75,6 +77,28 @@ document.addEventListener('alpine:init', () => {
             this._updateFile(event.dataTransfer.files[0]);
         },
 
+        // --- HELPER: Polling progres konversi (halaman yang sudah diproses) ---
+        _startPolling(jobId) {
+            const url = this.statusUrl.replace('__job__', jobId);
+            this.pollTimer = setInterval(async () => {
+                try {
+                    const res = await fetch(url);
+                    if (!res.ok) return; // job belum tercatat
+                    const job = await res.json();
+                    if (job.total > 0) {
+                        const pct = Math.round(job.done / job.total * 100);
+                        setLoadingText(job.done >= job.total
+                            ? 'Menyusun dokumen Word...'
+                            : `Memproses halaman ${job.done} dari ${job.total} (${pct}%)`);
+                    }
+                } catch (e) { /* abaikan, coba lagi di interval berikutnya */ }
+            }, 1000);
+        },
+        _stopPolling() {
+            if (this.pollTimer) clearInterval(this.pollTimer);
+            this.pollTimer = null;
+        },
+
         // --- MAIN ACTION (Tombol Klik) ---
         async submitConvert() { // Nama fungsi diubah
             // 1. Cek file
@@ -92,6 +116,10 @@ document.addEventListener('alpine:init', () => {
             // 3. Siapkan FormData
             const formData = new FormData();
             formData.append('file', this.file);
+            // ID job dibuat di sini supaya progres bisa di-polling selama upload & konversi
+            const jobId = (crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+            formData.append('job_id', jobId);
+            this._startPolling(jobId);
             // HAPUS: formData.append('level', ...)
 
             // 4. Kirim request
@@ -125,6 +153,7 @@ document.addEventListener('alpine:init', () => {
                 this.isDone = false;
                 this.showResultArea = false; 
             } finally {
+                this._stopPolling();
                 hideLoadingOverlay(); // Global dari app.js
             }
         }
@@ -0,0 +1,24 @@
+# tests/conftest.py
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path):
+    from app import app as flask_app
+    # state bersama antar worker (ledger, snapshot, lock) diarahkan ke direktori per test
+    config = {
+        'TESTING': True,
+        'RESULTS_DIR': str(tmp_path / 'results'),
+        'SINGLEFLIGHT_DIR': str(tmp_path / 'singleflight'),
+        'ADMISSION_DIR': str(tmp_path / 'admission'),
+        'JOBS_DIR': str(tmp_path / 'jobs'),
+    }
+    saved = {key: flask_app.config.get(key) for key in config}
+    flask_app.config.update(config)
+    yield flask_app
+    flask_app.config.update(saved)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
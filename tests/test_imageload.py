@@ -0,0 +1,39 @@
+# tests/test_imageload.py
+import cv2
+import numpy as np
+import pytest
+
+from utils.imageload import cv2_imdecode_reduced
+
+
+def _lines(size=800, every=8):
+    """Gambar hitam dengan garis putih 1 px setiap `every` px (mudah hilang bila di-subsample)."""
+    img = np.zeros((size, size, 3), np.uint8)
+    img[:, ::every] = 255
+    return img
+
+
+def _baseline(img, max_side):
+    h, w = img.shape[:2]
+    factor = max_side / max(w, h)
+    return cv2.resize(img, (int(w * factor), int(h * factor)), interpolation=cv2.INTER_AREA)
+
+
+@pytest.mark.parametrize('ext', ['.png', '.webp'])
+def test_non_jpeg_sama_dengan_decode_penuh(ext):
+    img = _lines()
+    ok, buf = cv2.imencode(ext, img, [cv2.IMWRITE_WEBP_QUALITY, 101] if ext == '.webp' else [])
+    assert ok
+    out = cv2_imdecode_reduced(buf.tobytes(), (800, 800), 100)
+    assert out.shape == (100, 100, 3)
+    assert np.array_equal(out, _baseline(img, 100))
+    assert out.mean() == pytest.approx(32.0, abs=1)
+
+
+def test_jpeg_decode_diperkecil_ukuran_sama():
+    img = np.full((800, 600, 3), 128, np.uint8)
+    ok, buf = cv2.imencode('.jpg', img)
+    assert ok
+    out = cv2_imdecode_reduced(buf.tobytes(), (600, 800), 100)
+    assert out.shape == (100, 75, 3)
+    assert abs(float(out.mean()) - 128) < 2
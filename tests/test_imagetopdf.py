@@ -0,0 +1,36 @@
+# tests/test_imagetopdf.py
+import io
+
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+
+
+def _image(fmt='PNG', size=(40, 30)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buf, fmt)
+    return buf.getvalue()
+
+
+def _post(client, images):
+    data = {'images[]': [(io.BytesIO(body), name) for name, body in images]}
+    return client.post('/image-to-pdf/convert', data=data, content_type='multipart/form-data')
+
+
+def test_semua_halaman_ditulis(client):
+    response = _post(client, [('a.png', _image()), ('b.jpg', _image('JPEG')), ('c.png', _image())])
+    assert response.status_code == 200
+    assert len(PdfReader(io.BytesIO(response.get_data())).pages) == 3
+
+
+def test_gambar_pertama_rusak_500(client):
+    broken = _image()[:60]  # header PNG valid, data terpotong
+    response = _post(client, [('a.png', broken), ('b.png', _image())])
+    assert response.status_code == 500
+
+
+def test_halaman_rusak_setelah_streaming_memutus_stream(client):
+    # status 200 sudah terkirim; halaman rusak tidak boleh menghasilkan PDF lengkap yang kurang halaman
+    broken = _image()[:60]
+    with pytest.raises(RuntimeError, match='c.png'):
+        _post(client, [('a.png', _image()), ('b.png', _image()), ('c.png', broken)]).get_data()
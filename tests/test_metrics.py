@@ -0,0 +1,20 @@
+# tests/test_metrics.py
+import pytest
+
+
+def test_tanpa_token_hanya_localhost(client):
+    assert client.get('/metrics').status_code == 200
+    # lewat reverse proxy (nginx juga terhubung dari 127.0.0.1)
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.7'}).status_code == 404
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 404
+
+
+@pytest.mark.parametrize('auth, status', [(None, 403), ('Bearer salah', 403), ('Bearer rahasia', 200)])
+def test_dengan_token(app, client, auth, status):
+    app.config['METRICS_TOKEN'] = 'rahasia'
+    try:
+        headers = {'Authorization': auth} if auth else {}
+        response = client.get('/metrics', headers=headers, environ_base={'REMOTE_ADDR': '203.0.113.7'})
+        assert response.status_code == status
+    finally:
+        app.config['METRICS_TOKEN'] = None
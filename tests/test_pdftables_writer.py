@@ -0,0 +1,53 @@
+# tests/test_pdftables_writer.py
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from utils.pdftables import write_tables
+
+
+def _table(columns, rows=2):
+    return pd.DataFrame([[f'{col}{i}' for col in range(len(columns))] for i in range(rows)], columns=columns)
+
+
+def _sheets(tables, merge=True):
+    buf = io.BytesIO()
+    write_tables(tables, buf, merge=merge)
+    buf.seek(0)
+    book = openpyxl.load_workbook(buf)
+    return {ws.title: [list(row) for row in ws.iter_rows(values_only=True)] for ws in book}
+
+
+def test_merge_union_kolom_urutan_kemunculan():
+    sheets = _sheets([('p1_t1', _table(['a', 'b'], 1)), ('p2_t1', _table(['b', 'c'], 1))])
+    assert sheets == {'Sheet1': [['a', 'b', 'c'], ['00', '10', None], [None, '00', '10']]}
+
+
+@pytest.mark.parametrize('columns', [['a', 'a', 'b'], ['', '']])
+def test_merge_satu_tabel_kolom_ganda(columns):
+    # pd.concat satu tabel tidak pernah gagal: tetap satu 'Sheet1'
+    sheets = _sheets([('p1_t1', _table(columns))])
+    assert list(sheets) == ['Sheet1']
+    assert sheets['Sheet1'][0] == [c or None for c in columns]
+    assert len(sheets['Sheet1']) == 3
+
+
+def test_merge_kolom_ganda_identik_ditumpuk():
+    sheets = _sheets([('p1_t1', _table(['a', 'a', 'b'])), ('p2_t1', _table(['a', 'a', 'b']))])
+    assert list(sheets) == ['Sheet1']
+    assert sheets['Sheet1'][0] == ['a', 'a', 'b']
+    assert sheets['Sheet1'][1:] == [['00', '10', '20'], ['01', '11', '21']] * 2
+
+
+def test_merge_kolom_ganda_berbeda_per_sheet():
+    # union tidak terdefinisi (pd.concat gagal): satu sheet per tabel
+    sheets = _sheets([('p1_t1', _table(['a', 'a', 'b'])), ('p2_t1', _table(['a', 'b', 'c']))])
+    assert list(sheets) == ['p1_t1', 'p2_t1']
+
+
+def test_tanpa_merge_nama_sheet_unik_dan_dipotong():
+    name = 'x' * 40
+    sheets = _sheets([(name, _table(['a'])), (name, _table(['a']))], merge=False)
+    assert list(sheets) == ['x' * 30, 'x' * 29 + '_1']
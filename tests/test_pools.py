@@ -0,0 +1,56 @@
+# tests/test_pools.py
+import threading
+
+import pytest
+from flask import Blueprint, Flask, Response, stream_with_context
+
+from utils import pools
+from utils.concurrency import bounded_map
+
+
+@pytest.fixture
+def stream_app():
+    """App kecil: view streaming di pool 1 worker tanpa antrian, job per item lewat stream_jobs()."""
+    app = Flask(__name__)
+    app.config['TOOL_POOLS'] = {'stream': {'blueprints': ['stream_bp'], 'max_workers': 1, 'max_queue': 0}}
+    bp = Blueprint('stream_bp', __name__)
+    app.job_threads = []
+
+    def job(item):
+        app.job_threads.append(threading.current_thread().name)
+        return f'{item};'.encode()
+
+    @bp.route('/stream', methods=['POST'])
+    def stream():
+        def generate():
+            with pools.stream_jobs(8) as (executor, workers):
+                app.workers = workers
+                yield from bounded_map(job, range(3), executor, max_in_flight=workers * 2)
+        return Response(stream_with_context(generate()))
+
+    app.register_blueprint(bp)
+    pools.init_app(app)
+    return app
+
+
+def test_job_stream_jalan_di_executor_pool(stream_app):
+    response = stream_app.test_client().post('/stream')
+    assert response.get_data() == b'0;1;2;'
+    assert stream_app.workers == 1
+    assert stream_app.job_threads and all(name.startswith('pool-stream') for name in stream_app.job_threads)
+
+
+def test_slot_dipegang_sampai_respons_ditutup(stream_app):
+    client = stream_app.test_client()
+    first = client.post('/stream', buffered=False)
+    # generator belum selesai: slot satu-satunya masih dipakai
+    assert client.post('/stream').status_code == 503
+    assert first.get_data() == b'0;1;2;'
+    first.close()
+    assert client.post('/stream').status_code == 200
+
+
+def test_stream_jobs_di_luar_pool_memakai_executor_sendiri():
+    with pools.stream_jobs(2) as (executor, workers):
+        assert workers == 2
+        assert list(bounded_map(lambda i: i * 2, range(4), executor, max_in_flight=4)) == [0, 2, 4, 6]
@@ -0,0 +1,121 @@
+# tests/test_singleflight.py
+import io
+import threading
+import time
+
+import pytest
+from flask import Blueprint, Flask, request
+
+from utils import pools, results, singleflight, uploads
+
+
+@pytest.fixture
+def flight_app(tmp_path):
+    """App kecil: satu view @dedupe di pool 1 worker yang menghitung berapa kali job jalan."""
+    app = Flask(__name__)
+    app.config.update(
+        RESULTS_DIR=str(tmp_path / 'results'),
+        SINGLEFLIGHT_DIR=str(tmp_path / 'singleflight'),
+        TOOL_POOLS={'slow': {'blueprints': ['slow_bp'], 'max_workers': 1, 'max_queue': 8}},
+    )
+    uploads.init_app(app)
+    results.init_app(app)
+    bp = Blueprint('slow_bp', __name__)
+    app.runs = []
+
+    @bp.route('/process', methods=['POST'])
+    @singleflight.dedupe
+    def process():
+        upload = uploads.get_upload('file')
+        app.runs.append(request.form.get('opt'))
+        time.sleep(float(request.form.get('delay', 0.3)))
+        if request.form.get('fail'):
+            return "gagal", 500
+        path = results.new_result('.txt')
+        with open(path, 'wb') as f:
+            f.write(upload.stream().read().upper() + f' run={len(app.runs)}'.encode())
+        if not request.form.get('nopublish'):
+            singleflight.publish(path, 'hasil.txt', 'text/plain')
+        return results.deliver(path, 'hasil.txt', 'text/plain')
+
+    app.register_blueprint(bp)
+    pools.init_app(app)
+    singleflight.init_app(app)
+    return app
+
+
+def _post(app, body=b'isi', **form):
+    data = {'file': (io.BytesIO(body), 'a.txt'), 'opt': 'x', **form}
+    response = app.test_client().post('/process', data=data, content_type='multipart/form-data')
+    return response.status_code, response.get_data()
+
+
+def _burst(app, count, **form):
+    out = [None] * count
+
+    def run(i):
+        out[i] = _post(app, **form)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+        time.sleep(0.02)  # urutan datang tetap, semuanya selagi leader masih jalan
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_request_identik_bersamaan_dijalankan_sekali(flight_app):
+    # pool 1 worker: request kedua & ketiga tidak antri di pool lalu menjalankan job lagi
+    out = _burst(flight_app, 3)
+    assert len(flight_app.runs) == 1
+    assert out == [(200, b'ISI run=1')] * 3
+
+
+def test_request_setelah_selesai_diproses_ulang(flight_app):
+    assert _post(flight_app, delay=0) == (200, b'ISI run=1')
+    assert _post(flight_app, delay=0) == (200, b'ISI run=2')
+
+
+def test_opsi_berbeda_tidak_digabung(flight_app):
+    threads = [threading.Thread(target=_post, args=(flight_app,), kwargs={'opt': opt}) for opt in ('a', 'b')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(flight_app.runs) == ['a', 'b']
+
+
+def test_leader_gagal_follower_jadi_leader(flight_app):
+    out = _burst(flight_app, 2, fail='1')
+    assert len(flight_app.runs) == 2
+    assert [status for status, _ in out] == [500, 500]
+
+
+def test_follower_tidak_memegang_slot_pool(flight_app):
+    # request identik yang menunggu berada di thread request; request lain tetap dapat slot pool
+    # (pool: 1 jalan + 8 antri) dan dilayani setelah leader, bukan setelah follower timeout
+    waiters = [threading.Thread(target=_post, args=(flight_app,), kwargs={'delay': '0.5'}) for _ in range(4)]
+    for t in waiters:
+        t.start()
+        time.sleep(0.02)
+    start = time.monotonic()
+    assert _post(flight_app, body=b'lain', delay=0)[0] == 200
+    assert time.monotonic() - start < 2
+    for t in waiters:
+        t.join()
+    assert flight_app.runs.count('x') == 2
+
+
+def test_hasil_tidak_diterbitkan_follower_proses_sendiri(flight_app):
+    # view yang tidak memanggil publish() (mis. hasil upscale yang diturunkan admission)
+    out = _burst(flight_app, 2, nopublish='1')
+    assert len(flight_app.runs) == 2
+    assert [status for status, _ in out] == [200, 200]
+
+
+def test_sweep_tidak_menghapus_lock_file(tmp_path):
+    # lock dihapus = request yang sudah membuka inode lama bisa jadi leader kedua untuk kunci yang sama
+    for name in ('k.lock', 'k.json', 'k.out'):
+        (tmp_path / name).write_bytes(b'')
+    singleflight.sweep_flights(str(tmp_path), ttl=-1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['k.lock']
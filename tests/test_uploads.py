@@ -0,0 +1,104 @@
+# tests/test_uploads.py
+import io
+import os
+import zipfile
+
+import pytest
+from flask import request
+from PIL import Image
+
+MB = 1024 * 1024
+
+
+# nilai tetap (bukan dihitung ulang dari UPLOAD_LIMITS): endpoint > blueprint > MAX_CONTENT_LENGTH
+EXPECTED_LIMITS_MB = {
+    'combine_bp.combine': 200, 'compresspdf_bp.process': 200, 'convert_bp.batch': 200,
+    'convert_bp.process': 32, 'docxtopdf_bp.process': 100, 'imagetopdf_bp.convert': 200,
+    'ocr_bp.convert_file': 200, 'para_bp.process': 16, 'pdf_to_xlsx_bp.process': 200,
+    'pdftodocx_bp.process': 200, 'pdftoimage_bp.process': 200, 'sharpen_bp.process': 16,
+    'summ_bp.process': 50, 'upscale_bp.process': 16, 'xlsxtopdf_bp.process': 100,
+}
+
+
+def test_batas_upload_per_endpoint(app):
+    rules = {rule.endpoint: rule.rule for rule in app.url_map.iter_rules() if 'POST' in rule.methods}
+    assert set(rules) == set(EXPECTED_LIMITS_MB)
+    for endpoint, path in rules.items():
+        with app.test_request_context(path, method='POST'):
+            assert request.max_content_length == EXPECTED_LIMITS_MB[endpoint] * MB, endpoint
+
+
+@pytest.fixture
+def small_limits(app):
+    saved = app.config['UPLOAD_LIMITS']
+    app.config['UPLOAD_LIMITS'] = {'convert_bp': 4096, 'convert_bp.batch': 64 * 1024}
+    yield
+    app.config['UPLOAD_LIMITS'] = saved
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('/convert-image/batch', 64 * 1024),  # kunci endpoint
+    ('/convert-image/process', 4096),  # kunci blueprint
+    ('/peningkatan-hd/process', 16 * MB),  # tanpa kunci: MAX_CONTENT_LENGTH
+])
+def test_urutan_prioritas_batas(app, small_limits, path, expected):
+    with app.test_request_context(path, method='POST'):
+        assert request.max_content_length == expected
+
+
+def _png(size):
+    return b'\x89PNG\r\n\x1a\n' + b'\0' * (size - 8)
+
+
+def test_upload_melebihi_batas_413(client, small_limits):
+    data = {'image': (io.BytesIO(_png(8192)), 'a.png'), 'target': 'image/jpeg'}
+    response = client.post('/convert-image/process', data=data, content_type='multipart/form-data')
+    assert response.status_code == 413
+
+
+def _noise_png():
+    buf = io.BytesIO()
+    Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def test_batas_endpoint_mengalahkan_blueprint(client, small_limits):
+    # > batas blueprint convert_bp (4 KB), tapi < batas endpoint convert_bp.batch (64 KB)
+    body = _noise_png()
+    assert 4096 < len(body) < 64 * 1024
+    data = {'images[]': [(io.BytesIO(body), 'a.png')], 'target': 'image/jpeg'}
+    response = client.post('/convert-image/batch', data=data, content_type='multipart/form-data')
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as zf:
+        assert zf.namelist() == ['001_a.jpeg']
+        assert Image.open(io.BytesIO(zf.read('001_a.jpeg'))).format == 'JPEG'
+
+
+def test_isi_file_tidak_sesuai_policy_415(client):
+    # docxtopdf_bp hanya menerima zip (docx) / ole (doc)
+    data = {'file': (io.BytesIO(b'%PDF-1.4\n' + b'0' * 64), 'a.docx')}
+    response = client.post('/docx-ke-pdf/process', data=data, content_type='multipart/form-data')
+    assert response.status_code == 415
+
+
+@pytest.mark.parametrize('path, limit_mb', [
+    ('/ocr/', 200), ('/pdf-ke-gambar/', 200), ('/kompres-pdf/', 200), ('/pdf-ke-docx/', 200),
+    ('/pdf-to-xlsx/', 200), ('/docx-ke-pdf/', 100), ('/xlsx-ke-pdf/', 100),
+])
+def test_form_menampilkan_batas_blueprint(client, path, limit_mb):
+    html = client.get(path).get_data(as_text=True)
+    assert f'Maks. {limit_mb} MB' in html
+    assert 'Maks. 16 MB' not in html
+
+
+def test_file_kosong_ditolak_415(client):
+    data = {'file': (io.BytesIO(b''), 'a.docx')}
+    response = client.post('/docx-ke-pdf/process', data=data, content_type='multipart/form-data')
+    assert response.status_code == 415
+
+
+def test_field_file_tanpa_nama_400(client):
+    # form dikirim tanpa memilih file: bagian multipart kosong dengan filename=""
+    data = {'file': (io.BytesIO(b''), '')}
+    response = client.post('/docx-ke-pdf/process', data=data, content_type='multipart/form-data')
+    assert response.status_code == 400
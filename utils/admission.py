@@ -0,0 +1,257 @@
+# utils/admission.py
+"""
+Admission control berbasis perkiraan memori untuk endpoint berat.
+
+Sebelum job berat mulai, view menghitung perkiraan puncak memorinya dari input
+(dimensi piksel x skala^2 untuk super-resolution, jumlah halaman x DPI^2 untuk
+render PDF, jumlah token untuk paraphraser) lalu memesan angka itu di ledger
+bersama. Ledger adalah file JSON di ADMISSION_DIR yang dikunci ``fcntl``,
+sehingga anggaran ADMISSION_MEMORY_MB berlaku untuk semua worker gunicorn
+sekaligus, bukan per proses. Pesanan milik proses yang sudah mati dibuang saat
+ledger dibaca.
+
+Setiap job memberi daftar opsi ``[(perkiraan_mb, nilai), ...]`` dari kualitas
+penuh ke yang paling ringan. Opsi yang lebih besar dari seluruh anggaran tidak
+akan pernah muat dan langsung dibuang (job otomatis turun kualitas). Sisanya:
+1. opsi pertama ditunggu (antri) sampai ADMISSION_DOWNGRADE_AFTER detik;
+2. setelah itu opsi lebih ringan yang muat juga diterima;
+3. lewat ADMISSION_QUEUE_TIMEOUT detik, request ditolak 503 + Retry-After.
+``admit`` dipanggil di luar blok ``try/except Exception`` view (atau blok itu
+meneruskan ``HTTPException``) supaya 503-nya tidak tertelan menjadi 500.
+"""
+import fcntl
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+
+from utils import metrics
+from utils.imageload import target_size
+
+MB = 1024 * 1024
+POLL_INTERVAL = 0.25  # detik antar percobaan saat antri
+DEFAULT_QUEUE_TIMEOUT = 30
+DEFAULT_DOWNGRADE_AFTER = 5
+DEFAULT_RETRY_AFTER = 30
+
+# perkiraan kasar, sengaja dibulatkan ke atas
+SR_BYTES_PER_INPUT_PX = 300  # BGR input + feature map float32 FSRCNN
+SR_BYTES_PER_OUTPUT_PX = 6  # hasil BGR + buffer encode
+RENDER_BYTES_PER_PX = 2  # PPM dari poppler + PIL Image, per channel
+TESSERACT_BYTES_PER_PX = 8
+PARAPHRASE_MODEL_MB = 1200  # IndoT5-base + torch, dimuat sekali per proses
+PARAPHRASE_MB_PER_TOKEN_BEAM = 0.1
+BASE_JOB_MB = 64
+
+BUSY_MESSAGE = "Server sedang memproses banyak file besar. Silakan coba lagi sebentar lagi."
+TOO_LARGE_MESSAGE = "File terlalu besar untuk diproses server ini. Coba file yang lebih kecil atau pisahkan halamannya."
+
+
+def _default_budget_mb():
+    """Separuh RAM fisik; sisanya untuk worker, page cache dan proses eksternal."""
+    try:
+        return int(os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / MB / 2)
+    except (ValueError, OSError, AttributeError):
+        return 2048
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MemoryLedger:
+    """Pesanan memori (MB) semua worker di satu file JSON yang dikunci fcntl."""
+
+    def __init__(self, directory, budget_mb):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, 'ledger.json')
+        self.lock_path = self.path + '.lock'
+        self.budget_mb = budget_mb
+
+    def _locked(self):
+        lock = open(self.lock_path, 'a+')
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock  # kunci lepas saat file ditutup
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {token: mb for token, mb in entries.items() if pid_alive(int(token.split('-', 1)[0]))}
+
+    def _write(self, entries):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.ledger_')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+    def try_reserve(self, mb):
+        """Token pesanan, atau None jika anggaran tidak cukup saat ini."""
+        with self._locked():
+            entries = self._read()
+            if sum(entries.values()) + mb > self.budget_mb:
+                return None
+            token = f'{os.getpid()}-{uuid.uuid4().hex[:12]}'
+            entries[token] = mb
+            self._write(entries)
+            return token
+
+    def release(self, token):
+        with self._locked():
+            entries = self._read()
+            if entries.pop(token, None) is not None:
+                self._write(entries)
+
+    def usage(self):
+        """(terpakai_mb, anggaran_mb, jumlah_job)."""
+        with self._locked():
+            entries = self._read()
+        return sum(entries.values()), self.budget_mb, len(entries)
+
+
+class Ticket:
+    """Hasil admit: `value` opsi yang dipilih; pesanan dilepas saat keluar dari `with`."""
+
+    def __init__(self, ledger, token, mb, value, downgraded):
+        self.ledger = ledger
+        self.token = token
+        self.mb = mb
+        self.value = value
+        self.downgraded = downgraded
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        if self.ledger and self.token:
+            self.ledger.release(self.token)
+            self.token = None
+
+
+def get_ledger():
+    cfg = current_app.config
+    directory = cfg.get('ADMISSION_DIR') or os.path.join(tempfile.gettempdir(), 'webtoolkit_admission')
+    return MemoryLedger(directory, cfg.get('ADMISSION_MEMORY_MB') or _default_budget_mb())
+
+
+def admit(tool, options):
+    """
+    Pesan memori untuk satu job. `options` = [(perkiraan_mb, nilai), ...] dari
+    kualitas penuh ke paling ringan. Return Ticket; raise ServiceUnavailable (503).
+    """
+    cfg = current_app.config
+    options = [(max(1, int(mb)), value) for mb, value in options]
+    if not cfg.get('ADMISSION_ENABLED', True):
+        return Ticket(None, None, options[0][0], options[0][1], False)
+
+    ledger = get_ledger()
+    fitting = [option for option in options if option[0] <= ledger.budget_mb]
+    if not fitting:
+        metrics.inc('admission_total', tool=metrics.current_tool(), result='too_large')
+        current_app.logger.warning(f"Admission {tool}: ditolak, perkiraan {options[-1][0]} MB > anggaran {ledger.budget_mb} MB")
+        raise ServiceUnavailable(TOO_LARGE_MESSAGE)
+
+    metrics.add_gauge('admission_waiting', 1)
+    try:
+        with metrics.phase('admission'):
+            return _wait(tool, ledger, options, fitting, cfg)
+    finally:
+        metrics.add_gauge('admission_waiting', -1)
+
+
+def _wait(tool, ledger, options, fitting, cfg):
+    start = time.monotonic()
+    deadline = start + cfg.get('ADMISSION_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+    downgrade_at = start + cfg.get('ADMISSION_DOWNGRADE_AFTER', DEFAULT_DOWNGRADE_AFTER)
+    while True:
+        now = time.monotonic()
+        for mb, value in (fitting if now >= downgrade_at else fitting[:1]):
+            token = ledger.try_reserve(mb)
+            if token:
+                downgraded = (mb, value) != options[0]
+                metrics.inc('admission_total', tool=metrics.current_tool(), result='downgraded' if downgraded else 'admitted')
+                if downgraded or now > start + POLL_INTERVAL:
+                    current_app.logger.info(
+                        f"Admission {tool}: {mb} MB setelah antri {now - start:.1f} detik"
+                        + (f", diturunkan ke {value!r}" if downgraded else ""))
+                return Ticket(ledger, token, mb, value, downgraded)
+        if now >= deadline:
+            metrics.inc('admission_total', tool=metrics.current_tool(), result='busy')
+            current_app.logger.warning(f"Admission {tool}: antrian penuh, {fitting[-1][0]} MB tidak muat")
+            raise ServiceUnavailable(BUSY_MESSAGE, retry_after=cfg.get('ADMISSION_RETRY_AFTER', DEFAULT_RETRY_AFTER))
+        time.sleep(POLL_INTERVAL)
+
+
+# --- Perkiraan memori per jenis job ---
+
+def superres_options(size, scale, max_side):
+    """Super-resolution (upscale/sharpen): nilai opsi = max_side decode yang dipakai."""
+    options = []
+    seen = set()
+    for side in (max_side, max_side * 3 // 4, max_side // 2, max_side // 4):
+        w, h = target_size(size, max_side=side) or size
+        if (w, h) in seen or side < 256:
+            continue
+        seen.add((w, h))
+        px = w * h
+        options.append((BASE_JOB_MB + (px * SR_BYTES_PER_INPUT_PX + px * scale * scale * SR_BYTES_PER_OUTPUT_PX) / MB, side))
+    return options
+
+
+def render_mb(page_sizes, dpi, pages_in_memory, channels):
+    """Memori render `pages_in_memory` halaman terbesar dari `page_sizes` (point) pada `dpi`."""
+    largest = sorted((w * h for w, h in page_sizes), reverse=True)[:pages_in_memory]
+    px = sum(largest) * (dpi / 72.0) ** 2
+    return px * channels * RENDER_BYTES_PER_PX / MB
+
+
+def pdf_page_sizes(pdf_path):
+    """Ukuran (lebar, tinggi) point semua halaman, tanpa me-render apa pun."""
+    from PyPDF2 import PdfReader
+    sizes = []
+    for page in PdfReader(pdf_path).pages:
+        box = page.mediabox
+        sizes.append((float(box.width), float(box.height)))
+    return sizes
+
+
+def pdf_render_options(page_sizes, dpis, channels=3):
+    """Semua halaman di memori sekaligus (pdftoimage): nilai opsi = dpi."""
+    return [(BASE_JOB_MB + render_mb(page_sizes, dpi, len(page_sizes), channels), dpi) for dpi in dpis]
+
+
+def ocr_render_options(page_sizes, max_dpis, workers):
+    """OCR per halaman, `workers` halaman paralel: nilai opsi = (max_dpi, workers)."""
+    options = []
+    for w in sorted({workers, 1}, reverse=True):
+        for dpi in max_dpis:
+            per_page = render_mb(page_sizes, dpi, 1, 1) + render_mb(page_sizes, dpi, 1, 1) * TESSERACT_BYTES_PER_PX / RENDER_BYTES_PER_PX
+            options.append((BASE_JOB_MB + per_page * w, (dpi, w)))
+    return sorted(options, key=lambda o: -o[0])
+
+
+def image_ocr_mb(size, max_scale=2.0):
+    px = size[0] * size[1] * max_scale * max_scale
+    return BASE_JOB_MB + px * (4 + TESSERACT_BYTES_PER_PX) / MB
+
+
+def paraphrase_mb(tokens, chunk_tokens, beams, model_loaded):
+    """Generate per chunk: memori tergantung token per chunk, bukan panjang teks total."""
+    job = BASE_JOB_MB + min(tokens, chunk_tokens) * beams * PARAPHRASE_MB_PER_TOKEN_BEAM
+    return job + (0 if model_loaded else PARAPHRASE_MODEL_MB)
@@ -0,0 +1,169 @@
+# utils/animated.py
+"""
+Konversi gambar animasi (GIF / WebP / APNG) frame demi frame.
+
+Writer GIF dan APNG bawaan Pillow mengumpulkan semua frame di list sebelum
+menulis. Di sini setiap frame di-decode, dikonversi, di-encode lalu langsung
+dibuang, sehingga memori tetap O(1 frame) berapapun panjang animasinya.
+GIF memakai satu palet bersama (diambil dari frame pertama) sehingga frame
+berikutnya cukup di-map ke palet itu, tanpa kuantisasi ulang per frame;
+palet lokal hanya dibuat jika warna frame sudah terlalu jauh dari palet itu.
+"""
+import io
+import struct
+import zlib
+from PIL import Image, ImageChops, ImageSequence, ImageStat, GifImagePlugin
+
+TRANSPARENT_INDEX = 255  # indeks palet GIF yang dicadangkan untuk transparansi
+MAX_PALETTE_ERROR = 6    # rata-rata selisih per kanal sebelum frame diberi palet lokal
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def is_animated(img):
+    # is_animated cukup mengecek frame kedua, tidak men-decode seluruh animasi
+    return bool(getattr(img, 'is_animated', False))
+
+
+def save_animated(img, fp, fmt, quality=80):
+    """Tulis animasi `img` ke `fp` dalam format 'GIF', 'WEBP' atau 'PNG' (APNG)."""
+    loop = img.info.get('loop', 0)
+    if fmt == 'GIF':
+        _save_gif(img, fp, loop)
+    elif fmt == 'PNG':
+        _save_apng(img, fp, loop)
+    elif fmt == 'WEBP':
+        _save_webp(img, fp, loop, quality)
+    else:
+        raise ValueError(f"Format animasi tidak didukung: {fmt}")
+
+
+# ---- GIF ----
+def _shared_palette(frame_rgb):
+    """Palet 255 warna dari frame pertama; indeks 255 disisakan untuk transparansi."""
+    pal = frame_rgb.quantize(colors=TRANSPARENT_INDEX, method=Image.Quantize.MEDIANCUT)
+    palette = pal.getpalette()[:TRANSPARENT_INDEX * 3]
+    palette += [0] * (768 - len(palette))
+    pal.putpalette(palette)
+    return pal
+
+
+def _map_to_palette(region, palette_img):
+    """Map ke palet bersama; (frame P, True) jika ternyata butuh palet lokal sendiri."""
+    p_frame = region.quantize(palette=palette_img, dither=Image.Dither.NONE)
+    error = ImageStat.Stat(ImageChops.difference(region, p_frame.convert('RGB'))).mean
+    if max(error) <= MAX_PALETTE_ERROR:
+        return p_frame, False
+    return _shared_palette(region), True
+
+
+def _save_gif(img, fp, loop):
+    has_alpha = img.has_transparency_data
+    palette_img = None
+    palette_is_global = True  # False setelah palet bersama diganti palet lokal
+    prev_rgb = None  # hanya frame sebelumnya yang disimpan, untuk mencari area yang berubah
+    for index, frame in enumerate(ImageSequence.Iterator(img)):
+        if has_alpha:
+            rgba = frame.convert('RGBA')
+            rgb = rgba.convert('RGB')
+        else:
+            rgb = frame.convert('RGB')
+        if palette_img is None:
+            palette_img = _shared_palette(rgb)
+        params = {'duration': frame.info.get('duration', 0)}
+        offset = (0, 0)
+
+        if has_alpha:
+            p_frame, local = _map_to_palette(rgb, palette_img)
+            mask = rgba.getchannel('A').point(lambda a: 255 if a < 128 else 0)
+            p_frame.paste(TRANSPARENT_INDEX, mask=mask)
+            # frame selalu satu kanvas penuh, jadi kembalikan ke background sebelum frame berikutnya
+            params.update(transparency=TRANSPARENT_INDEX, disposal=2)
+        else:
+            # frame opak: cukup tulis persegi yang berubah dari frame sebelumnya
+            bbox = ImageChops.difference(rgb, prev_rgb).getbbox() if prev_rgb is not None else None
+            if prev_rgb is not None and bbox is None:
+                bbox = (0, 0, 1, 1)  # frame identik, tetap tulis 1 piksel agar durasinya terjaga
+            region = rgb.crop(bbox) if bbox else rgb
+            offset = bbox[:2] if bbox else (0, 0)
+            p_frame, local = _map_to_palette(region, palette_img)
+            params['disposal'] = 1
+            prev_rgb = rgb
+
+        if local and index > 0:
+            # warna animasi bergeser: frame ini membawa palet lokal, dan palet itu
+            # dipakai sebagai palet bersama untuk frame-frame berikutnya
+            palette_img = p_frame
+            palette_is_global = False
+        if not palette_is_global:
+            params['include_color_table'] = True
+
+        if index == 0:
+            header, _ = GifImagePlugin.getheader(p_frame, None, {'loop': loop})
+            fp.write(b''.join(header))
+        fp.write(b''.join(GifImagePlugin.getdata(p_frame, offset, **params)))
+    fp.write(b';')  # trailer
+
+
+# ---- APNG ----
+def _png_chunk(ctype, body):
+    return struct.pack('>I', len(body)) + ctype + body + struct.pack('>I', zlib.crc32(ctype + body) & 0xffffffff)
+
+
+def _iter_png_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        yield data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _save_apng(img, fp, loop):
+    """
+    Setiap frame di-encode Pillow sebagai PNG biasa, lalu chunk IDAT-nya
+    dibungkus ulang menjadi fdAT. Jumlah frame di acTL ditulis di akhir,
+    jadi `fp` harus seekable.
+    """
+    mode = 'RGBA' if img.has_transparency_data else 'RGB'
+    seq = 0
+    actl_pos = None
+    num_frames = 0
+    for frame in ImageSequence.Iterator(img):
+        encoded = io.BytesIO()
+        frame.convert(mode).save(encoded, format='PNG')
+        width, height = frame.size
+        duration = int(frame.info.get('duration', 0))
+        fctl = struct.pack('>IIIIIHHBB', seq, width, height, 0, 0, duration, 1000, 0, 0)
+        seq += 1
+
+        if actl_pos is None:
+            fp.write(PNG_SIGNATURE)
+            for ctype, body in _iter_png_chunks(encoded.getvalue()):
+                if ctype == b'IHDR':
+                    fp.write(_png_chunk(ctype, body))
+                    actl_pos = fp.tell()
+                    fp.write(_png_chunk(b'acTL', struct.pack('>II', 0, loop)))
+                    fp.write(_png_chunk(b'fcTL', fctl))
+                elif ctype == b'IDAT':
+                    fp.write(_png_chunk(ctype, body))
+        else:
+            fp.write(_png_chunk(b'fcTL', fctl))
+            for ctype, body in _iter_png_chunks(encoded.getvalue()):
+                if ctype == b'IDAT':
+                    fp.write(_png_chunk(b'fdAT', struct.pack('>I', seq) + body))
+                    seq += 1
+        num_frames += 1
+
+    fp.write(_png_chunk(b'IEND', b''))
+    end = fp.tell()
+    fp.seek(actl_pos)
+    fp.write(_png_chunk(b'acTL', struct.pack('>II', num_frames, loop)))
+    fp.seek(end)
+
+
+# ---- WebP ----
+def _save_webp(img, fp, loop, quality):
+    # encoder WebP Pillow sudah men-seek sumber frame demi frame; yang perlu
+    # disiapkan hanya daftar durasi (murah, tidak menyimpan piksel)
+    durations = [frame.info.get('duration', 0) for frame in ImageSequence.Iterator(img)]
+    img.seek(0)
+    img.save(fp, format='WEBP', save_all=True, duration=durations, loop=loop, quality=quality)
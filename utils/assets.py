@@ -0,0 +1,165 @@
+# utils/assets.py
+"""
+Fingerprint + precompress file static (js, css, libs, gambar).
+
+Saat startup (atau ``flask --app app assets-build``) setiap file di folder
+static disalin ke ``static/dist/<path>.<hash>.<ext>`` beserta varian ``.gz``
+(dan ``.br`` jika modul ``brotli`` terpasang) untuk file teks. Pemetaan nama
+asli -> nama ber-hash disimpan di ``static/dist/manifest.json``, lalu
+``url_for('static', filename='js/app.js')`` di template otomatis menghasilkan
+URL ber-hash lewat ``url_defaults`` (template tidak perlu diubah).
+
+Karena isi file ber-hash tidak pernah berubah, file itu dikirim dengan
+``Cache-Control: public, max-age=31536000, immutable`` dan varian br / gzip
+dipilih dari header ``Accept-Encoding``. Di produksi sebaiknya nginx yang
+melayani ``/static/dist/`` langsung (``gzip_static`` / ``brotli_static``),
+lihat README; view Flask di sini hanya fallback.
+
+Build bersifat idempoten (nama file = hash isi, ditulis atomik), jadi aman
+dijalankan bersamaan oleh beberapa worker. File ber-hash lama tidak dihapus
+otomatis (HTML lama di cache klien masih merujuknya); ``assets-build --clean``
+membuang yang tidak ada di manifest.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+
+from flask import current_app, request, send_from_directory
+
+from utils import lazy
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+FINGERPRINT_EXT = {'.js', '.css', '.png', '.jpg', '.jpeg', '.webp', '.svg', '.ico', '.woff', '.woff2'}
+COMPRESS_EXT = {'.js', '.css', '.svg', '.json', '.txt'}
+MIN_COMPRESS_BYTES = 512  # file lebih kecil dari ini tidak dikompres
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # urutan preferensi
+
+_state = {'manifest': {}, 'variants': {}}  # nama ber-hash -> set encoding tersedia
+
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.asset_')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _sources(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root) == os.path.abspath(static_folder) and DIST in dirs:
+            dirs.remove(DIST)
+        for name in files:
+            if os.path.splitext(name)[1].lower() in FINGERPRINT_EXT:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+def _compressed(data, ext):
+    """{encoding: bytes} untuk varian yang benar-benar lebih kecil."""
+    if ext not in COMPRESS_EXT or len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if lazy.available('brotli'):
+        import brotli
+        variants['br'] = brotli.compress(data, quality=11)
+    return {enc: blob for enc, blob in variants.items() if len(blob) < len(data)}
+
+
+def build(static_folder, clean=False):
+    """Fingerprint & kompres semua file static. Return manifest {nama asli: nama ber-hash}."""
+    dist = os.path.join(static_folder, DIST)
+    manifest, variants = {}, {}
+    for rel, path in _sources(static_folder):
+        with open(path, 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(rel)
+        hashed = f'{DIST}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+        target = os.path.join(static_folder, hashed)
+        suffixes = dict(ENCODINGS)
+        if not os.path.exists(target):
+            for encoding, blob in _compressed(data, ext.lower()).items():
+                _atomic_write(target + suffixes[encoding], blob)
+            _atomic_write(target, data)  # terakhir: file utama = tanda build file ini lengkap
+        manifest[rel] = hashed
+        variants[hashed] = {enc for enc, suffix in ENCODINGS if os.path.exists(target + suffix)}
+    _atomic_write(os.path.join(dist, MANIFEST), json.dumps(
+        {'files': manifest, 'variants': {k: sorted(v) for k, v in variants.items()}}, indent=1, sort_keys=True).encode())
+    if clean:
+        keep = {os.path.join(static_folder, h) + s for h in manifest.values() for s in ('', '.gz', '.br')}
+        keep.add(os.path.join(dist, MANIFEST))
+        for root, _, files in os.walk(dist):
+            for name in files:
+                path = os.path.join(root, name)
+                if path not in keep:
+                    os.remove(path)
+    _state['manifest'], _state['variants'] = manifest, variants
+    return manifest
+
+
+def load(static_folder):
+    """Muat manifest yang sudah ada; build ulang jika belum ada atau sumbernya berubah."""
+    try:
+        with open(os.path.join(static_folder, DIST, MANIFEST)) as f:
+            data = json.load(f)
+        built = os.path.getmtime(os.path.join(static_folder, DIST, MANIFEST))
+    except (OSError, ValueError):
+        return build(static_folder)
+    sources = dict(_sources(static_folder))
+    if set(sources) != set(data['files']) or any(os.path.getmtime(p) > built for p in sources.values()):
+        return build(static_folder)
+    _state['manifest'] = data['files']
+    _state['variants'] = {k: set(v) for k, v in data['variants'].items()}
+    return _state['manifest']
+
+
+def _url_defaults(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = _state['manifest'].get(values['filename'], values['filename'])
+
+
+def _negotiate(available):
+    for encoding, suffix in ENCODINGS:
+        if encoding in available and request.accept_encodings[encoding]:
+            return encoding, suffix
+    return None, ''
+
+
+def _static_view(filename):
+    available = _state['variants'].get(filename)
+    if available is None:
+        # file tanpa hash (robots.txt, URL lama): perilaku static Flask biasa
+        return current_app.send_static_file(filename)
+    encoding, suffix = _negotiate(available)
+    response = send_from_directory(
+        current_app.static_folder, filename + suffix,
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        max_age=IMMUTABLE_MAX_AGE,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if available:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('ASSETS_FINGERPRINT', True)
+    if not app.config['ASSETS_FINGERPRINT'] or not app.static_folder:
+        return
+    try:
+        load(app.static_folder)
+    except OSError as e:
+        # folder static read-only: jalan tanpa fingerprint daripada gagal start
+        app.logger.warning(f"Build asset static gagal, pakai nama asli: {e}")
+        return
+    app.url_defaults(_url_defaults)
+    app.view_functions['static'] = _static_view
@@ -0,0 +1,18 @@
+# utils/concurrency.py
+"""Helper pool kerja bersama."""
+from collections import deque
+
+
+def bounded_map(fn, items, executor, max_in_flight):
+    """
+    Seperti executor.map, tetapi paling banyak `max_in_flight` job yang
+    di-submit sekaligus, sehingga hasil yang menunggu diambil tidak menumpuk
+    di memori. Urutan hasil sama dengan urutan `items`.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,87 @@
+# utils/imageload.py
+"""
+Loader gambar yang langsung mengecil saat decode.
+
+Foto kamera 4000x3000 yang akhirnya di-resize ke 1600 px tidak perlu di-decode
+penuh: JPEG bisa di-decode pada skala 1/2, 1/4 atau 1/8 (Pillow ``draft()``,
+OpenCV ``IMREAD_REDUCED_*``). Skala dipilih yang terkecil tapi masih >= ukuran
+target, lalu resize akhir tetap memakai filter yang sama seperti sebelumnya,
+sehingga dimensi hasil tidak berubah.
+"""
+from PIL import Image
+
+REDUCE_FACTORS = (8, 4, 2)
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+
+def target_size(size, max_width=None, max_side=None):
+    """Ukuran akhir (w, h) setelah dibatasi, atau None jika tidak perlu dikecilkan."""
+    w, h = size
+    if max_width and w > max_width:
+        scale = max_width / w
+        return max_width, int(h * scale)
+    if max_side and max(w, h) > max_side:
+        scale = max_side / max(w, h)
+        return int(w * scale), int(h * scale)
+    return None
+
+
+def reduce_factor(size, target):
+    """Faktor pangkat dua terbesar yang hasil decode-nya masih >= target."""
+    for factor in REDUCE_FACTORS:
+        if size[0] // factor >= target[0] and size[1] // factor >= target[1]:
+            return factor
+    return 1
+
+
+def open_reduced(fp, max_width=None, max_side=None, resample=Image.Resampling.LANCZOS):
+    """
+    Buka gambar dari `fp` dan kecilkan ke batas yang diminta.
+    JPEG memakai draft mode (decode DCT diskalakan); format lain di-resize
+    bertahap (reducing_gap) sehingga filter mahal hanya bekerja di ukuran kecil.
+    """
+    img = Image.open(fp)
+    target = target_size(img.size, max_width=max_width, max_side=max_side)
+    if target is None:
+        return img
+    if img.format == 'JPEG':
+        img.draft(None, target)
+    return img.resize(target, resample, reducing_gap=3.0)
+
+
+def peek_size(fp):
+    """Dimensi gambar dari header saja (tanpa decode piksel)."""
+    with Image.open(fp) as probe:
+        return probe.size
+
+
+def cv2_imdecode_reduced(buffer, size, max_side):
+    """
+    cv2.imdecode yang memakai IMREAD_REDUCED_COLOR_{2,4,8} bila gambar JPEG jauh
+    lebih besar dari `max_side`, lalu resize INTER_AREA ke ukuran target.
+    Format lain di-decode penuh: OpenCV hanya men-subsample hasil decode penuh
+    (tanpa hemat memori, garis tipis hilang), jadi INTER_AREA tetap dari ukuran asli.
+    `size` adalah dimensi asli (lihat peek_size). Return None jika gagal decode.
+    """
+    import cv2
+    import numpy as np
+
+    nparr = np.frombuffer(buffer, np.uint8)
+    target = target_size(size, max_side=max_side)
+    if target is None:
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+    reduced_flags = {
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        1: cv2.IMREAD_COLOR,
+    }
+    factor = reduce_factor(size, target) if bytes(buffer[:3]) == JPEG_MAGIC else 1
+    img = cv2.imdecode(nparr, reduced_flags[factor])
+    if img is None:
+        return None
+    # imdecode menerapkan orientasi EXIF, jadi sisi panjang bisa tertukar dari ukuran header
+    if (img.shape[1] >= img.shape[0]) != (target[0] >= target[1]):
+        target = target[::-1]
+    return cv2.resize(img, target, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,89 @@
+# utils/jobs.py
+"""
+Status progres job yang disimpan sebagai file JSON di JOBS_DIR.
+
+Disimpan di disk (bukan dict di memori) supaya endpoint status bisa dilayani
+worker gunicorn mana pun, bukan hanya worker yang sedang mengonversi.
+ID job dibuat oleh klien sebelum upload dimulai, sehingga klien bisa polling
+selagi request POST-nya masih berjalan.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+from flask import current_app
+
+JOB_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+DEFAULT_JOB_TTL = 3600  # detik; file status yang lebih tua dari ini dihapus
+
+
+def _jobs_dir():
+    jobs_dir = current_app.config.get('JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'webtoolkit_jobs')
+    os.makedirs(jobs_dir, exist_ok=True)
+    return jobs_dir
+
+
+def valid_job_id(job_id):
+    return bool(job_id) and JOB_ID_RE.match(job_id) is not None
+
+
+def _status_path(jobs_dir, job_id):
+    return os.path.join(jobs_dir, f'{job_id}.json')
+
+
+class JobStatus:
+    """
+    Penulis status satu job. Dibuat di request (butuh app context untuk
+    JOBS_DIR), lalu `update()` boleh dipanggil dari thread lain.
+    Tanpa job_id yang valid semua update diabaikan.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id if valid_job_id(job_id) else None
+        self.jobs_dir = _jobs_dir() if self.job_id else None
+        self.ttl = current_app.config.get('JOB_TTL', DEFAULT_JOB_TTL)
+        self.state = {}
+
+    def update(self, **fields):
+        if not self.job_id:
+            return
+        self.state.update(fields, updated=time.time())
+        path = _status_path(self.jobs_dir, self.job_id)
+        # tulis ke file sementara lalu rename: pembaca tidak pernah melihat JSON setengah jadi
+        fd, tmp = tempfile.mkstemp(dir=self.jobs_dir, prefix='.job_')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, path)
+
+    def start(self, total):
+        sweep_jobs(self.jobs_dir, self.ttl)
+        self.update(state='running', done=0, total=total)
+
+    def finish(self):
+        self.update(state='done', done=self.state.get('total', 0))
+
+    def fail(self, message):
+        self.update(state='error', error=message)
+
+
+def read_status(job_id):
+    """Dict status job, atau None jika tidak ada / id tidak valid."""
+    if not valid_job_id(job_id):
+        return None
+    try:
+        with open(_status_path(_jobs_dir(), job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def sweep_jobs(jobs_dir, ttl):
+    """Hapus file status yang sudah kedaluwarsa (dipanggil saat job baru mulai)."""
+    cutoff = time.time() - ttl
+    for entry in os.scandir(jobs_dir):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
@@ -0,0 +1,123 @@
+# utils/lazy.py
+"""
+Import library berat (torch, cv2, pandas, pdfplumber, ...) saat pertama dipakai.
+
+``cv2 = lazy_import('cv2')`` langsung mengembalikan proxy modul; modul asli
+baru di-import ketika atributnya pertama kali diakses, jadi blueprint bisa
+didaftarkan tanpa ikut memuat dependency-nya. Ketersediaan dependency opsional
+dicek dengan ``available()`` (hanya mencari spec, tanpa import).
+
+Waktu import blueprint (``register_blueprints``) dan waktu import modul lazy
+dicatat untuk laporan startup (``startup_report``, perintah
+``flask startup-report``). ``start_warmup`` meng-import modul lazy di thread
+latar supaya request pertama tidak menanggung waktu import.
+"""
+import importlib
+import importlib.util
+import threading
+import time
+import types
+
+_lock = threading.RLock()
+_modules = {}  # nama -> LazyModule
+_warmup_started = False
+IMPORT_TIMES = {}  # nama modul lazy -> detik import
+STARTUP_TIMES = {}  # nama modul blueprint -> detik import + register
+
+
+class LazyModule(types.ModuleType):
+    """Proxy modul; ``on_load(module)`` dipanggil sekali setelah import asli."""
+
+    def __init__(self, name, on_load=None):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+        self.__dict__['_lazy_on_load'] = on_load
+
+    def _load(self):
+        module = self.__dict__['_lazy_target']
+        if module is not None:
+            return module
+        with _lock:
+            module = self.__dict__['_lazy_target']
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                on_load = self.__dict__['_lazy_on_load']
+                if on_load:
+                    on_load(module)
+                IMPORT_TIMES[self.__name__] = time.perf_counter() - start
+                self.__dict__['_lazy_target'] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__['_lazy_target'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f'<lazy module {self.__name__!r} ({state})>'
+
+
+def lazy_import(name, on_load=None):
+    """Proxy untuk modul `name`; satu proxy per nama modul."""
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name, on_load)
+        return module
+
+
+def available(name):
+    """True jika modul bisa di-import, tanpa benar-benar meng-import-nya."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def register_blueprints(app, specs):
+    """Import dan daftarkan blueprint dari daftar (modul, nama_atribut), waktu dicatat per modul."""
+    for module_name, attr in specs:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, attr))
+        STARTUP_TIMES[module_name] = time.perf_counter() - start
+
+
+def warmup(names=None, logger=None):
+    """Import modul lazy `names` (default: semua yang terdaftar); modul yang gagal dilewati."""
+    for name in names or list(_modules):
+        try:
+            lazy_import(name)._load()
+        except Exception as e:
+            if logger:
+                logger.warning(f'Warmup {name} gagal: {e}')
+
+
+def start_warmup(names=None, logger=None):
+    """
+    Jalankan warmup sekali di thread latar. Dipanggil dari dalam worker
+    (bukan master gunicorn sebelum fork): thread tidak ikut ter-fork, dan lock
+    import yang sedang dipegang saat fork bisa membuat worker macet.
+    """
+    global _warmup_started
+    with _lock:
+        if _warmup_started:
+            return None
+        _warmup_started = True
+    thread = threading.Thread(target=warmup, args=(names, logger), name='lazy-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def startup_report():
+    """Baris (jenis, modul, detik atau None jika belum di-import), urut dari yang terlama."""
+    rows = [('blueprint', name, secs) for name, secs in STARTUP_TIMES.items()]
+    rows += [('lazy', name, IMPORT_TIMES.get(name)) for name in _modules]
+    return sorted(rows, key=lambda r: -(r[2] or 0))
@@ -0,0 +1,387 @@
+# utils/metrics.py
+"""
+Metrik format teks Prometheus di ``/metrics``.
+
+Setiap proses worker menyimpan counter / histogram / gauge di memori, lalu
+thread latar menulis snapshot-nya ke ``METRICS_DIR/metrics_<pid>.json`` setiap
+METRICS_FLUSH_INTERVAL detik (hanya jika ada perubahan). ``/metrics``
+menjumlahkan snapshot semua worker, jadi angka yang terlihat sama dari worker
+mana pun yang melayani scrape. Counter & histogram worker yang sudah mati
+(restart ``max_requests``) digabung ke ``metrics_archive.json`` supaya tidak
+turun; gauge-nya dibuang.
+
+Yang dicatat:
+- per request: jumlah (tool, method, status), latency total sampai byte
+  terakhir terkirim, byte masuk / keluar;
+- per tahap (``phase``): ``upload`` (parse body multipart), ``decode``,
+  ``inference``, subprocess (``gs``, ``soffice``, ``pdftoppm``,
+  ``tesseract``), ``encode``, ``send`` (setelah view selesai sampai byte
+  terakhir; untuk respons streaming termasuk kerja generator), plus
+  ``queue`` / ``admission`` (antri di pool / anggaran memori);
+- cache hit/miss, isi antrian pool per tool dan pesanan memori admission.
+
+Label ``tool`` = nama blueprint tanpa akhiran ``_bp`` (mis. ``ocr``,
+``pdf_to_xlsx``). Kode yang jalan di thread pool tanpa request context
+memberi label tool sendiri: ``metrics.phase('tesseract', 'ocr')``.
+
+Akses: dengan METRICS_TOKEN, scrape wajib ``Authorization: Bearer <token>``;
+tanpa token, ``/metrics`` hanya menjawab request langsung dari loopback (bukan
+yang diteruskan reverse proxy) dan 404 untuk yang lain.
+"""
+import fcntl
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, abort, current_app, g, has_request_context, request
+
+from utils import admission
+
+PREFIX = 'webtoolkit_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+DEFAULT_FLUSH_INTERVAL = 5  # detik
+
+# nama -> (tipe, keterangan)
+METRICS = {
+    'requests_total': ('counter', 'Jumlah request per tool, method dan status.'),
+    'request_seconds': ('histogram', 'Latency request sampai byte terakhir terkirim.'),
+    'phase_seconds': ('histogram', 'Waktu per tahap pemrosesan (upload, decode, inference, subprocess, encode, send).'),
+    'bytes_in_total': ('counter', 'Byte body request yang diterima.'),
+    'bytes_out_total': ('counter', 'Byte body respons yang dikirim.'),
+    'singleflight_total': ('counter', 'Request single-flight per peran (leader / shared = memakai hasil job identik / timeout).'),
+    'result_bytes_total': ('counter', 'Byte file hasil per cara pengiriman (sendfile / x-accel / x-sendfile).'),
+    'cache_total': ('counter', 'Akses cache per hasil (hit/miss).'),
+    'pool_jobs': ('gauge', 'Job di pool per tool yang sedang jalan / antri.'),
+    'pool_rejected_total': ('counter', 'Request yang ditolak 503 karena pool dan antriannya penuh.'),
+    'admission_total': ('counter', 'Hasil admission control memori per tool.'),
+    'admission_waiting': ('gauge', 'Job yang sedang menunggu anggaran memori.'),
+    'admission_memory_mb': ('gauge', 'Memori (MB) yang dipesan job berat dan anggaran globalnya.'),
+    'admission_jobs': ('gauge', 'Job berat yang sedang memegang pesanan memori.'),
+}
+
+_lock = threading.Lock()
+_counters = {}  # (nama, label) -> nilai
+_histograms = {}  # (nama, label) -> [jumlah per bucket..., +Inf, sum]
+_gauges = {}  # (nama, label) -> nilai
+_state = {'enabled': False, 'dir': None, 'interval': DEFAULT_FLUSH_INTERVAL, 'dirty': False, 'flusher_pid': None}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not _state['enabled']:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        _state['dirty'] = True
+
+
+def add_gauge(name, delta, **labels):
+    if not _state['enabled']:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + delta
+        _state['dirty'] = True
+
+
+def observe(name, seconds, **labels):
+    if not _state['enabled']:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(LATENCY_BUCKETS)] += 1
+        hist[-1] += seconds
+        _state['dirty'] = True
+
+
+def current_tool():
+    """Label tool dari blueprint request aktif; 'app' untuk route app, 'none' di luar request."""
+    if not has_request_context():
+        return 'none'
+    if request.endpoint == 'static':
+        return 'static'
+    blueprint = request.blueprint
+    return blueprint[:-3] if blueprint and blueprint.endswith('_bp') else (blueprint or 'app')
+
+
+@contextmanager
+def phase(name, tool=None):
+    """Ukur satu tahap: ``with metrics.phase('soffice'): ...``."""
+    if not _state['enabled']:
+        yield
+        return
+    tool = tool or current_tool()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('phase_seconds', time.perf_counter() - start, tool=tool, phase=name)
+
+
+def cache(name, hit):
+    inc('cache_total', cache=name, result='hit' if hit else 'miss')
+
+
+# --- Snapshot per proses ---
+
+def _snapshot():
+    with _lock:
+        _state['dirty'] = False
+        return {
+            'counters': [[name, dict(labels), value] for (name, labels), value in _counters.items()],
+            'histograms': [[name, dict(labels), list(hist)] for (name, labels), hist in _histograms.items()],
+            'gauges': [[name, dict(labels), value] for (name, labels), value in _gauges.items()],
+        }
+
+
+def _write_json(directory, filename, data):
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.metrics_')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, os.path.join(directory, filename))
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flush():
+    """Tulis snapshot proses ini ke METRICS_DIR."""
+    if _state['enabled'] and _state['dir']:
+        _write_json(_state['dir'], f'metrics_{os.getpid()}.json', _snapshot())
+
+
+def _flush_loop():
+    while True:
+        time.sleep(_state['interval'])
+        if _state['dirty']:
+            try:
+                flush()
+            except OSError:
+                pass
+
+
+def _start_flusher():
+    # di dalam worker (bukan master gunicorn sebelum fork); satu thread per proses
+    with _lock:
+        if _state['flusher_pid'] == os.getpid():
+            return
+        _state['flusher_pid'] = os.getpid()
+    threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def _merge(total, snapshot, with_gauges=True):
+    for name, labels, value in snapshot.get('counters', []):
+        key = _key(name, labels)
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for name, labels, hist in snapshot.get('histograms', []):
+        key = _key(name, labels)
+        current = total['histograms'].get(key)
+        total['histograms'][key] = hist if current is None else [a + b for a, b in zip(current, hist)]
+    if with_gauges:
+        for name, labels, value in snapshot.get('gauges', []):
+            key = _key(name, labels)
+            total['gauges'][key] = total['gauges'].get(key, 0) + value
+
+
+def collect():
+    """Gabungan snapshot semua worker: {'counters': {...}, 'histograms': {...}, 'gauges': {...}}."""
+    directory = _state['dir']
+    flush()
+    total = {'counters': {}, 'histograms': {}, 'gauges': {}}
+    with open(os.path.join(directory, '.lock'), 'a+') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read_json(os.path.join(directory, 'metrics_archive.json')) or {}
+        archive_changed = False
+        for entry in os.scandir(directory):
+            pid = entry.name[len('metrics_'):-len('.json')]
+            if not (entry.name.startswith('metrics_') and pid.isdigit()):
+                continue
+            snapshot = _read_json(entry.path)
+            if snapshot is None:
+                continue
+            if admission.pid_alive(int(pid)):
+                _merge(total, snapshot)
+                continue
+            # worker sudah mati: counter & histogram dipindah ke arsip, gauge dibuang
+            merged = {'counters': {}, 'histograms': {}, 'gauges': {}}
+            _merge(merged, archive, with_gauges=False)
+            _merge(merged, snapshot, with_gauges=False)
+            archive = {
+                'counters': [[n, dict(l), v] for (n, l), v in merged['counters'].items()],
+                'histograms': [[n, dict(l), h] for (n, l), h in merged['histograms'].items()],
+            }
+            archive_changed = True
+            os.remove(entry.path)
+        if archive_changed:
+            _write_json(directory, 'metrics_archive.json', archive)
+    _merge(total, archive, with_gauges=False)
+    return total
+
+
+# --- Format teks Prometheus ---
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(total):
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        if kind == 'histogram':
+            series = {labels: hist for (n, labels), hist in total['histograms'].items() if n == name}
+        else:
+            source = total['counters'] if kind == 'counter' else total['gauges']
+            series = {labels: value for (n, labels), value in source.items() if n == name}
+        if not series:
+            continue
+        full = PREFIX + name
+        lines.append(f'# HELP {full} {help_text}')
+        lines.append(f'# TYPE {full} {kind}')
+        for labels in sorted(series):
+            value = series[labels]
+            if kind != 'histogram':
+                lines.append(f'{full}{_labels(labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{full}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{full}_sum{_labels(labels)} {_number(value[-1])}')
+            lines.append(f'{full}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _admission_gauges(total):
+    # ledger admission sudah global (file bersama), dibaca langsung saat scrape
+    if not current_app.config.get('ADMISSION_ENABLED', True):
+        return
+    used, budget, jobs = admission.get_ledger().usage()
+    total['gauges'][_key('admission_memory_mb', {'state': 'reserved'})] = used
+    total['gauges'][_key('admission_memory_mb', {'state': 'budget'})] = budget
+    total['gauges'][_key('admission_jobs', {})] = jobs
+
+
+def _local_scrape():
+    """Request langsung dari loopback, bukan diteruskan reverse proxy (nginx juga dari 127.0.0.1)."""
+    if request.headers.get('X-Forwarded-For') or request.headers.get('X-Real-IP'):
+        return False
+    try:
+        return ipaddress.ip_address(request.remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            abort(403)
+    elif not _local_scrape():
+        # tanpa token, metrik (traffic per tool, timing, pid) hanya untuk scraper lokal
+        abort(404)
+    total = collect()
+    _admission_gauges(total)
+    return Response(render(total), mimetype='text/plain; version=0.0.4')
+
+
+# --- Instrumentasi request ---
+
+class _CountingIterable:
+    """Pembungkus body respons streaming: hitung byte yang benar-benar dikirim."""
+
+    def __init__(self, iterable, counter):
+        self.iterable = iterable
+        self.counter = counter
+
+    def __iter__(self):
+        for chunk in self.iterable:
+            self.counter[0] += len(chunk)
+            yield chunk
+
+    def close(self):
+        close = getattr(self.iterable, 'close', None)
+        if close:
+            close()
+
+
+def _before_request():
+    _start_flusher()
+    g._metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is None or request.endpoint == 'metrics':
+        return response
+    tool = current_tool()
+    method = request.method
+    view_done = time.perf_counter()
+    inc('bytes_in_total', request.content_length or 0, tool=tool)
+
+    sent = [response.content_length]
+    if sent[0] is None and not response.direct_passthrough:
+        sent[0] = 0
+        response.response = _CountingIterable(response.response, sent)
+
+    def finished():
+        end = time.perf_counter()
+        status = str(response.status_code)
+        inc('requests_total', tool=tool, method=method, status=status)
+        inc('bytes_out_total', sent[0] or 0, tool=tool)
+        observe('request_seconds', end - start, tool=tool, method=method)
+        if method == 'POST' and not response.direct_passthrough:
+            observe('phase_seconds', end - view_done, tool=tool, phase='send')
+
+    if response.direct_passthrough:
+        # send_file: werkzeug tidak memanggil call_on_close, body dikirim server (sendfile)
+        finished()
+    else:
+        response.call_on_close(finished)
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_DIR', None)
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    app.config.setdefault('METRICS_TOKEN', None)
+    if not app.config['METRICS_ENABLED']:
+        return
+    directory = app.config['METRICS_DIR'] or os.path.join(tempfile.gettempdir(), 'webtoolkit_metrics')
+    os.makedirs(directory, exist_ok=True)
+    _state.update(enabled=True, dir=directory, interval=app.config['METRICS_FLUSH_INTERVAL'])
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
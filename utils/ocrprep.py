@@ -0,0 +1,170 @@
+# utils/ocrprep.py
+"""
+Tahap pra-proses sebelum Tesseract.
+
+1. Halaman PDF di-render grayscale, dan DPI dipilih dari tinggi baris teks
+   yang diukur pada render kasar (PROBE_DPI), supaya tinggi baris di gambar
+   akhir sekitar ``target_line_px``. Teks kecil dapat DPI lebih tinggi,
+   teks besar tidak di-render lebih besar dari yang perlu.
+2. Binarisasi Otsu (OpenCV, atau NumPy jika OpenCV tidak ada).
+3. Deskew: sudut dicari dari variansi profil baris pada gambar kecil.
+4. Margin kosong dipotong.
+Gambar biner yang lebih kecil membuat Tesseract jauh lebih cepat per halaman.
+"""
+from PIL import Image
+from pdf2image import convert_from_path
+from utils.lazy import lazy_import, available
+
+np = lazy_import('numpy')
+
+# optional deps
+cv2 = lazy_import('cv2')
+CV2_AVAILABLE = available('cv2')
+
+PROBE_DPI = 72
+DEFAULT_TARGET_LINE_PX = 30  # tinggi baris teks (tinta) yang nyaman untuk Tesseract
+DEFAULT_MIN_DPI = 100
+DEFAULT_MAX_DPI = 300
+MAX_SKEW_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.25
+CROP_PADDING = 12
+
+
+def otsu_binarize(gray):
+    """Array uint8 0/255 (teks hitam di latar putih) dari array grayscale."""
+    if CV2_AVAILABLE:
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binary
+    if gray.min() == gray.max():
+        return np.full(gray.shape, 255, dtype=np.uint8)  # halaman polos
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    prob = hist / hist.sum()
+    omega = np.cumsum(prob)
+    mu = np.cumsum(prob * np.arange(256))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    threshold = int(np.nanargmax(between))
+    return np.where(gray > threshold, 255, 0).astype(np.uint8)
+
+
+def line_height(binary):
+    """Median tinggi baris teks (px) dari profil tinta per baris piksel; None jika tidak ada teks."""
+    ink = (binary == 0).sum(axis=1)
+    rows = ink > max(1, binary.shape[1] // 200)
+    edges = np.diff(rows.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    heights = stops - starts
+    heights = heights[heights >= 2]
+    return float(np.median(heights)) if len(heights) else None
+
+
+def choose_dpi(probe_binary, probe_dpi, target_line_px, min_dpi, max_dpi):
+    height = line_height(probe_binary)
+    if not height:
+        return min_dpi
+    return int(np.clip(probe_dpi * target_line_px / height, min_dpi, max_dpi))
+
+
+def _rotate(binary, angle):
+    h, w = binary.shape
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    return cv2.warpAffine(binary, matrix, (w, h), flags=cv2.INTER_NEAREST, borderValue=255)
+
+
+def estimate_skew(binary):
+    """Sudut (derajat) yang membuat baris teks paling tajam di profil horizontal."""
+    scale = min(1.0, 800.0 / max(binary.shape))
+    small = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else binary
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + 1e-9, SKEW_STEP_DEGREES):
+        profile = (_rotate(small, angle) < 128).sum(axis=1).astype(np.float64)
+        score = profile.var()
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def deskew(binary):
+    if not CV2_AVAILABLE:
+        return binary
+    angle = estimate_skew(binary)
+    return _rotate(binary, angle) if abs(angle) >= SKEW_STEP_DEGREES else binary
+
+
+def ink_box(binary):
+    """(top, bottom, left, right) area bertinta plus padding; None jika halaman kosong."""
+    ink = binary == 0
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if not len(rows):
+        return None
+    return (max(rows[0] - CROP_PADDING, 0), min(rows[-1] + CROP_PADDING + 1, binary.shape[0]),
+            max(cols[0] - CROP_PADDING, 0), min(cols[-1] + CROP_PADDING + 1, binary.shape[1]))
+
+
+def crop_margins(binary):
+    """Potong margin kosong; None jika halaman kosong sama sekali."""
+    box = ink_box(binary)
+    if box is None:
+        return None
+    top, bottom, left, right = box
+    return binary[top:bottom, left:right]
+
+
+def prepare_gray(gray):
+    """Binarisasi + deskew + crop. Return PIL 'L' siap OCR, atau None jika halaman kosong."""
+    binary = crop_margins(deskew(otsu_binarize(gray)))
+    return Image.fromarray(binary) if binary is not None else None
+
+
+def prepare_layer_source(gray):
+    """
+    Untuk text layer PDF: binarisasi + crop tanpa deskew, supaya koordinat
+    hasil OCR cukup digeser (left, top) untuk kembali ke halaman asli.
+    Return (PIL 'L', left, top) atau None jika halaman kosong.
+    """
+    binary = otsu_binarize(gray)
+    box = ink_box(binary)
+    if box is None:
+        return None
+    top, bottom, left, right = box
+    return Image.fromarray(binary[top:bottom, left:right]), left, top
+
+
+def render_pdf_page(pdf_path, page_no, poppler_path=None, target_line_px=DEFAULT_TARGET_LINE_PX,
+                    min_dpi=DEFAULT_MIN_DPI, max_dpi=DEFAULT_MAX_DPI):
+    """Render halaman `page_no` (mulai 1) grayscale dengan DPI adaptif. Return (array, dpi)."""
+    def render(dpi):
+        return convert_from_path(pdf_path, dpi=dpi, grayscale=True, poppler_path=poppler_path,
+                                 first_page=page_no, last_page=page_no)[0]
+
+    # probe di-deskew dulu: baris yang miring menyatu di profil dan terlihat terlalu tinggi
+    probe = deskew(otsu_binarize(np.asarray(render(PROBE_DPI))))
+    dpi = choose_dpi(probe, PROBE_DPI, target_line_px, min_dpi, max_dpi)
+    return np.asarray(render(dpi)), dpi
+
+
+def prepare_pdf_page(pdf_path, page_no, poppler_path=None, **options):
+    """Render adaptif lalu pra-proses untuk OCR teks. None jika halaman kosong."""
+    gray, _ = render_pdf_page(pdf_path, page_no, poppler_path=poppler_path, **options)
+    return prepare_gray(gray)
+
+
+def scale_for_ocr(img, target_line_px=DEFAULT_TARGET_LINE_PX, max_scale=2.0):
+    """Gambar upload grayscale yang diskalakan sesuai tinggi baris. Return (PIL 'L', skala)."""
+    gray = img.convert('L')
+    height = line_height(deskew(otsu_binarize(np.asarray(gray))))
+    if height:
+        scale = min(target_line_px / height, max_scale)
+        # perkecil hanya jika jauh lebih besar dari target; perbesar jika teks terlalu kecil
+        if scale < 0.75 or scale > 1.25:
+            size = (max(1, int(gray.width * scale)), max(1, int(gray.height * scale)))
+            return gray.resize(size, Image.Resampling.LANCZOS if scale > 1 else Image.Resampling.BOX), scale
+    return gray, 1.0
+
+
+def prepare_image(img, target_line_px=DEFAULT_TARGET_LINE_PX, max_scale=2.0):
+    """Pra-proses gambar upload: skala disesuaikan dengan tinggi baris, lalu prepare_gray."""
+    gray, _ = scale_for_ocr(img, target_line_px, max_scale)
+    return prepare_gray(np.asarray(gray))
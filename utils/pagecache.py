@@ -0,0 +1,163 @@
+# utils/pagecache.py
+"""
+Cache halaman hasil render untuk route GET tanpa parameter.
+
+Halaman seperti ``index``, ``about``, ``qr-generator`` dan form setiap tool
+hanya bergantung pada template, jadi cukup di-render sekali per proses worker.
+Setelah itu body yang sama dikirim dari memori dengan ``ETag`` (sha256 body)
+dan ``Last-Modified`` (mtime terbaru dari template halaman beserta template
+yang di-extend / di-include), sehingga revalidasi browser & crawler dijawab
+``304`` tanpa body.
+
+Yang di-cache hanya respons 200 ``text/html`` / ``application/xml`` tanpa
+cookie; respons lain (mis. ``robots.txt`` dari file, ``/metrics``) tetap lewat
+view aslinya. Saat debug / TEMPLATES_AUTO_RELOAD, mtime template dicek ulang
+setiap request; di produksi template dianggap tetap sampai worker restart.
+"""
+import functools
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+from flask import Response, current_app, make_response, request, template_rendered
+from jinja2 import meta
+
+from utils import metrics
+
+CACHEABLE_MIMETYPES = ('text/html', 'application/xml')
+DEFAULT_MAX_AGE = 300  # detik; setelah itu browser merevalidasi (304)
+NON_PAGE_ENDPOINTS = ('static', 'metrics')
+
+_lock = threading.Lock()
+_pages = {}  # endpoint -> Page
+_uncacheable = set()  # endpoint yang responsnya bukan halaman (mis. robots.txt dari file)
+_capture = threading.local()
+
+
+class Page:
+    def __init__(self, body, content_type, templates):
+        self.body = body
+        self.content_type = content_type
+        self.templates = templates  # path file template -> mtime saat di-render
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        newest = max(templates.values(), default=0)
+        self.last_modified = datetime.fromtimestamp(int(newest), tz=timezone.utc) if newest else None
+
+    def stale(self):
+        for path, mtime in self.templates.items():
+            try:
+                if os.path.getmtime(path) != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+def _template_files(env, name, seen=None):
+    """Path file `name` dan semua template yang di-extend / di-include olehnya."""
+    seen = {} if seen is None else seen
+    try:
+        source, filename, _ = env.loader.get_source(env, name)
+    except Exception:
+        return seen
+    if filename in seen:
+        return seen
+    seen[filename] = os.path.getmtime(filename)
+    for ref in meta.find_referenced_templates(env.parse(source)):
+        if ref:
+            _template_files(env, ref, seen)
+    return seen
+
+
+def _record(sender, template, context, **extra):
+    # dipanggil untuk template level atas; render bersarang (sitemap) ikut dicatat ke semua level
+    for names in getattr(_capture, 'stack', ()):
+        names.add(template.name)
+
+
+def _render(view, args, kwargs):
+    stack = _capture.__dict__.setdefault('stack', [])
+    names = set()
+    stack.append(names)
+    try:
+        response = make_response(view(*args, **kwargs))
+    finally:
+        stack.pop()
+    return response, names
+
+
+def _cacheable(response):
+    return (response.status_code == 200 and not response.direct_passthrough and not response.is_streamed
+            and response.mimetype in CACHEABLE_MIMETYPES and 'Set-Cookie' not in response.headers)
+
+
+def _respond(page, cfg):
+    response = Response(page.body, content_type=page.content_type)
+    response.set_etag(page.etag)
+    if page.last_modified:
+        response.last_modified = page.last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = cfg.get('PAGE_CACHE_MAX_AGE', DEFAULT_MAX_AGE)
+    return response.make_conditional(request)
+
+
+def _cached(endpoint, view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if endpoint in _uncacheable:
+            return view(*args, **kwargs)
+        app = current_app._get_current_object()
+        page = _pages.get(endpoint)
+        if page is not None and (app.debug or app.config.get('TEMPLATES_AUTO_RELOAD')) and page.stale():
+            page = None
+        metrics.cache('page', page is not None)
+        if page is None:
+            response, names = _render(view, args, kwargs)
+            if not _cacheable(response):
+                if response.status_code == 200:
+                    _uncacheable.add(endpoint)
+                return response
+            templates = {}
+            for name in names:
+                _template_files(app.jinja_env, name, templates)
+            page = Page(response.get_data(), response.content_type, templates)
+            with _lock:
+                _pages[endpoint] = page
+        return _respond(page, app.config)
+    return wrapper
+
+
+def page_endpoints(app, exclude=()):
+    """(path, endpoint) semua route GET tanpa parameter, '/' dulu lalu urut path."""
+    pages = []
+    for rule in app.url_map.iter_rules():
+        if rule.arguments or 'GET' not in rule.methods or rule.endpoint in NON_PAGE_ENDPOINTS + tuple(exclude):
+            continue
+        pages.append((rule.rule, rule.endpoint))
+    return sorted(pages, key=lambda p: (p[0] != '/', p[0]))
+
+
+def last_modified(app, path, endpoint):
+    """Last-Modified halaman `endpoint` (di-render sekali lewat cache jika belum ada)."""
+    page = _pages.get(endpoint)
+    if page is None:
+        with app.test_request_context(path):
+            app.make_response(app.view_functions[endpoint]()).close()
+        page = _pages.get(endpoint)
+    return page.last_modified if page else None
+
+
+def init_app(app):
+    """Bungkus semua view GET tanpa parameter; dipanggil setelah semua route terdaftar."""
+    app.config.setdefault('PAGE_CACHE_ENABLED', True)
+    app.config.setdefault('PAGE_CACHE_MAX_AGE', DEFAULT_MAX_AGE)
+    if not app.config['PAGE_CACHE_ENABLED']:
+        return
+    template_rendered.connect(_record, app)
+    for path, endpoint in page_endpoints(app):
+        view = app.view_functions[endpoint]
+        if not getattr(view, '_page_cached', False):
+            wrapper = _cached(endpoint, view)
+            wrapper._page_cached = True
+            app.view_functions[endpoint] = wrapper
@@ -0,0 +1,98 @@
+# utils/pdfdocx.py
+"""
+Layanan konversi PDF -> DOCX di atas pdf2docx.
+
+PDF dipecah menjadi rentang halaman (PDFTODOCX_CHUNK_PAGES) yang di-parse
+paralel di process pool bersama per worker (``utils.pools.process_pool``,
+ukuran PROCESS_POOL_WORKERS). Setiap worker menyimpan hasil parse rentangnya
+sebagai JSON (format serialize pdf2docx) di direktori sementara milik job
+ini, lalu proses induk menggabungkan semuanya dan membuat satu DOCX. Dibanding
+``Converter.convert(multi_processing=True)``, file JSON tidak lagi ditulis
+ke current directory (bentrok antar request), dan progres bisa dilaporkan
+per rentang selesai.
+"""
+import logging
+import os
+import tempfile
+from concurrent.futures import as_completed, wait
+
+from utils.lazy import lazy_import
+from utils.pools import process_pool, process_pool_size
+
+pdf2docx = lazy_import('pdf2docx')  # ikut memuat PyMuPDF, cukup berat untuk startup
+
+DEFAULT_CHUNK_PAGES = 10  # rentang terlalu kecil melemahkan deteksi header/footer pdf2docx
+
+
+def _parse_range(job):
+    """Worker: parse halaman [start, stop) lalu serialize ke `json_path`."""
+    pdf_path, start, stop, json_path = job
+    cv = pdf2docx.Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(start, stop).parse_document(**settings).parse_pages(**settings).serialize(json_path)
+    finally:
+        cv.close()
+    return stop - start
+
+
+def _parse_inline(cv, settings, progress):
+    """Satu proses: parse halaman satu per satu supaya progres per halaman."""
+    cv.load_pages().parse_document(**settings)
+    for done, page in enumerate(cv.pages, start=1):
+        try:
+            page.parse(**settings)
+        except Exception as e:
+            if not settings['ignore_page_error']:
+                raise
+            logging.error('Halaman %d dilewati karena gagal di-parse: %s', page.id + 1, e)
+        progress(done)
+
+
+def _parse_parallel(cv, settings, pdf_path, page_count, workers, chunk_pages, progress):
+    ranges = [(start, min(start + chunk_pages, page_count)) for start in range(0, page_count, chunk_pages)]
+    with tempfile.TemporaryDirectory(prefix='pdf2docx_') as tmp_dir:
+        jobs = [(pdf_path, start, stop, os.path.join(tmp_dir, f'{start}.json')) for start, stop in ranges]
+        done = 0
+        pool = process_pool(workers)
+        futures = [pool.submit(_parse_range, job) for job in jobs]
+        try:
+            for future in as_completed(futures):
+                done += future.result()
+                progress(done)
+        finally:
+            # pool dipakai bersama: saat error, rentang yang belum jalan dibatalkan dan
+            # yang sedang jalan ditunggu sebelum direktori sementaranya dihapus
+            for future in futures:
+                future.cancel()
+            wait(futures)
+        # gabungkan hasil semua rentang ke satu Converter (urutan halaman dari id halaman)
+        for _, _, _, json_path in jobs:
+            cv.deserialize(json_path)
+
+
+def convert_pdf_to_docx(pdf_path, out, workers=None, chunk_pages=None, progress=None):
+    """
+    Konversi `pdf_path` ke DOCX dan tulis ke `out` (path atau file-like).
+    `progress(halaman_selesai, total)` dipanggil setiap ada halaman selesai di-parse.
+    """
+    pool_size = process_pool_size(workers)
+    workers = min(workers or pool_size, pool_size)
+    chunk_pages = chunk_pages or DEFAULT_CHUNK_PAGES
+    cv = pdf2docx.Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        page_count = len(cv.fitz_doc)
+
+        def report(done):
+            if progress:
+                progress(done, page_count)
+
+        report(0)
+        if workers == 1 or page_count <= chunk_pages:
+            _parse_inline(cv, settings, report)
+        else:
+            _parse_parallel(cv, settings, pdf_path, page_count, workers, chunk_pages, report)
+        cv.make_docx(out, **settings)
+    finally:
+        cv.close()
@@ -0,0 +1,118 @@
+# utils/pdfstream.py
+"""
+Writer PDF gambar yang menulis halaman demi halaman.
+
+Setiap halaman berisi satu gambar, JPEG apa adanya (DCTDecode) atau piksel
+mentah terkompresi zlib (FlateDecode, lossless), yang langsung ditulis ke
+`fp` lalu dilupakan; yang disimpan hanya offset objek untuk tabel xref.
+Objek /Pages ditulis paling akhir, jadi jumlah halaman tidak perlu diketahui
+di awal dan `fp` tidak perlu seekable (cukup punya ``write``).
+Ukuran halaman mengikuti `resolution` (dpi) seperti ``Image.save(..., 'PDF')``.
+"""
+import shutil
+import zlib
+
+COLORSPACES = {'RGB': b'/DeviceRGB', 'L': b'/DeviceGray'}
+
+
+class ImagePdfWriter:
+    def __init__(self, fp, resolution=100.0):
+        self.fp = fp
+        self.resolution = resolution
+        self._pos = 0
+        self._offsets = {}
+        self._kids = []
+        self._next_id = 3  # 1 = Catalog, 2 = Pages
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._begin(1)
+        self._write(b'<< /Type /Catalog /Pages 2 0 R >>\nendobj\n')
+
+    @property
+    def page_count(self):
+        return len(self._kids)
+
+    def _write(self, data):
+        self.fp.write(data)
+        self._pos += len(data)
+
+    def _begin(self, obj_id):
+        self._offsets[obj_id] = self._pos
+        self._write(b'%d 0 obj\n' % obj_id)
+
+    def _new_id(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_jpeg(self, src, width, height, mode='RGB', length=None):
+        """
+        Tambah satu halaman berisi JPEG apa adanya (tanpa decode / encode ulang).
+        `src` boleh bytes atau file-like (disalin per chunk; `length` wajib diisi).
+        """
+        if mode not in COLORSPACES:
+            raise ValueError(f"Mode JPEG tidak didukung untuk PDF: {mode}")
+        if isinstance(src, (bytes, bytearray, memoryview)):
+            length = len(src)
+
+        image_id = self._new_id()
+        self._begin(image_id)
+        self._write(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+            b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n'
+            % (width, height, COLORSPACES[mode], length)
+        )
+        if isinstance(src, (bytes, bytearray, memoryview)):
+            self._write(bytes(src))
+        else:
+            shutil.copyfileobj(src, self.fp)
+            self._pos += length
+        self._write(b'\nendstream\nendobj\n')
+        self._add_page(image_id, width, height)
+
+    def add_image(self, img):
+        """Tambah satu halaman dari PIL Image tanpa kompresi lossy (untuk PNG/TIFF hasil scan)."""
+        if img.mode not in COLORSPACES:
+            img = img.convert('L' if img.mode in ('1', 'LA', 'I', 'I;16', 'F') else 'RGB')
+        data = zlib.compress(img.tobytes(), 6)
+
+        image_id = self._new_id()
+        self._begin(image_id)
+        self._write(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+            b'/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n'
+            % (img.width, img.height, COLORSPACES[img.mode], len(data))
+        )
+        self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+        self._add_page(image_id, img.width, img.height)
+
+    def _add_page(self, image_id, width, height):
+        # ukuran halaman dalam point (1/72 inch) pada resolusi yang diminta
+        page_w = width * 72.0 / self.resolution
+        page_h = height * 72.0 / self.resolution
+        content = b'q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q' % (page_w, page_h)
+        content_id = self._new_id()
+        self._begin(content_id)
+        self._write(b'<< /Length %d >>\nstream\n%s\nendstream\nendobj\n' % (len(content), content))
+
+        page_id = self._new_id()
+        self._begin(page_id)
+        self._write(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f] '
+            b'/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>\nendobj\n'
+            % (page_w, page_h, image_id, content_id)
+        )
+        self._kids.append(page_id)
+
+    def close(self):
+        """Tulis /Pages, xref dan trailer. Wajib dipanggil sekali setelah halaman terakhir."""
+        self._begin(2)
+        kids = b' '.join(b'%d 0 R' % k for k in self._kids)
+        self._write(b'<< /Type /Pages /Kids [%s] /Count %d >>\nendobj\n' % (kids, len(self._kids)))
+
+        xref_pos = self._pos
+        size = self._next_id
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        for obj_id in range(1, size):
+            self._write(b'%010d 00000 n \n' % self._offsets[obj_id])
+        self._write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (size, xref_pos))
@@ -0,0 +1,5 @@
+# utils/pdftables/__init__.py
+"""Ekstraksi tabel PDF untuk pdf-to-xlsx."""
+from .engine import extract_tables
+from .text import extract_text_rows
+from .writer import write_tables
@@ -0,0 +1,123 @@
+# utils/pdftables/engine.py
+"""
+Ekstraksi tabel pdfplumber yang paralel per halaman.
+
+Halaman dibagi menjadi beberapa rentang dan setiap rentang dikerjakan oleh
+proses di pool bersama (``utils.pools.process_pool``), masing-masing dengan
+handle pdfplumber sendiri. Hasil
+digabung kembali sesuai urutan halaman. Halaman tanpa garis (lines / rects /
+curves) atau tanpa karakter dilewati sebelum table finder dijalankan, karena
+strategi 'lines' pasti tidak menemukan tabel di sana. Cek pertama dilakukan
+langsung pada content stream (tanpa layout pdfminer), sehingga halaman teks
+biasa hampir tidak memakan biaya.
+"""
+import re
+
+from utils.lazy import lazy_import
+from utils.pools import process_pool, process_pool_size
+
+pdfplumber = lazy_import('pdfplumber')
+pdftypes = lazy_import('pdfminer.pdftypes')
+
+# di bawah jumlah halaman ini biaya start proses lebih mahal daripada kerjanya
+MIN_PAGES_FOR_POOL = 8
+CHUNKS_PER_WORKER = 4
+
+
+# operator yang melukis path (S s f F f* B B* b b*) atau menggambar XObject (Do)
+_PAINT_OPS = re.compile(rb'(?:^|\s)(?:[SsFf]|f\*|[Bb]\*?|Do)(?=\s|$)')
+
+
+def content_has_paths(page):
+    """
+    Cek sangat murah pada content stream mentah: False hanya jika halaman pasti
+    tidak melukis garis apa pun. Form XObject (Do) dianggap mungkin berisi garis.
+    """
+    try:
+        for ref in page.page_obj.contents:
+            if _PAINT_OPS.search(pdftypes.resolve1(ref).get_data()):
+                return True
+        return False
+    except Exception:
+        return True
+
+
+def page_may_have_tables(page):
+    """Perlu garis (ruling) dan teks; content stream dicek dulu sebelum layout di-parse."""
+    if not content_has_paths(page):
+        return False
+    if not page.chars:
+        return False
+    return bool(page.lines or page.rects or page.curves)
+
+
+def _tables_on_page(page, prefer_stream):
+    table_settings = {'vertical_strategy': 'text'} if prefer_stream else {}
+    tables = page.extract_tables(table_settings)
+    if not tables:
+        try:
+            tbl = page.extract_table()
+            if tbl:
+                tables = [tbl]
+        except Exception:
+            tables = []
+    return tables
+
+
+def _page_tables(page, prefer_stream):
+    if not page_may_have_tables(page):
+        return None
+    return _tables_on_page(page, prefer_stream) or None
+
+
+def _run_range(job):
+    """Worker: jalankan `page_fn` untuk halaman [start, stop) -> [(nomor_halaman, hasil), ...]."""
+    pdf_path, start, stop, page_fn, args = job
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for index in range(start, stop):
+            page = pdf.pages[index]
+            try:
+                result = page_fn(page, *args)
+                if result is not None:
+                    results.append((index + 1, result))
+            finally:
+                page.close()  # buang cache objek halaman; memori tetap O(1 halaman)
+    return results
+
+
+def _page_ranges(page_count, workers):
+    chunk = max(1, -(-page_count // (workers * CHUNKS_PER_WORKER)))
+    return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+
+def map_pages(pdf_path, page_fn, args=(), workers=None):
+    """
+    Jalankan `page_fn(page, *args)` untuk setiap halaman, paralel per rentang
+    halaman. `page_fn` harus fungsi level modul (di-pickle ke worker).
+    `workers` dibatasi ukuran process pool bersama.
+    Return [(nomor_halaman, hasil), ...] berurutan; hasil None dibuang.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    pool_size = process_pool_size(workers)
+    workers = min(workers or pool_size, pool_size)
+    jobs = [(pdf_path, start, stop, page_fn, args) for start, stop in _page_ranges(page_count, workers)]
+
+    if workers == 1 or page_count < MIN_PAGES_FOR_POOL:
+        chunks = map(_run_range, jobs)
+    else:
+        chunks = list(process_pool(workers).map(_run_range, jobs))
+    return [item for chunk in chunks for item in chunk]
+
+
+def extract_tables(pdf_path, prefer_stream=False, workers=None):
+    """
+    Semua tabel di `pdf_path` sebagai list (nomor_halaman, indeks_tabel, baris),
+    berurutan per halaman. `workers` None = ukuran process pool bersama.
+    """
+    tables_out = []
+    for page_no, tables in map_pages(pdf_path, _page_tables, (prefer_stream,), workers):
+        for t_index, table in enumerate(tables, start=1):
+            tables_out.append((page_no, t_index, table))
+    return tables_out
@@ -0,0 +1,93 @@
+# utils/pdftables/text.py
+"""
+Fallback teks -> tabel berdasarkan posisi kata, bukan spasi di teks.
+
+Per halaman:
+1. kata (``extract_words``) dikelompokkan menjadi baris dari koordinat `top`;
+2. baris yang punya jarak antar kata >= ``MIN_GAP_CHARS`` lebar karakter
+   dianggap baris tabel (setara dengan split regex ``\\s{2,}`` sebelumnya);
+3. histogram okupansi sumbu x dari kata-kata baris tabel dihitung dengan
+   NumPy; rentang kosong selebar >= celah minimum menjadi batas kolom;
+4. setiap kata dipetakan ke kolom sekaligus dengan ``np.searchsorted``.
+Baris biasa (prosa) tetap satu sel di kolom pertama.
+"""
+from utils.lazy import lazy_import
+
+from .engine import map_pages
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+LINE_TOLERANCE = 3.0  # selisih `top` (pt) yang masih dianggap satu baris
+MIN_GAP_CHARS = 1.0   # celah kolom minimum, dalam kelipatan median lebar karakter
+
+
+def _column_boundaries(x0, x1, min_gap):
+    """Batas kolom (titik tengah celah kosong) dari histogram okupansi x per 1 pt."""
+    origin = np.floor(x0.min())
+    start = (np.floor(x0) - origin).astype(np.int64)
+    stop = (np.ceil(x1) - origin).astype(np.int64)
+    occupancy = np.zeros(stop.max() + 1, dtype=np.int64)
+    np.add.at(occupancy, start, 1)
+    np.add.at(occupancy, stop, -1)
+    empty = np.cumsum(occupancy)[:-1] == 0
+
+    # rentang kosong berurutan: awal di transisi terisi->kosong, akhir di kosong->terisi
+    edges = np.diff(empty.astype(np.int8))
+    gap_start = np.flatnonzero(edges == 1) + 1
+    gap_stop = np.flatnonzero(edges == -1) + 1
+    wide = (gap_stop - gap_start) >= min_gap
+    return origin + (gap_start[wide] + gap_stop[wide]) / 2.0
+
+
+def page_text_rows(page):
+    """Grid sel (array object baris x kolom) untuk satu halaman, None jika halaman kosong."""
+    words = page.extract_words()
+    if not words:
+        return None
+    text = np.array([w['text'] for w in words], dtype=object)
+    x0 = np.fromiter((w['x0'] for w in words), dtype=np.float64, count=len(words))
+    x1 = np.fromiter((w['x1'] for w in words), dtype=np.float64, count=len(words))
+    top = np.fromiter((w['top'] for w in words), dtype=np.float64, count=len(words))
+
+    # 1. nomor baris: baris baru setiap `top` melompat lebih dari toleransi,
+    #    lalu urutkan per baris menurut x (top dalam satu baris bisa sedikit berbeda)
+    order = np.lexsort((x0, top))
+    top = top[order]
+    line = np.concatenate(([0], np.cumsum(np.diff(top) > LINE_TOLERANCE)))
+    order = order[np.lexsort((x0[order], line))]
+    text, x0, x1 = text[order], x0[order], x1[order]
+
+    # 2. baris tabel: ada celah antar kata yang cukup lebar
+    lengths = np.fromiter((len(t) for t in text), dtype=np.float64, count=len(text))
+    char_width = np.median((x1 - x0) / lengths)
+    min_gap = max(MIN_GAP_CHARS * char_width, 1.0)
+    same_line = line[1:] == line[:-1]
+    wide_gap = same_line & ((x0[1:] - x1[:-1]) >= min_gap)
+    tabular = np.isin(line, line[1:][wide_gap])
+
+    # 3 & 4. kolom dari histogram kata-kata baris tabel, lalu assign sekaligus
+    column = np.zeros(len(text), dtype=np.int64)
+    if tabular.any():
+        boundaries = _column_boundaries(x0[tabular], x1[tabular], min_gap)
+        column[tabular] = np.searchsorted(boundaries, (x0[tabular] + x1[tabular]) / 2.0)
+
+    # kata sudah urut (baris, x) sehingga satu sel = satu run (baris, kolom) yang sama
+    starts = np.flatnonzero(np.concatenate(([True], (line[1:] != line[:-1]) | (column[1:] != column[:-1]))))
+    ends = np.append(starts[1:], len(text))
+    _, row_index = np.unique(line[starts], return_inverse=True)
+    grid = np.full((row_index.max() + 1, column.max() + 1), '', dtype=object)
+    grid[row_index, column[starts]] = [' '.join(text[a:b]) for a, b in zip(starts, ends)]
+    return grid
+
+
+def extract_text_rows(pdf_path, workers=None):
+    """Semua baris teks PDF sebagai DataFrame kolom 0..n (sel kosong = '')."""
+    grids = [grid for _, grid in map_pages(pdf_path, page_text_rows, workers=workers)]
+    max_cols = max((g.shape[1] for g in grids), default=1)
+    out = np.full((sum(g.shape[0] for g in grids), max_cols), '', dtype=object)
+    row = 0
+    for grid in grids:
+        out[row:row + grid.shape[0], :grid.shape[1]] = grid
+        row += grid.shape[0]
+    return pd.DataFrame(out)
@@ -0,0 +1,143 @@
+# utils/pdftables/writer.py
+"""
+Penulis xlsx streaming untuk hasil ekstraksi tabel.
+
+Memakai xlsxwriter mode ``constant_memory`` (setiap baris langsung di-flush ke
+file sementara per sheet); jika xlsxwriter tidak terpasang, jatuh ke openpyxl
+mode write-only. Keduanya tidak membangun object model workbook di memori
+seperti ``pd.ExcelWriter(engine='openpyxl')``.
+
+Semantik sama dengan penulisan lewat pandas sebelumnya (``pd.concat`` lalu
+``to_excel``): baris pertama berisi nama kolom, ``merge`` menggabungkan semua
+tabel ke 'Sheet1' — ditumpuk apa adanya jika kolom semua tabel identik (boleh
+ada nama ganda / kosong), selain itu dengan union kolom (urutan kemunculan
+pertama). Jika union tidak terdefinisi (ada nama kolom ganda dan kolom antar
+tabel berbeda), setiap tabel ditulis ke sheet sendiri.
+"""
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - tergantung environment
+    xlsxwriter = None
+
+MAX_ROWS = 1048576  # batas baris per sheet Excel
+SHEET_NAME_LEN = 30
+MAX_SHEET_NAME_LEN = 31  # batas Excel
+
+
+class _XlsxWriterBook:
+    def __init__(self, fp):
+        self.book = xlsxwriter.Workbook(fp, {
+            'constant_memory': True,
+            'strings_to_numbers': False,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        self.sheetnames = []
+
+    def add_sheet(self, name):
+        self.sheetnames.append(name)
+        sheet = self.book.add_worksheet(name)
+        row_index = iter(range(MAX_ROWS))
+
+        def append(values):
+            try:
+                sheet.write_row(next(row_index), 0, values)
+            except StopIteration:
+                raise ValueError(f"Sheet '{name}' melebihi {MAX_ROWS} baris.")
+        return append
+
+    def close(self):
+        self.book.close()
+
+
+class _OpenpyxlBook:
+    def __init__(self, fp):
+        from openpyxl import Workbook
+        self.fp = fp
+        self.book = Workbook(write_only=True)
+        self.sheetnames = []
+
+    def add_sheet(self, name):
+        self.sheetnames.append(name)
+        sheet = self.book.create_sheet(name)
+        return sheet.append
+
+    def close(self):
+        self.book.save(self.fp)
+
+
+def _open_book(fp):
+    return _XlsxWriterBook(fp) if xlsxwriter is not None else _OpenpyxlBook(fp)
+
+
+def _cell(value):
+    # NaN hasil union kolom / None dari pdfplumber -> sel kosong
+    return None if value is None or value != value else value
+
+
+def _rows(df):
+    for row in df.itertuples(index=False, name=None):
+        yield [_cell(v) for v in row]
+
+
+def _write_table(append, columns, df):
+    append(list(columns))
+    for row in _rows(df):
+        append(row)
+
+
+def _unique_name(book, name):
+    safe_name = name[:SHEET_NAME_LEN]
+    alt = safe_name
+    counter = 1
+    while alt in book.sheetnames:
+        suffix = f"_{counter}"
+        # Excel menolak nama sheet > 31 karakter (xlsxwriter melempar error)
+        alt = safe_name[:MAX_SHEET_NAME_LEN - len(suffix)] + suffix
+        counter += 1
+    return alt
+
+
+def _mergeable(tables):
+    """Syarat yang sama dengan ``pd.concat``: kolom semua tabel identik, atau semuanya unik."""
+    columns = tables[0][1].columns
+    return (all(df.columns.equals(columns) for _, df in tables)
+            or all(df.columns.is_unique for _, df in tables))
+
+
+def _write_merged(book, tables):
+    """Semua tabel ke 'Sheet1'; kolom tabel dipetakan ke posisi di union kolom."""
+    columns = tables[0][1].columns
+    if all(df.columns.equals(columns) for _, df in tables):
+        # kolom identik (termasuk satu tabel dengan nama kolom ganda): tumpuk apa adanya
+        append = book.add_sheet('Sheet1')
+        append(list(columns))
+        for _, df in tables:
+            for row in _rows(df):
+                append(row)
+        return
+    union = {}
+    for _, df in tables:
+        for col in df.columns:
+            union.setdefault(col, len(union))
+    append = book.add_sheet('Sheet1')
+    append(list(union))
+    width = len(union)
+    for _, df in tables:
+        positions = [union[col] for col in df.columns]
+        for values in _rows(df):
+            row = [None] * width
+            for pos, value in zip(positions, values):
+                row[pos] = value
+            append(row)
+
+
+def write_tables(tables, fp, merge=True):
+    """Tulis list (nama_sheet, DataFrame) ke `fp` sebagai xlsx."""
+    book = _open_book(fp)
+    if merge and tables and _mergeable(tables):
+        _write_merged(book, tables)
+    else:
+        for name, df in tables:
+            _write_table(book.add_sheet(_unique_name(book, name)), df.columns, df)
+    book.close()
@@ -0,0 +1,223 @@
+# utils/pools.py
+"""
+Pool eksekusi per tool untuk route berat (AI, LibreOffice, OCR, PDF).
+
+Worker gunicorn berjalan dengan banyak thread (gthread, lihat gunicorn.conf.py).
+Halaman, static dan endpoint ringan langsung dilayani thread request ("jalur
+cepat"); view POST milik blueprint yang terdaftar di TOOL_POOLS dijalankan di
+ThreadPoolExecutor milik pool-nya. Setiap pool punya batas konkurensi sendiri,
+sehingga lonjakan upload ke satu tool tidak menghabiskan thread / CPU / memori
+yang dibutuhkan page view dan tool lain.
+
+Konkurensi pool = min(max_workers, memory_mb // job_memory_mb): anggaran memori
+dinyatakan sebagai perkiraan puncak memori per job. Request yang datang saat
+pool penuh menunggu di antrian executor (paling banyak max_queue); jika
+antrian juga penuh, request langsung ditolak 503 + Retry-After, tidak
+menunggu sampai timeout gunicorn. Semua batas berlaku per proses worker
+gunicorn.
+
+View streaming hanya bagian view-nya yang jalan di pool; generator respons
+berjalan di thread request. Slot pool-nya baru dilepas saat respons ditutup
+(selesai atau klien putus), dan kerja berat per item di generator dikirim ke
+executor pool yang sama lewat ``stream_jobs()``, sehingga batas konkurensi dan
+antrian tetap berlaku selama streaming.
+
+Kerja CPU-bound yang butuh proses terpisah (ekstraksi tabel pdfplumber, parse
+pdf2docx) memakai satu ``process_pool()`` bersama per proses worker, bukan
+ProcessPoolExecutor baru per request. Ukurannya tetap (PROCESS_POOL_WORKERS),
+berapa pun slot pool tool yang sedang jalan, dan prosesnya dibuat lewat
+forkserver: fork langsung dari worker gthread yang punya banyak thread bisa
+deadlock (lock milik thread lain ikut tersalin dalam keadaan terkunci).
+"""
+import contextlib
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.wrappers import Response
+
+from utils import metrics
+
+DEFAULT_POOL = {
+    'max_workers': 2,
+    'max_queue': 8,
+    'retry_after': 30,  # detik, header Retry-After saat 503
+    'memory_mb': None,  # None = tanpa anggaran memori
+    'job_memory_mb': None,
+}
+BUSY_MESSAGE = "Server sedang sibuk memproses file lain. Silakan coba lagi sebentar lagi."
+PROCESS_START_METHOD = 'forkserver'
+
+_process_pool = {'executor': None, 'pid': None}
+_process_lock = threading.Lock()
+
+
+class ToolPool:
+    def __init__(self, name, max_workers, max_queue, retry_after, memory_mb=None, job_memory_mb=None):
+        self.name = name
+        if memory_mb and job_memory_mb:
+            max_workers = min(max_workers, max(1, memory_mb // job_memory_mb))
+        self.max_workers = max_workers
+        self.retry_after = retry_after
+        # slot = job yang sedang jalan + yang antri di executor
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        # executor dibuat di proses yang memakainya: thread tidak ikut ter-fork dari master gunicorn
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f'pool-{self.name}')
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn, *args, **kwargs):
+        """Jalankan `fn` di pool dan tunggu hasilnya; 503 jika pool dan antriannya penuh."""
+        if not self._slots.acquire(blocking=False):
+            metrics.inc('pool_rejected_total', pool=self.name)
+            raise ServiceUnavailable(BUSY_MESSAGE, retry_after=self.retry_after)
+        metrics.add_gauge('pool_jobs', 1, pool=self.name, state='queued')
+        release = True
+        try:
+            # context Flask (request, g, current_app) ikut dibawa; thread request menunggu, jadi tidak dipakai bersamaan
+            ctx = contextvars.copy_context()
+            result = self._get_executor().submit(ctx.run, self._timed, time.perf_counter(), fn, *args, **kwargs).result()
+            if isinstance(result, Response) and result.is_streamed:
+                # generator masih akan jalan: slot dipegang sampai respons ditutup
+                result.call_on_close(self._slots.release)
+                release = False
+            return result
+        finally:
+            if release:
+                self._slots.release()
+
+    def _timed(self, queued_at, fn, *args, **kwargs):
+        metrics.observe('phase_seconds', time.perf_counter() - queued_at, tool=metrics.current_tool(), phase='queue')
+        metrics.add_gauge('pool_jobs', -1, pool=self.name, state='queued')
+        metrics.add_gauge('pool_jobs', 1, pool=self.name, state='running')
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.add_gauge('pool_jobs', -1, pool=self.name, state='running')
+
+
+class _StreamJobs:
+    """Executor pool yang mencatat future-nya, supaya bisa dibatalkan/ditunggu saat generator berhenti."""
+
+    def __init__(self, executor):
+        self._executor = executor
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = self._executor.submit(fn, *args, **kwargs)
+        self.futures.append(future)
+        return future
+
+
+@contextlib.contextmanager
+def stream_jobs(workers):
+    """
+    (executor, workers) untuk kerja per item di generator respons streaming.
+    Di request yang view-nya jalan di pool tool, job dikirim ke executor pool
+    itu (dibagi dengan job lain di pool) dan `workers` dibatasi max_workers-nya;
+    di luar TOOL_POOLS dipakai ThreadPoolExecutor sendiri. Saat keluar (selesai,
+    error, klien putus) job yang belum jalan dibatalkan dan yang sedang jalan
+    ditunggu, jadi sumber data job aman ditutup sesudahnya. Hanya untuk dipanggil
+    dari thread request (generator), bukan dari view yang sedang jalan di pool.
+    """
+    pool = g.get('_tool_pool') if has_request_context() else None
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield executor, workers
+        return
+    jobs = _StreamJobs(pool._get_executor())
+    try:
+        yield jobs, min(workers, pool.max_workers)
+    finally:
+        for future in jobs.futures:
+            future.cancel()
+        wait(jobs.futures)
+
+
+def default_process_workers():
+    """Core dibagi rata ke semua worker gunicorn (GUNICORN_WORKERS), minimal 1 proses."""
+    cpus = os.cpu_count() or 1
+    return max(1, cpus // max(1, int(os.environ.get('GUNICORN_WORKERS', cpus))))
+
+
+def process_pool_size(requested=None):
+    """
+    Jumlah proses pool bersama. Di dalam app = PROCESS_POOL_WORKERS (None =
+    ``default_process_workers()``); di luar app (benchmark, skrip) = `requested`
+    atau jumlah core.
+    """
+    if has_app_context():
+        return current_app.config.get('PROCESS_POOL_WORKERS') or default_process_workers()
+    return requested or os.cpu_count() or 1
+
+
+def process_pool(requested=None):
+    """
+    ProcessPoolExecutor bersama milik proses ini, dibuat saat pertama dipakai.
+    Job dari banyak request antri di pool yang sama, jadi jumlah proses anak per
+    worker tidak pernah melebihi ``process_pool_size()``.
+    """
+    with _process_lock:
+        executor = _process_pool['executor']
+        # pool rusak (proses anak mati, mis. OOM) tidak bisa dipakai lagi: buat baru
+        if executor is None or _process_pool['pid'] != os.getpid() or getattr(executor, '_broken', False):
+            executor = ProcessPoolExecutor(
+                max_workers=process_pool_size(requested),
+                mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+            )
+            _process_pool.update(executor=executor, pid=os.getpid())
+        return executor
+
+
+def _pooled(pool, view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # body upload dibaca di thread request: klien lambat tidak menahan slot pool
+        request.files
+        g._tool_pool = pool  # untuk stream_jobs() di generator respons
+        return pool.run(view, *args, **kwargs)
+    return wrapper
+
+
+def init_app(app):
+    """
+    Bungkus view POST dari blueprint yang ada di TOOL_POOLS. Dipanggil setelah
+    semua blueprint terdaftar. Format config:
+    ``{'nama_pool': {'blueprints': [...], 'max_workers': 2, 'max_queue': 8, ...}}``.
+    """
+    pools = {}
+    for name, options in app.config.get('TOOL_POOLS', {}).items():
+        options = dict(DEFAULT_POOL, **options)
+        blueprints = options.pop('blueprints', [])
+        pool = ToolPool(name, **options)
+        pools[name] = pool
+        for bp_name in blueprints:
+            for rule in app.url_map.iter_rules():
+                if rule.endpoint.startswith(bp_name + '.') and 'POST' in rule.methods:
+                    view = app.view_functions[rule.endpoint]
+                    if not getattr(view, '_tool_pool', None):
+                        app.view_functions[rule.endpoint] = wrapper = _pooled(pool, view)
+                        wrapper._tool_pool = name
+    app.extensions['tool_pools'] = pools
+
+    @app.errorhandler(ServiceUnavailable)
+    def service_unavailable(error):
+        # teks polos: frontend menampilkan isi respons error apa adanya
+        response = error.get_response()
+        response.set_data(error.description)
+        response.mimetype = 'text/plain'
+        return response
+    return pools
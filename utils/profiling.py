@@ -0,0 +1,251 @@
+# utils/profiling.py
+"""
+Profiling on-demand untuk request produksi.
+
+Satu request di-profile jika membawa salah satu header:
+- ``X-Profile-Token: <PROFILE_TOKEN>`` (token admin), atau
+- ``X-Profile-Signature: <unix_ts>:<hex>`` dengan hex =
+  HMAC-SHA256(PROFILE_SECRET, ``"<unix_ts>:<METHOD>:<path>"``), berlaku
+  PROFILE_SIGNATURE_TTL detik. Buat dengan ``flask --app app profile-sign PATH``.
+
+``X-Profile-Mode`` memilih ``cprofile`` (default, file ``.pstats``, buka dengan
+``python -m pstats`` / snakeviz) atau ``sample`` (stack thread view diambil
+tiap PROFILE_SAMPLE_INTERVAL detik lewat ``sys._current_frames()``, file
+``.folded`` untuk flamegraph.pl / speedscope). Signal tidak dipakai karena
+hanya sampai ke main thread, sedangkan view berjalan di thread pool.
+Nama file: ``<tool>-<waktu>-<hash input>``, plus ``.json`` berisi metadata.
+Hash input = sha256 dari sha256 semua upload (sudah dihitung saat upload
+diterima) dan field form, jadi PDF yang lambat bisa dikenali lagi.
+
+Yang di-profile hanya view-nya (di thread pool tool); generator respons
+streaming dan thread/proses yang dibuat view tidak ikut.
+
+PROFILE_CONTINUOUS_HZ > 0 menyalakan sampling terus-menerus berlaku rendah:
+stack semua thread diambil N kali per detik dan ditulis per jendela
+PROFILE_CONTINUOUS_WINDOW detik ke ``continuous-<pid>-<waktu>.folded``.
+Tanpa token/secret dan dengan HZ = 0, view tidak dibungkus dan tidak ada
+thread tambahan (overhead nol).
+"""
+import cProfile
+import functools
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, request
+
+from utils.metrics import current_tool
+from utils.uploads import Upload
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # detik, sampling satu request
+DEFAULT_SIGNATURE_TTL = 300
+DEFAULT_MAX_FILES = 200
+MODES = ('cprofile', 'sample')
+IGNORED_THREADS = ('profile-', 'metrics-flush')  # thread latar milik app sendiri, tidak ikut sampling kontinu
+
+_lock = threading.Lock()
+_continuous_pid = None
+
+
+def sign(secret, method, path, timestamp=None):
+    """Nilai header X-Profile-Signature untuk `method` + `path`."""
+    timestamp = int(timestamp or time.time())
+    digest = hmac.new(secret.encode(), f'{timestamp}:{method.upper()}:{path}'.encode(), hashlib.sha256).hexdigest()
+    return f'{timestamp}:{digest}'
+
+
+def _authorized(cfg):
+    token = cfg.get('PROFILE_TOKEN')
+    given = request.headers.get('X-Profile-Token')
+    if token and given:
+        return hmac.compare_digest(given, token)
+    secret = cfg.get('PROFILE_SECRET')
+    signature = request.headers.get('X-Profile-Signature')
+    if not (secret and signature and ':' in signature):
+        return False
+    timestamp = signature.split(':', 1)[0]
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > cfg.get('PROFILE_SIGNATURE_TTL', DEFAULT_SIGNATURE_TTL):
+        return False
+    return hmac.compare_digest(signature, sign(secret, request.method, request.path, timestamp))
+
+
+def input_hash():
+    """sha256 dari hash semua upload + field form request saat ini."""
+    h = hashlib.sha256()
+    for field, storage in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+        h.update(f'{field}:{Upload(storage).sha256}\n'.encode())
+    for key, value in sorted(request.form.items(multi=True)):
+        h.update(f'{key}={value}\n'.encode())
+    return h.hexdigest()
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _folded(frame):
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Ambil stack thread `ident` (None = semua thread kecuali sampler) tiap `interval` detik."""
+
+    def __init__(self, interval, ident=None):
+        self.interval = interval
+        self.ident = ident
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.ident is not None and ident != self.ident):
+                    continue
+                if self.ident is None and str(names.get(ident, '')).startswith(IGNORED_THREADS):
+                    continue
+                stack = _folded(frame)
+                if self.ident is None:
+                    # mode kontinu: nama thread (mis. pool-pdf) jadi akar stack
+                    stack = f'{names.get(ident, ident)};{stack}'
+                self.stacks[stack] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def drain(self):
+        stacks, self.stacks = self.stacks, Counter()
+        return stacks
+
+    def write(self, path, stacks=None):
+        with open(path, 'w') as f:
+            for stack, count in (stacks if stacks is not None else self.stacks).most_common():
+                f.write(f'{stack} {count}\n')
+
+
+def _prune(directory, max_files):
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime)
+    except OSError:
+        return
+    for entry in entries[:max(0, len(entries) - max_files)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _profile_view(view, mode, cfg, *args, **kwargs):
+    directory = cfg['PROFILE_DIR']
+    tool = current_tool()
+    digest = input_hash()
+    base = os.path.join(directory, f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}-{digest[:12]}")
+    start = time.perf_counter()
+    if mode == 'sample':
+        sampler = StackSampler(cfg.get('PROFILE_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL), threading.get_ident()).start()
+        try:
+            response = view(*args, **kwargs)
+        finally:
+            sampler.stop()
+            path = base + '.folded'
+            sampler.write(path)
+    else:
+        profiler = cProfile.Profile()
+        try:
+            response = profiler.runcall(view, *args, **kwargs)
+        finally:
+            path = base + '.pstats'
+            profiler.dump_stats(path)
+    elapsed = time.perf_counter() - start
+    with open(base + '.json', 'w') as f:
+        json.dump({'tool': tool, 'endpoint': request.endpoint, 'path': request.path, 'mode': mode,
+                   'input_sha256': digest, 'form': request.form.to_dict(), 'seconds': round(elapsed, 3),
+                   'created': time.time(), 'pid': os.getpid()}, f)
+    _prune(directory, cfg.get('PROFILE_MAX_FILES', DEFAULT_MAX_FILES))
+    current_app.logger.info(f'Profile {tool} ({mode}, {elapsed:.2f} detik) ditulis ke {path}')
+    response = current_app.make_response(response)
+    response.headers['X-Profile-File'] = os.path.basename(path)
+    return response
+
+
+def _profiled(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # jalur normal: hanya cek header
+        if 'X-Profile-Token' not in request.headers and 'X-Profile-Signature' not in request.headers:
+            return view(*args, **kwargs)
+        cfg = current_app.config
+        if not _authorized(cfg):
+            current_app.logger.warning(f'Profile ditolak untuk {request.path}: token / signature tidak valid')
+            return view(*args, **kwargs)
+        mode = request.headers.get('X-Profile-Mode', 'cprofile')
+        return _profile_view(view, mode if mode in MODES else 'cprofile', cfg, *args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _continuous_loop(hz, window, directory, max_files):
+    sampler = StackSampler(1.0 / hz).start()
+    while True:
+        started = time.strftime('%Y%m%d-%H%M%S')
+        time.sleep(window)
+        stacks = sampler.drain()
+        if stacks:
+            sampler.write(os.path.join(directory, f'continuous-{os.getpid()}-{started}.folded'), stacks)
+            _prune(directory, max_files)
+
+
+def _start_continuous():
+    # di dalam worker (bukan master gunicorn sebelum fork); satu sampler per proses
+    global _continuous_pid
+    with _lock:
+        if _continuous_pid == os.getpid():
+            return
+        _continuous_pid = os.getpid()
+    cfg = current_app.config
+    threading.Thread(target=_continuous_loop, name='profile-continuous', daemon=True, args=(
+        cfg['PROFILE_CONTINUOUS_HZ'], cfg.get('PROFILE_CONTINUOUS_WINDOW', 60),
+        cfg['PROFILE_DIR'], cfg.get('PROFILE_MAX_FILES', DEFAULT_MAX_FILES))).start()
+
+
+def init_app(app):
+    """
+    Bungkus view POST untuk profiling on-demand. Dipanggil sebelum
+    pools.init_app: pembungkus ini harus jalan di dalam thread pool tool.
+    """
+    cfg = app.config
+    cfg.setdefault('PROFILE_TOKEN', None)
+    cfg.setdefault('PROFILE_SECRET', None)
+    cfg.setdefault('PROFILE_CONTINUOUS_HZ', 0)
+    on_demand = bool(cfg['PROFILE_TOKEN'] or cfg['PROFILE_SECRET'])
+    if not (on_demand or cfg['PROFILE_CONTINUOUS_HZ']):
+        return
+    cfg['PROFILE_DIR'] = cfg.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'webtoolkit_profiles')
+    os.makedirs(cfg['PROFILE_DIR'], exist_ok=True)
+    if on_demand:
+        for rule in app.url_map.iter_rules():
+            if 'POST' in rule.methods:
+                view = app.view_functions[rule.endpoint]
+                if not getattr(view, '_profiled', False):
+                    app.view_functions[rule.endpoint] = _profiled(view)
+    if cfg['PROFILE_CONTINUOUS_HZ']:
+        app.before_request(_start_continuous)
@@ -0,0 +1,129 @@
+# utils/results.py
+"""
+Pengiriman file hasil besar tanpa menyalin isinya lewat Python.
+
+View menulis hasil langsung ke file di RESULTS_DIR (``new_result()``), lalu
+``deliver()`` menyerahkan transfernya sesuai RESULTS_DELIVERY:
+- ``sendfile`` (default): file dibuka, langsung di-unlink, lalu dikirim lewat
+  ``wsgi.file_wrapper`` sehingga gunicorn memakai ``os.sendfile`` (kernel yang
+  menyalin ke socket). Tidak ada sisa file, tapi worker tetap menunggu sampai
+  klien selesai mengunduh.
+- ``x-accel``: respons kosong dengan header ``X-Accel-Redirect:
+  <RESULTS_ACCEL_PREFIX><nama file>``; nginx yang mengirim file, worker langsung
+  bebas walau klien lambat. Butuh lokasi internal di nginx::
+
+      location /_results/ { internal; alias /var/lib/webtoolkit/results/; }
+
+- ``x-sendfile``: header ``X-Sendfile: <path>`` untuk Apache mod_xsendfile /
+  lighttpd.
+Pada dua mode proxy, user proxy harus bisa membaca file (RESULTS_FILE_MODE,
+default 0640 -> masukkan user nginx ke grup user app).
+File dihapus oleh sweep RESULTS_TTL (jalan saat hasil
+baru dibuat), karena app tidak tahu kapan proxy selesai mengirim. File hasil
+yang tidak jadi dikirim (view error) dihapus di akhir request.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from flask import Response, current_app, g, send_file
+
+from utils import metrics
+
+DELIVERY_MODES = ('sendfile', 'x-accel', 'x-sendfile')
+DEFAULT_TTL = 900  # detik; cukup untuk unduhan lambat lewat proxy
+SWEEP_INTERVAL = 60  # detik antar sweep per proses
+
+_last_sweep = {'at': 0.0}
+
+
+def results_dir():
+    directory = current_app.config.get('RESULTS_DIR') or os.path.join(tempfile.gettempdir(), 'webtoolkit_results')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def sweep_results(directory, ttl):
+    """Hapus file hasil yang lebih tua dari `ttl` detik."""
+    cutoff = time.time() - ttl
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def new_result(suffix):
+    """
+    Path file kosong di RESULTS_DIR untuk ditulis view. Jika tidak dikirim
+    dengan ``deliver()``, file dihapus di akhir request.
+    """
+    directory = results_dir()
+    now = time.time()
+    if now - _last_sweep['at'] > SWEEP_INTERVAL:
+        _last_sweep['at'] = now
+        sweep_results(directory, current_app.config.get('RESULTS_TTL', DEFAULT_TTL))
+    fd, path = tempfile.mkstemp(prefix=f'{metrics.current_tool()}_', suffix=suffix, dir=directory)
+    os.close(fd)
+    if '_results' not in g:
+        g._results = []
+    g._results.append(path)
+    return path
+
+
+def store(src_path, suffix=None):
+    """Pindahkan file hasil yang ditulis proses lain (mis. soffice) ke RESULTS_DIR."""
+    path = new_result(suffix if suffix is not None else os.path.splitext(src_path)[1])
+    try:
+        os.replace(src_path, path)
+    except OSError:
+        # beda filesystem (mis. /tmp vs volume results)
+        shutil.move(src_path, path)
+    return path
+
+
+def deliver(path, download_name, mimetype):
+    """Respons unduhan untuk file hasil `path` (dari ``new_result`` / ``store``)."""
+    cfg = current_app.config
+    mode = cfg.get('RESULTS_DELIVERY', 'sendfile')
+    pending = g.get('_results', [])
+    if path in pending:
+        pending.remove(path)
+    metrics.inc('result_bytes_total', os.path.getsize(path), tool=metrics.current_tool(), delivery=mode)
+
+    if mode == 'sendfile':
+        f = open(path, 'rb')
+        os.remove(path)  # handle yang terbuka tetap valid; tidak ada sisa file meski klien putus
+        return send_file(f, mimetype=mimetype, as_attachment=True, download_name=download_name)
+
+    # body kosong: proxy yang membaca file dan mengisi Content-Length.
+    # mkstemp membuat file 0600; proxy (user lain, mis. www-data) butuh izin baca
+    os.chmod(path, cfg.get('RESULTS_FILE_MODE', 0o640))
+    response = Response(mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    if mode == 'x-accel':
+        response.headers['X-Accel-Redirect'] = cfg.get('RESULTS_ACCEL_PREFIX', '/_results/') + os.path.basename(path)
+    else:
+        response.headers['X-Sendfile'] = path
+    return response
+
+
+def _discard_results(exc=None):
+    for path in g.pop('_results', []):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def init_app(app):
+    app.config.setdefault('RESULTS_DIR', None)
+    app.config.setdefault('RESULTS_DELIVERY', 'sendfile')
+    app.config.setdefault('RESULTS_TTL', DEFAULT_TTL)
+    app.config.setdefault('RESULTS_ACCEL_PREFIX', '/_results/')
+    app.config.setdefault('RESULTS_FILE_MODE', 0o640)
+    if app.config['RESULTS_DELIVERY'] not in DELIVERY_MODES:
+        raise ValueError(f"RESULTS_DELIVERY harus salah satu dari {DELIVERY_MODES}")
+    app.teardown_request(_discard_results)
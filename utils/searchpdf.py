@@ -0,0 +1,58 @@
+# utils/searchpdf.py
+"""
+Perakitan PDF searchable dari text layer Tesseract.
+
+Tesseract dipanggil dengan ``textonly_pdf=1``: hasilnya PDF satu halaman
+berisi teks tak terlihat (render mode 3) tanpa gambar. Layer itu digabung
+ke halaman asli, jadi stream gambar scan disalin apa adanya, tidak di-render
+lalu di-encode ulang. Halaman yang sudah punya text layer disalin tanpa
+perubahan. Gambar hasil render hanya hidup selama satu halaman di-OCR.
+
+Geometri layer: ``(dpi, lebar_px, tinggi_px, left, top)``, yaitu DPI dan
+ukuran gambar yang di-render dari halaman, plus offset potongan (crop) yang
+dikirim ke Tesseract di dalam gambar itu.
+"""
+import io
+
+from PyPDF2 import PdfReader, PdfWriter, Transformation
+from PyPDF2.generic import RectangleObject
+
+
+def layer_transform(page, layer_page, geometry):
+    """Transformasi dari koordinat layer Tesseract ke koordinat halaman asli."""
+    dpi, full_w, full_h, left, top = geometry
+    # pdftoppm me-render CropBox, jadi skala dan titik asal mengikuti CropBox
+    box = page.cropbox
+    sx = float(box.width) / (full_w * 72.0 / dpi)
+    sy = float(box.height) / (full_h * 72.0 / dpi)
+    tx = left * 72.0 / dpi
+    ty = (full_h - top) * 72.0 / dpi - float(layer_page.mediabox.height)
+    return Transformation().translate(tx, ty).scale(sx, sy).translate(float(box.left), float(box.bottom))
+
+
+class SearchablePdf:
+    """Kumpulkan halaman satu per satu (berurutan), lalu ``write`` ke file-like."""
+
+    def __init__(self, logger=None):
+        self.writer = PdfWriter()
+        self.logger = logger
+        self.layers = 0
+
+    def add_page(self, page, layer=None, geometry=None):
+        if layer and int(page.get('/Rotate', 0) or 0) % 360:
+            # hasil render sudah diputar poppler; halaman seperti ini belum dipetakan
+            if self.logger:
+                self.logger.warning('OCR PDF: halaman berotasi, text layer dilewati')
+            layer = None
+        if layer:
+            layer_page = PdfReader(io.BytesIO(layer)).pages[0]
+            layer_page.add_transformation(layer_transform(page, layer_page, geometry))
+            # merge_page meng-clip ke MediaBox layer yang belum ikut ditransformasi
+            layer_page.mediabox = RectangleObject(page.mediabox)
+            # digabung di halaman sumber, baru disalin: referensi font layer ikut di-clone writer
+            page.merge_page(layer_page)
+            self.layers += 1
+        self.writer.add_page(page)
+
+    def write(self, fp):
+        self.writer.write(fp)
@@ -0,0 +1,256 @@
+# utils/singleflight.py
+"""
+Single-flight: request identik yang datang selagi job yang sama masih jalan
+menunggu job itu lalu memakai hasilnya, bukan menjalankan job kedua.
+
+View POST ditandai ``@singleflight.dedupe``; ``init_app`` (dipanggil setelah
+``pools.init_app``) membungkusnya sehingga flight dimasuki di thread request,
+di luar pool tool: request yang menunggu tidak memegang slot pool, dan request
+identik yang antri di pool yang sama ikut digabung.
+
+Kunci = endpoint + sha256 setiap upload (sudah dihitung saat upload diterima)
+beserta ekstensinya + semua field form. Per kunci ada file lock ``fcntl`` di
+SINGLEFLIGHT_DIR, jadi berlaku lintas worker gunicorn. Request pertama
+(leader) memegang lock selama memproses dan menerbitkan hasilnya (hard link ke
+file hasil di RESULTS_DIR + metadata). Request berikutnya (follower) menunggu
+lock; hasil terbitan dipakai hanya jika selesai *setelah* follower datang.
+Request yang datang setelah job selesai langsung jadi leader baru, jadi ini
+bukan cache hasil — hanya menghapus kerja ganda saat double-click / retry.
+Jika leader gagal (atau tidak menerbitkan hasil), follower pertama yang dapat
+lock menjadi leader.
+
+Pemakaian di view::
+
+    @bp.route('/process', methods=['POST'])
+    @singleflight.dedupe
+    def process():
+        ... proses, tulis hasil ke path dari results.new_result() ...
+        singleflight.publish(path, download_name, mimetype)  # sebelum deliver
+        return results.deliver(path, download_name, mimetype)
+"""
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from flask import current_app, g, request
+
+from utils import metrics, results
+from utils.uploads import get_uploads
+
+POLL_INTERVAL = 0.1  # detik antar percobaan lock saat menunggu
+DEFAULT_WAIT_TIMEOUT = 600
+DEFAULT_TTL = 600  # detik; terbitan & lock file lama dihapus
+SWEEP_INTERVAL = 60
+
+_last_sweep = {'at': 0.0}
+
+
+def flight_key(tool, *parts):
+    h = hashlib.sha256(tool.encode())
+    for part in parts:
+        h.update(b'\0' + str(part).encode())
+    return h.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # beda filesystem / link tidak didukung
+        shutil.copyfile(src, dst)
+
+
+def sweep_flights(directory, ttl):
+    """
+    Hapus terbitan lama. Lock file (0 byte, satu per kunci) tidak pernah dihapus:
+    request lain bisa sudah membuka inode yang sama, lalu mendapat flock di inode
+    yatim sementara request berikutnya mengunci file baru — dua leader satu kunci.
+    """
+    cutoff = time.time() - ttl
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.lock'):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class Flight:
+    """Satu job yang bisa digabung; lihat docstring modul."""
+
+    def __init__(self, tool, *parts):
+        cfg = current_app.config
+        self.tool = tool
+        self.enabled = cfg.get('SINGLEFLIGHT_ENABLED', True)
+        self.wait_timeout = cfg.get('SINGLEFLIGHT_WAIT_TIMEOUT', DEFAULT_WAIT_TIMEOUT)
+        self.directory = cfg.get('SINGLEFLIGHT_DIR') or os.path.join(tempfile.gettempdir(), 'webtoolkit_singleflight')
+        self.base = os.path.join(self.directory, flight_key(tool, *parts))
+        self.shared = None  # path file hasil (milik request ini) jika memakai hasil leader
+        self.delivery = None  # (download_name, mimetype) hasil leader
+        self._lock = None
+        self._published = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        if now - _last_sweep['at'] > SWEEP_INTERVAL:
+            _last_sweep['at'] = now
+            sweep_flights(self.directory, current_app.config.get('SINGLEFLIGHT_TTL', DEFAULT_TTL))
+        joined = time.time()
+        self._lock = open(self.base + '.lock', 'a')
+        if self._try_lock():
+            # leader bisa saja baru selesai antara `joined` dan lock ini
+            self._take_or_lead(joined)
+            return self
+        # job identik sedang jalan: tunggu leader selesai
+        with metrics.phase('singleflight'):
+            deadline = time.monotonic() + self.wait_timeout
+            while not self._try_lock():
+                if time.monotonic() >= deadline:
+                    # leader macet: proses sendiri tanpa lock
+                    self._lock.close()
+                    self._lock = None
+                    metrics.inc('singleflight_total', tool=metrics.current_tool(), result='timeout')
+                    current_app.logger.warning(f"Single-flight {self.tool}: menunggu > {self.wait_timeout} detik, proses sendiri")
+                    return self
+                time.sleep(POLL_INTERVAL)
+        self._take_or_lead(joined)
+        return self
+
+    def _take_or_lead(self, joined):
+        if self._take(joined):
+            self._unlock()
+            metrics.inc('singleflight_total', tool=metrics.current_tool(), result='shared')
+            current_app.logger.info(f"Single-flight {self.tool}: memakai hasil job identik ({time.time() - joined:.1f} detik menunggu)")
+        else:
+            # tidak ada hasil untuk request ini (leader gagal / selesai sebelum kita datang): jadi leader
+            self._lead()
+
+    def __exit__(self, *exc):
+        if self._lock is None:
+            return
+        try:
+            if self._published:
+                download_name, mimetype = self._published
+                self._write_meta({'finished': time.time(), 'download_name': download_name, 'mimetype': mimetype})
+        finally:
+            self._unlock()
+
+    def publish(self, path, download_name, mimetype):
+        """
+        Bagikan file hasil `path` ke request identik yang sedang menunggu. Dipanggil
+        sebelum ``results.deliver`` (mode sendfile langsung meng-unlink file hasil).
+        """
+        if self._lock is None or self.shared:
+            return
+        try:
+            _link_or_copy(path, self.base + '.tmp')
+            os.replace(self.base + '.tmp', self.base + '.out')
+        except OSError as e:
+            current_app.logger.warning(f"Single-flight {self.tool}: hasil tidak bisa dibagikan: {e}")
+            return
+        # metadata ditulis saat lock dilepas: follower hanya melihat hasil yang lengkap
+        self._published = (download_name, mimetype)
+
+    def _try_lock(self):
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock(self):
+        self._lock.close()  # lock lepas saat file ditutup
+        self._lock = None
+
+    def _lead(self):
+        # terbitan lama bukan untuk request ini; hapus supaya follower tidak salah ambil
+        for suffix in ('.json', '.out'):
+            try:
+                os.remove(self.base + suffix)
+            except OSError:
+                pass
+        metrics.inc('singleflight_total', tool=metrics.current_tool(), result='leader')
+
+    def _write_meta(self, meta):
+        tmp = f'{self.base}.{uuid.uuid4().hex[:8]}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.base + '.json')
+
+    def _take(self, joined):
+        """Salin (hard link) hasil leader jika selesai setelah `joined`; True jika berhasil."""
+        try:
+            with open(self.base + '.json') as f:
+                meta = json.load(f)
+            if meta['finished'] < joined:
+                return False
+            own = f'{self.base}.{uuid.uuid4().hex[:8]}.tmp'
+            _link_or_copy(self.base + '.out', own)
+        except (OSError, ValueError, KeyError):
+            return False
+        self.shared = results.store(own, os.path.splitext(meta['download_name'])[1])
+        self.delivery = (meta['download_name'], meta['mimetype'])
+        return True
+
+
+def request_key():
+    """Bagian kunci request ini: sha256 + ekstensi setiap upload, lalu semua field form."""
+    parts = []
+    for field in sorted(request.files):
+        for upload in get_uploads(field):
+            parts.append(f'{field}:{upload.sha256}:{os.path.splitext(upload.filename or "")[1].lower()}')
+    for field in sorted(request.form):
+        parts.append(f'{field}={request.form.getlist(field)!r}')
+    return parts
+
+
+def publish(path, download_name, mimetype):
+    """Bagikan file hasil request ini ke request identik yang menunggu (no-op tanpa flight)."""
+    flight = g.get('_flight')
+    if flight is not None:
+        flight.publish(path, download_name, mimetype)
+
+
+def dedupe(view):
+    """Tandai view POST untuk single-flight; dibungkus oleh ``init_app``."""
+    view._singleflight = True
+    return view
+
+
+def _deduped(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # body upload dibaca & di-hash di thread request (sama seperti pools._pooled)
+        if not request.files:
+            return view(*args, **kwargs)
+        with Flight(request.endpoint, *request_key()) as flight:
+            if flight.shared:
+                return results.deliver(flight.shared, *flight.delivery)
+            # view (di thread pool) memakai g yang sama: publish() menemukan flight ini
+            g._flight = flight
+            try:
+                return view(*args, **kwargs)
+            finally:
+                g.pop('_flight', None)
+    wrapper._singleflight_wrapped = True
+    return wrapper
+
+
+def init_app(app):
+    """Bungkus view ``@dedupe``. Dipanggil setelah pools.init_app: flight ditunggu di luar pool tool."""
+    app.config.setdefault('SINGLEFLIGHT_ENABLED', True)
+    app.config.setdefault('SINGLEFLIGHT_WAIT_TIMEOUT', DEFAULT_WAIT_TIMEOUT)
+    for endpoint, view in list(app.view_functions.items()):
+        if getattr(view, '_singleflight', False) and not getattr(view, '_singleflight_wrapped', False):
+            app.view_functions[endpoint] = _deduped(view)
@@ -0,0 +1,44 @@
+# utils/textlayer.py
+"""
+Deteksi text layer per halaman PDF.
+
+PDF hasil export (Word, LibreOffice, laporan sistem) sudah berisi teks yang
+bisa diekstrak; me-render halaman seperti itu lalu menjalankan Tesseract
+hanya membuang waktu dan menurunkan akurasi. Halaman dianggap punya text
+layer jika jumlah karakter yang benar-benar terbaca (bukan glyph ``(cid:N)``
+dari font tanpa ToUnicode) mencapai batas minimum.
+"""
+import re
+
+from utils.lazy import lazy_import
+
+pdfplumber = lazy_import('pdfplumber')
+
+DEFAULT_MIN_CHARS = 20
+_CID = re.compile(r'\(cid:\d+\)')
+
+
+def readable_chars(text):
+    """Jumlah karakter non-spasi setelah glyph (cid:N) yang tidak terpetakan dibuang."""
+    return len(''.join(_CID.sub('', text).split()))
+
+
+def page_text_layers(pdf_path, min_chars=DEFAULT_MIN_CHARS):
+    """
+    List sepanjang jumlah halaman: teks halaman jika text layer-nya cukup,
+    None jika halaman perlu di-OCR (hasil scan / hanya gambar).
+    """
+    layers = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            try:
+                text = None
+                # hitung karakter dulu; halaman scan biasanya tidak punya char sama sekali
+                if len(page.chars) >= min_chars:
+                    text = page.extract_text() or ''
+                    if readable_chars(text) < min_chars:
+                        text = None
+                layers.append(text)
+            finally:
+                page.close()
+    return layers
@@ -0,0 +1,319 @@
+# utils/uploads.py
+"""
+Spooling upload bersama untuk semua blueprint.
+
+Body multipart di-parse langsung ke file sementara (bisa diarahkan ke tmpfs
+lewat UPLOAD_SPOOL_DIR) begitu ukurannya melewati UPLOAD_SPOOL_THRESHOLD,
+sehingga handler tidak perlu lagi ``file.read()`` seluruh isi upload ke RAM.
+Handler cukup memakai ``get_upload()`` lalu memilih akses yang dibutuhkan:
+``path`` (untuk gs / soffice / poppler), ``stream()`` (untuk PIL / pdfplumber)
+atau ``mmap()`` (untuk numpy / cv2) — semuanya tanpa salinan tambahan.
+File dibersihkan otomatis di akhir request.
+
+Batas ukuran berlaku per blueprint / endpoint (UPLOAD_LIMITS), dan selama upload masih
+mengalir setiap file di-hash (sha256) serta dicek magic byte-nya terhadap
+jenis yang didaftarkan blueprint lewat ``upload_policy()``. File yang salah
+jenis ditolak 415 sebelum sisa body diterima.
+"""
+import io
+import os
+import mmap
+import shutil
+import hashlib
+import tempfile
+from flask import Request, current_app, g, request
+from werkzeug.exceptions import UnsupportedMediaType
+from werkzeug.utils import secure_filename
+from utils import metrics
+
+DEFAULT_SPOOL_THRESHOLD = 512 * 1024  # di bawah ini upload cukup di memori
+SNIFF_BYTES = 32
+
+# magic byte -> jenis file (dicek berurutan)
+_MAGIC = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'PK\x03\x04', 'zip'),  # docx / xlsx / ods
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'ole'),  # doc / xls lama
+)
+
+# blueprint name -> set jenis file yang diterima
+_POLICIES = {}
+
+
+def upload_policy(blueprint, kinds):
+    """Daftarkan jenis file (hasil sniff magic byte) yang diterima sebuah blueprint."""
+    _POLICIES[blueprint.name] = frozenset(kinds)
+
+
+def sniff_kind(head):
+    """Tebak jenis file dari beberapa byte pertama. None jika tidak dikenal."""
+    if b'%PDF-' in head:
+        return 'pdf'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+class SniffingSpool:
+    """Pembungkus file spool: hash sha256 + sniff magic byte selama upload ditulis."""
+
+    def __init__(self, spool, allowed=None, filename=None):
+        self.spool = spool
+        self.allowed = allowed
+        self.filename = filename
+        self.kind = None
+        self._head = b''
+        self._sniffed = False
+        self._hash = hashlib.sha256()
+
+    def write(self, data):
+        if not self._sniffed:
+            self._head += bytes(data[:SNIFF_BYTES - len(self._head)])
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        self._hash.update(data)
+        return self.spool.write(data)
+
+    def _sniff(self):
+        self._sniffed = True
+        self.kind = sniff_kind(self._head)
+        if self.allowed is not None and self.kind not in self.allowed:
+            if not self._head:
+                raise UnsupportedMediaType(f"File '{self.filename}' kosong.")
+            raise UnsupportedMediaType(f"Isi file '{self.filename}' tidak sesuai format yang diizinkan.")
+
+    def seek(self, *args):
+        # werkzeug memanggil seek(0) setelah file selesai ditulis; file kecil dan file kosong
+        # (jenis tidak dikenal) di-sniff di sini. Field tanpa nama file = tidak ada file
+        # dipilih, dibiarkan supaya view menjawab 400
+        if not self._sniffed and (self._head or self.filename):
+            self._sniff()
+        return self.spool.seek(*args)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self.spool, name)
+
+    def __iter__(self):
+        return iter(self.spool)
+
+
+def _spool_dir():
+    """Direktori spool (None = direktori temp default sistem)."""
+    spool_dir = current_app.config.get('UPLOAD_SPOOL_DIR')
+    if spool_dir:
+        os.makedirs(spool_dir, exist_ok=True)
+        return spool_dir
+    return None
+
+
+def _suffix_for(filename):
+    # ekstensi dipertahankan karena soffice / pdf2docx menebak format dari nama file
+    return os.path.splitext(secure_filename(filename or ''))[1].lower()
+
+
+class SpoolingRequest(Request):
+    """Request yang menulis file upload besar langsung ke file bernama di disk."""
+
+    @property
+    def max_content_length(self):
+        # batas per blueprint; dicek werkzeug sebelum body dibaca (Content-Length)
+        # dan selama streaming untuk upload tanpa Content-Length
+        if self._max_content_length is not None:
+            return self._max_content_length
+        if not current_app:
+            return super().max_content_length
+        # kunci bisa endpoint ('convert_bp.batch') atau nama blueprint ('convert_bp')
+        limits = current_app.config.get('UPLOAD_LIMITS') or {}
+        default = limits.get(self.blueprint, current_app.config['MAX_CONTENT_LENGTH'])
+        return limits.get(self.endpoint, default)
+
+    @max_content_length.setter
+    def max_content_length(self, value):
+        self._max_content_length = value
+
+    def _load_form_data(self):
+        # body dibaca & di-spool di sini (akses pertama request.form / request.files)
+        if 'form' in self.__dict__ or self.method != 'POST':
+            return super()._load_form_data()
+        with metrics.phase('upload'):
+            super()._load_form_data()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        threshold = current_app.config.get('UPLOAD_SPOOL_THRESHOLD', DEFAULT_SPOOL_THRESHOLD)
+        size_hint = content_length or total_content_length
+        if size_hint is not None and size_hint <= threshold:
+            spool = io.BytesIO()
+        else:
+            # delete=True: file otomatis terhapus saat request.close() menutup FileStorage
+            spool = tempfile.NamedTemporaryFile(
+                mode='w+b', prefix='upload_', suffix=_suffix_for(filename), dir=_spool_dir()
+            )
+        return SniffingSpool(spool, allowed=_POLICIES.get(self.blueprint), filename=filename)
+
+
+class Upload:
+    """Pembungkus FileStorage: akses path / stream / mmap tanpa menyalin isi upload."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.filename = storage.filename
+        self.mimetype = storage.mimetype
+        self._sha256 = None
+        self._path = None
+        self._owned_path = False
+        self._maps = []
+
+    @property
+    def size(self):
+        f = self.storage.stream
+        pos = f.tell()
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(pos)
+        return size
+
+    @property
+    def kind(self):
+        """Jenis file hasil sniff magic byte (mis. 'pdf', 'jpeg'), None jika tidak dikenal."""
+        f = self.storage.stream
+        if isinstance(f, SniffingSpool):
+            return f.kind
+        pos = f.tell()
+        f.seek(0)
+        head = f.read(SNIFF_BYTES)
+        f.seek(pos)
+        return sniff_kind(head)
+
+    @property
+    def sha256(self):
+        """Hash isi upload; sudah dihitung selama upload diterima (tanpa membaca ulang)."""
+        if self._sha256 is None:
+            f = self.storage.stream
+            if isinstance(f, SniffingSpool):
+                self._sha256 = f.hexdigest()
+            else:
+                h = hashlib.sha256()
+                f.seek(0)
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(chunk)
+                f.seek(0)
+                self._sha256 = h.hexdigest()
+        return self._sha256
+
+    def _spool(self):
+        f = self.storage.stream
+        return f.spool if isinstance(f, SniffingSpool) else f
+
+    def stream(self):
+        """Stream upload, sudah di-seek ke awal."""
+        f = self._spool()
+        f.seek(0)
+        return f
+
+    @property
+    def path(self):
+        """Path file di disk. Upload kecil (masih di memori) ditulis sekali ke spool."""
+        if self._path is None:
+            f = self._spool()
+            name = getattr(f, 'name', None)
+            if isinstance(name, str) and os.path.exists(name):
+                f.flush()
+                self._path = name
+            else:
+                fd, path = tempfile.mkstemp(prefix='upload_', suffix=_suffix_for(self.filename), dir=_spool_dir())
+                with os.fdopen(fd, 'wb') as out:
+                    f.seek(0)
+                    shutil.copyfileobj(f, out)
+                self._path = path
+                self._owned_path = True
+        return self._path
+
+    def reopen(self):
+        """
+        Handle baru ke file upload yang tetap bisa dibaca setelah request selesai
+        (mis. oleh generator response streaming). File spool sudah di-unlink saat
+        teardown, tapi handle yang terbuka tetap valid; pemanggil wajib menutupnya.
+        """
+        return open(self.path, 'rb')
+
+    def mmap(self):
+        """Buffer read-only berisi upload (mmap jika di disk, view BytesIO jika di memori)."""
+        f = self._spool()
+        if isinstance(f, io.BytesIO):
+            view = f.getbuffer()
+            self._maps.append(view)
+            return view
+        f.flush()
+        if self.size == 0:
+            return memoryview(b'')
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(m)
+        return m
+
+    def close(self):
+        for m in self._maps:
+            try:
+                m.release() if isinstance(m, memoryview) else m.close()
+            except BufferError:
+                # masih direferensikan (mis. array numpy); dibebaskan oleh GC
+                pass
+        self._maps = []
+        if self._owned_path and self._path and os.path.exists(self._path):
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+        self._path = None
+        self._owned_path = False
+
+
+def _track(upload):
+    if '_uploads' not in g:
+        g._uploads = []
+    g._uploads.append(upload)
+    return upload
+
+
+def get_upload(field):
+    """Ambil satu file upload sebagai Upload (None jika field tidak ada)."""
+    storage = request.files.get(field)
+    if storage is None:
+        return None
+    return _track(Upload(storage))
+
+
+def get_uploads(field):
+    """Ambil semua file upload untuk field multi-file (mis. 'images[]')."""
+    return [_track(Upload(s)) for s in request.files.getlist(field)]
+
+
+def _cleanup_uploads(exc=None):
+    for upload in g.pop('_uploads', []):
+        upload.close()
+
+
+def upload_limit_mb():
+    """Batas upload (MB) untuk blueprint request saat ini — dipakai template & pesan 413."""
+    limit = request.max_content_length
+    return int(limit // (1024 * 1024)) if limit else None
+
+
+def init_app(app):
+    app.request_class = SpoolingRequest
+    app.config.setdefault('UPLOAD_SPOOL_THRESHOLD', DEFAULT_SPOOL_THRESHOLD)
+    app.config.setdefault('UPLOAD_SPOOL_DIR', None)
+    app.config.setdefault('UPLOAD_LIMITS', {})
+    app.teardown_request(_cleanup_uploads)
+    app.context_processor(lambda: {'upload_limit_mb': upload_limit_mb()})